@@ -1,10 +1,14 @@
 import json
 import os
-import time
 import logging
-from typing import List, Dict
-from config import DEBATE_ROUNDS
-from tenacity import retry, stop_after_attempt, wait_fixed
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional
+from config import DEBATE_ROUNDS, DEADLINE_FALLBACK_RUNS
+from utils.llm_cache import LLMCache, get_cache
+from utils.telemetry import track_llm_call
+from utils.deadline import Deadline, DeadlineExceeded
+from agents.monte_carlo import run_monte_carlo, template_message, DECISIONS
+from agents.context_window import DebateContext
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -15,7 +19,7 @@ except ImportError:
     AIQRunner = None
     logger.error("Failed to import 'agentiq'. Ensure 'agentiq==1.0.0' is installed from NVIDIA's repository (build.nvidia.com).")
 
-def simulate_debate_agent_iq(personas: List[Dict], dilemma: str, process_hint: str, extracted: Dict, scenarios: str = "", rounds: int = DEBATE_ROUNDS, max_simulation_time: int = 180) -> List[Dict]:
+def simulate_debate_agent_iq(personas: List[Dict], dilemma: str, process_hint: str, extracted: Dict, scenarios: str = "", rounds: int = DEBATE_ROUNDS, max_simulation_time: int = 180, use_cache: bool = True, deadline: Optional[Deadline] = None) -> List[Dict]:
     """
     Simulate a debate among stakeholder personas using NVIDIA AgentIQ.
 
@@ -27,6 +31,9 @@ def simulate_debate_agent_iq(personas: List[Dict], dilemma: str, process_hint: s
         scenarios (str): Optional alternative scenarios or external factors.
         rounds (int): Number of debate rounds.
         max_simulation_time (int): Maximum allowed time in seconds.
+        use_cache (bool): Serve identical workflow inputs from the LLM response cache.
+        deadline (Optional[Deadline]): Shared time budget; defaults to one of max_simulation_time seconds.
+            Stakeholder turns the budget cannot cover fall back to the Monte Carlo message template.
 
     Returns:
         List[Dict]: Debate transcript with agent, round, step, and message.
@@ -99,29 +106,41 @@ def simulate_debate_agent_iq(personas: List[Dict], dilemma: str, process_hint: s
         "Recommendation and Approval": "Finalize the recommendation and propose next steps."
     }
 
-    # Initialize cumulative context
-    cumulative_context = f"Dilemma: {dilemma}\nProcess: {process_hint}\n"
-    if scenarios:
-        cumulative_context += f"Scenarios: {scenarios}\n"
+    # Initialize rolling context
+    context = DebateContext(dilemma, process_hint, scenarios)
 
-    start_time = time.time()
+    deadline = deadline if deadline is not None else Deadline(max_simulation_time)
+    # AIQRunner.run has no timeout, so it runs on a worker thread that is abandoned at the deadline
+    workflow_executor = ThreadPoolExecutor(max_workers=1)
+    fallback_runs = run_monte_carlo(filtered_personas, rounds, runs=DEADLINE_FALLBACK_RUNS)["representative_runs"]
+    fallback_decisions = fallback_runs[0]["decisions"] if fallback_runs else []
 
-    @retry(stop=stop_after_attempt(3), wait=wait_fixed(2))
-    def run_workflow(agent_name: str, input_data: str):
-        return runner.run(input=input_data)
+    @deadline.retry(attempts=3, wait_s=2)
+    def attempt_workflow(agent_name: str, input_data: str, record: Dict):
+        record["attempts"] += 1
+        cache = get_cache()
+        key = LLMCache.make_key("agentiq", [{"role": "user", "content": input_data}])
+        if use_cache:
+            cached = cache.get(key)
+            if cached is not None:
+                record["cached"] = True
+                return cached
+        result = deadline.result(workflow_executor.submit(runner.run, input=input_data))
+        try:
+            json.loads(result)
+            cache.set(key, result)
+        except Exception as e:
+            logger.warning(f"Not caching AgentIQ response for {agent_name}: {str(e)}")
+        return result
+
+    def run_workflow(agent_name: str, input_data: str, round_num: int):
+        with track_llm_call("agentiq", agent_name, round_num) as record:
+            record["model"] = "agentiq"
+            return attempt_workflow(agent_name, input_data, record)
 
     # Simulate debate
+    budget_notified = False
     for round_num in range(rounds):
-        elapsed_time = time.time() - start_time
-        if elapsed_time > max_simulation_time:
-            transcript.append({
-                "agent": "System",
-                "round": round_num + 1,
-                "step": process_steps[round_num] if round_num < len(process_steps) else "Unknown",
-                "message": f"Simulation interrupted: Exceeded maximum time of {max_simulation_time} seconds."
-            })
-            break
-
         current_step = process_steps[round_num]
         step_key = current_step.split("(")[0].strip()
         objective = process_objectives.get(step_key, "Continue the discussion.")
@@ -133,11 +152,13 @@ def simulate_debate_agent_iq(personas: List[Dict], dilemma: str, process_hint: s
             "step": current_step,
             "objective": objective,
             "personas_file": personas_file,
-            "context": cumulative_context[-500:],
+            "context": context.render(),
             "dilemma": dilemma
         })
         try:
-            manager_result = run_workflow("Process Manager", manager_input)
+            if deadline.remaining() < deadline.min_call_s:
+                raise DeadlineExceeded("Time budget exhausted")
+            manager_result = run_workflow("Process Manager", manager_input, round_num + 1)
             manager_response = json.loads(manager_result)
             transcript.append({
                 "agent": "Process Manager",
@@ -155,19 +176,32 @@ def simulate_debate_agent_iq(personas: List[Dict], dilemma: str, process_hint: s
 
         # Stakeholder Agents: Contribute to the debate
         round_transcript = []
-        for persona in filtered_personas:
-            elapsed_time = time.time() - start_time
-            if elapsed_time > max_simulation_time:
-                transcript.append({
-                    "agent": "System",
+        for i, persona in enumerate(filtered_personas):
+            stakeholder_name = persona["name"]
+            role = stakeholder_roles.get(stakeholder_name, "Team Member")
+            if deadline.remaining() < deadline.min_call_s:
+                if not budget_notified:
+                    budget_notified = True
+                    transcript.append({
+                        "agent": "System",
+                        "round": round_num + 1,
+                        "step": current_step,
+                        "message": (
+                            f"Simulation time limit of {max_simulation_time} seconds reached: "
+                            "remaining turns use simulated decisions instead of live responses."
+                        )
+                    })
+                focus_area = f"Focus on priorities relevant to {role.lower()}."
+                decision = DECISIONS[fallback_decisions[round_num][i]]
+                round_transcript.append({
+                    "agent": stakeholder_name,
                     "round": round_num + 1,
                     "step": current_step,
-                    "message": f"Simulation interrupted: Exceeded maximum time of {max_simulation_time} seconds."
+                    "message": template_message(stakeholder_name, role, focus_area, current_step, objective, persona["goals"], decision),
+                    "fallback": True
                 })
-                break
+                continue
 
-            stakeholder_name = persona["name"]
-            role = stakeholder_roles.get(stakeholder_name, "Team Member")
             stakeholder_input = json.dumps({
                 "agent_type": "stakeholder",
                 "name": stakeholder_name,
@@ -179,11 +213,11 @@ def simulate_debate_agent_iq(personas: List[Dict], dilemma: str, process_hint: s
                 "round": round_num + 1,
                 "step": current_step,
                 "objective": objective,
-                "context": cumulative_context[-500:],
+                "context": context.render(),
                 "dilemma": dilemma
             })
             try:
-                result = run_workflow(stakeholder_name, stakeholder_input)
+                result = run_workflow(stakeholder_name, stakeholder_input, round_num + 1)
                 response = json.loads(result)
                 round_transcript.append({
                     "agent": stakeholder_name,
@@ -200,19 +234,19 @@ def simulate_debate_agent_iq(personas: List[Dict], dilemma: str, process_hint: s
                 })
 
         transcript.extend(round_transcript)
-        cumulative_context += f"\nRound {round_num + 1} ({current_step}):\n"
-        for entry in round_transcript:
-            cumulative_context += f"- {entry['agent']}: {entry['message'][:100]}...\n"
+        context.add_round(round_num + 1, current_step, round_transcript)
 
     # Analysis Agent: Analyze the transcript
     analysis_input = json.dumps({
         "agent_type": "analysis",
         "transcript": transcript,
         "dilemma": dilemma,
-        "context": cumulative_context[-500:]
+        "context": context.render()
     })
     try:
-        analysis_result = run_workflow("Analysis Agent", analysis_input)
+        if deadline.remaining() < deadline.min_call_s:
+            raise DeadlineExceeded("Time budget exhausted")
+        analysis_result = run_workflow("Analysis Agent", analysis_input, rounds + 1)
         analysis_response = json.loads(analysis_result)
         transcript.append({
             "agent": "Analysis Agent",
@@ -229,6 +263,7 @@ def simulate_debate_agent_iq(personas: List[Dict], dilemma: str, process_hint: s
         })
 
     # Clean up
+    workflow_executor.shutdown(wait=False, cancel_futures=True)
     if os.path.exists(personas_file):
         os.remove(personas_file)
 
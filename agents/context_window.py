@@ -0,0 +1,109 @@
+import re
+from typing import List, Dict
+from config import CONTEXT_TOKEN_BUDGET, CONTEXT_SUMMARY_WORDS
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count (about four characters per token)."""
+    return (len(text) + 3) // 4
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Trim text to roughly max_tokens, cutting at a word boundary."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    cut = text[:max(0, max_tokens * 4 - 1)]
+    if " " in cut:
+        cut = cut[:cut.rfind(" ")]
+    return cut.rstrip(" ,;:") + "…"
+
+def summarize_entry(entry: Dict, max_words: int = CONTEXT_SUMMARY_WORDS) -> str:
+    """Compress a transcript entry to its speaker and opening sentence."""
+    message = " ".join(str(entry.get("message", "")).split())
+    first_sentence = re.split(r"(?<=[.!?])\s", message, maxsplit=1)[0]
+    words = first_sentence.split()
+    if len(words) > max_words:
+        first_sentence = " ".join(words[:max_words]) + "…"
+    return f"{entry.get('agent', 'Unknown')}: {first_sentence}"
+
+class DebateContext:
+    """
+    Rolling debate context that fits a fixed token budget.
+
+    The dilemma, process and scenarios are pinned at the top. The most recent round is kept verbatim,
+    and each earlier round is compressed into a one-line summary when the next round arrives. When the
+    summaries no longer fit, the oldest are dropped first, so the rendered prompt stays the same size
+    however many rounds have passed.
+    """
+
+    def __init__(self, dilemma: str, process_hint: str = "", scenarios: str = "", token_budget: int = CONTEXT_TOKEN_BUDGET, summary_words: int = CONTEXT_SUMMARY_WORDS):
+        """
+        Args:
+            dilemma (str): The decision dilemma, always kept in the context.
+            process_hint (str): Process and stakeholder details; skipped when identical to the dilemma.
+            scenarios (str): Optional alternative scenarios or external factors.
+            token_budget (int): Approximate token size of the rendered context.
+            summary_words (int): Maximum words kept per turn in an earlier-round summary.
+        """
+        pinned = [f"Dilemma: {dilemma}"]
+        if process_hint and process_hint != dilemma:
+            pinned.append(f"Process: {process_hint}")
+        if scenarios:
+            pinned.append(f"Scenarios: {scenarios}")
+        self.pinned = "\n".join(pinned)
+        self.token_budget = token_budget
+        self.summary_words = summary_words
+        self.round_summaries: List[str] = []
+        self.recent_label = ""
+        self.recent: List[Dict] = []
+
+    def add_round(self, round_num: int, step: str, entries: List[Dict]):
+        """Record a completed round, summarising the round it replaces as the most recent one."""
+        if self.recent:
+            self.round_summaries.append(
+                f"{self.recent_label}: " + "; ".join(summarize_entry(e, self.summary_words) for e in self.recent)
+            )
+        self.recent_label = f"Round {round_num} ({step})"
+        self.recent = list(entries)
+
+    def state(self) -> Dict:
+        """The rounds recorded so far, as plain data for a checkpoint."""
+        return {"round_summaries": list(self.round_summaries), "recent_label": self.recent_label, "recent": list(self.recent)}
+
+    def load_state(self, state: Dict):
+        """Restore the rounds recorded by state(); the pinned dilemma and budget are kept from construction."""
+        self.round_summaries = list(state.get("round_summaries", []))
+        self.recent_label = state.get("recent_label", "")
+        self.recent = list(state.get("recent", []))
+
+    def render(self) -> str:
+        """Render the context within the token budget."""
+        pinned = truncate_to_tokens(self.pinned, int(self.token_budget * 0.35))
+        remaining = self.token_budget - estimate_tokens(pinned)
+
+        recent = ""
+        if self.recent:
+            header = f"{self.recent_label}, latest turns:"
+            per_turn = max(8, (int(remaining * 0.6) - estimate_tokens(header)) // len(self.recent))
+            lines = [truncate_to_tokens(f"- {e.get('agent', 'Unknown')}: {e.get('message', '')}", per_turn) for e in self.recent]
+            recent = "\n".join([header] + lines)
+            remaining -= estimate_tokens(recent)
+
+        # Reserve room for the "Earlier rounds" header and omission note
+        remaining -= 12
+        summaries = []
+        for summary in reversed(self.round_summaries):
+            cost = estimate_tokens(summary) + 1
+            if cost > remaining:
+                break
+            summaries.insert(0, summary)
+            remaining -= cost
+        omitted = len(self.round_summaries) - len(summaries)
+
+        parts = [pinned]
+        if summaries or omitted:
+            earlier = ["Earlier rounds:"]
+            if omitted:
+                earlier.append(f"({omitted} earlier round{'s' if omitted != 1 else ''} omitted)")
+            parts.append("\n".join(earlier + summaries))
+        if recent:
+            parts.append(recent)
+        return "\n".join(parts)
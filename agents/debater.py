@@ -1,14 +1,23 @@
 import json
-import os
 import time
-import random
+import logging
 import numpy as np
-from openai import OpenAI, APITimeoutError
-from typing import List, Dict
-from config import DEBATE_ROUNDS, MAX_TOKENS, TIMEOUT_S
-from tenacity import retry, stop_after_attempt, wait_fixed
-
-def simulate_debate(personas: List[Dict], dilemma: str, process_hint: str, extracted: Dict, scenarios: str = "", rounds: int = DEBATE_ROUNDS, max_simulation_time: int = 180, simulation_type: str = "Grok 3 Beta Simulation") -> List[Dict]:
+from concurrent.futures import ThreadPoolExecutor, wait
+from openai import APITimeoutError
+from typing import Callable, List, Dict, Iterator, Optional
+from config import DEBATE_ROUNDS, MAX_TOKENS, TIMEOUT_S, MAX_CONCURRENT_TURNS, MC_RUNS, DEADLINE_FALLBACK_RUNS
+from utils.llm_cache import cached_completion
+from utils.llm_client import get_client, get_model
+from utils.telemetry import track_llm_call, telemetry_tags, current_tags
+from utils.deadline import Deadline, DeadlineExceeded
+from utils.runs import load_run, run_checkpoint, save_checkpoint, save_run
+from agents.monte_carlo import run_monte_carlo, extend_trajectory, template_message, DECISIONS
+from agents.game_theory import solve_game
+from agents.context_window import DebateContext
+
+logger = logging.getLogger(__name__)
+
+def simulate_debate(personas: List[Dict], dilemma: str, process_hint: str, extracted: Dict, scenarios: str = "", rounds: int = DEBATE_ROUNDS, max_simulation_time: int = 180, simulation_type: str = "Grok 3 Beta Simulation", max_concurrent_turns: int = MAX_CONCURRENT_TURNS, use_cache: bool = True, monte_carlo_runs: int = MC_RUNS, deadline: Optional[Deadline] = None, checkpoint: Optional[Dict] = None, on_checkpoint: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
     """
     Simulate a debate among stakeholder personas using the specified simulation method.
 
@@ -21,12 +30,47 @@ def simulate_debate(personas: List[Dict], dilemma: str, process_hint: str, extra
         rounds (int): Number of debate rounds.
         max_simulation_time (int): Maximum allowed time for the entire simulation in seconds.
         simulation_type (str): Type of simulation ("Grok 3 Beta Simulation", "Monte Carlo Simulation", "Game Theory Simulation").
+        max_concurrent_turns (int): Maximum number of persona turns requested in parallel within a round (Grok only).
+        use_cache (bool): Serve identical Grok turn requests from the LLM response cache.
+        monte_carlo_runs (int): Number of trajectories simulated by the Monte Carlo engine.
+        deadline (Optional[Deadline]): Shared time budget; defaults to one of max_simulation_time seconds.
+            Grok turns the budget cannot cover fall back to the Monte Carlo message template.
+        checkpoint (Optional[Dict]): State passed to on_checkpoint by an earlier run; the debate continues
+            after its last completed round, up to rounds in total, without repeating earlier turns.
+        on_checkpoint (Optional[Callable[[Dict], None]]): Called after every completed round with the
+            transcript so far, the context state, the engine's RNG state and the round cursor.
 
     Returns:
-        List[Dict]: Debate transcript with agent, round, step, and message.
+        List[Dict]: Debate transcript with agent, round, step, and message. Grok turns also carry their latency in seconds.
+    """
+    return list(iter_debate(
+        personas, dilemma, process_hint, extracted,
+        scenarios=scenarios,
+        rounds=rounds,
+        max_simulation_time=max_simulation_time,
+        simulation_type=simulation_type,
+        max_concurrent_turns=max_concurrent_turns,
+        use_cache=use_cache,
+        monte_carlo_runs=monte_carlo_runs,
+        deadline=deadline,
+        checkpoint=checkpoint,
+        on_checkpoint=on_checkpoint
+    ))
+
+def iter_debate(personas: List[Dict], dilemma: str, process_hint: str, extracted: Dict, scenarios: str = "", rounds: int = DEBATE_ROUNDS, max_simulation_time: int = 180, simulation_type: str = "Grok 3 Beta Simulation", max_concurrent_turns: int = MAX_CONCURRENT_TURNS, use_cache: bool = True, monte_carlo_runs: int = MC_RUNS, deadline: Optional[Deadline] = None, checkpoint: Optional[Dict] = None, on_checkpoint: Optional[Callable[[Dict], None]] = None) -> Iterator[Dict]:
     """
-    transcript = []
-    process_steps = extracted.get("process", [])
+    Stream a debate among stakeholder personas, yielding each transcript entry as soon as it exists.
+
+    Takes the same arguments as simulate_debate. Within a Grok round, entries are still yielded in
+    persona order, each as soon as it and every turn before it have completed. Closing the generator
+    (or simply abandoning it) cancels the rest of the run, including any queued Grok turns.
+    Per-call timeouts and retries are bounded by the deadline, so the run finishes within its budget.
+    When resuming from a checkpoint, only entries from the rounds after it are yielded.
+
+    Yields:
+        Dict: Transcript entry with agent, round, step, and message.
+    """
+    process_steps = list(extracted.get("process", []))
     if len(process_steps) < rounds:
         process_steps.extend([process_steps[-1]] * (rounds - len(process_steps)))
     process_steps = process_steps[:rounds]
@@ -63,99 +107,207 @@ def simulate_debate(personas: List[Dict], dilemma: str, process_hint: str, extra
         "Recommendation and Approval": "Finalize the recommendation and propose next steps."
     }
 
-    cumulative_context = f"Dilemma: {dilemma}\nProcess: {process_hint if isinstance(process_hint, str) else json.dumps(process_hint)}\n"
-    if scenarios:
-        cumulative_context += f"Scenarios: {scenarios}\n"
-
-    start_time = time.time()
+    context = DebateContext(dilemma, process_hint if isinstance(process_hint, str) else json.dumps(process_hint), scenarios)
+
+    deadline = deadline if deadline is not None else Deadline(max_simulation_time)
+
+    # Everything a later run needs to carry on after the last completed round
+    transcript = list(checkpoint["transcript"]) if checkpoint else []
+    start_round = checkpoint["next_round"] if checkpoint else 0
+    engine = dict(checkpoint.get("engine", {})) if checkpoint else {}
+    if checkpoint:
+        context.load_state(checkpoint["context"])
+    rng = np.random.default_rng()
+    if engine.get("rng"):
+        rng.bit_generator.state = engine["rng"]
+
+    def emit(entry: Dict) -> Dict:
+        transcript.append(entry)
+        return entry
+
+    def add_turn(round_num: int, current_step: str, round_transcript: List[Dict], entry: Dict) -> Dict:
+        """Record a turn; the round's last one completes the round and checkpoints it before it is handed over."""
+        round_transcript.append(entry)
+        transcript.append(entry)
+        if len(round_transcript) == len(filtered_personas):
+            context.add_round(round_num + 1, current_step, round_transcript)
+            save_round(round_num)
+        return entry
+
+    def save_round(round_num: int):
+        if on_checkpoint is None:
+            return
+        engine["rng"] = rng.bit_generator.state
+        try:
+            on_checkpoint({
+                "simulation_type": simulation_type,
+                "rounds": rounds,
+                "next_round": round_num + 1,
+                "transcript": list(transcript),
+                "context": context.state(),
+                "engine": dict(engine)
+            })
+        except Exception as e:
+            logger.warning(f"Failed to checkpoint round {round_num + 1}: {str(e)}")
 
     if simulation_type == "Grok 3 Beta Simulation":
-        client = OpenAI(base_url="https://api.x.ai/v1", api_key=os.getenv("XAI_API_KEY"))
-
-        @retry(stop=stop_after_attempt(3), wait=wait_fixed(2))
+        client = get_client()
+
+        # A cheap Monte Carlo run supplies the decisions for turns the time budget cannot cover
+        if "decisions" not in engine:
+            fallback_runs = run_monte_carlo(filtered_personas, rounds, runs=DEADLINE_FALLBACK_RUNS, rng=rng)["representative_runs"]
+            engine["decisions"] = fallback_runs[0]["decisions"] if fallback_runs else []
+        engine["decisions"] = extend_trajectory(filtered_personas, engine["decisions"], rounds, rng)
+        fallback_decisions = engine["decisions"]
+
+        def fallback_turn(index: int, round_num: int, current_step: str, objective: str) -> Dict:
+            persona = filtered_personas[index]
+            role = stakeholder_roles.get(persona["name"], "Team Member")
+            focus_area = role_focus.get(role, f"Focus on priorities relevant to {role.lower()}.")
+            decision = DECISIONS[fallback_decisions[round_num][index]]
+            return {
+                "agent": persona["name"],
+                "round": round_num + 1,
+                "step": current_step,
+                "message": template_message(persona["name"], role, focus_area, current_step, objective, persona["goals"], decision),
+                "fallback": True
+            }
+
+        @deadline.retry(attempts=3, wait_s=2)
         def make_api_call(prompt):
-            return client.chat.completions.create(
-                model="grok-3-beta",
+            return cached_completion(
+                client,
+                use_cache=use_cache,
+                validate=json.loads,
+                model=get_model(),
                 messages=[
                     {"role": "system", "content": "You are simulating a stakeholder in a debate."},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.7,
                 max_tokens=600,
-                timeout=30
+                timeout=deadline.timeout(30)
             )
 
-        for round_num in range(rounds):
-            elapsed_time = time.time() - start_time
-            if elapsed_time > max_simulation_time:
-                transcript.append({
-                    "agent": "System",
-                    "round": round_num + 1,
-                    "step": process_steps[round_num] if round_num < len(process_steps) else "Unknown",
-                    "message": f"Simulation interrupted: Exceeded maximum time of {max_simulation_time} seconds."
-                })
-                break
-
-            current_step = process_steps[round_num]
-            step_key = current_step.split("(")[0].strip()
-            objective = process_objectives.get(step_key, "Continue the discussion.")
-
-            round_transcript = []
-            for persona in filtered_personas:
-                elapsed_time = time.time() - start_time
-                if elapsed_time > max_simulation_time:
-                    transcript.append({
-                        "agent": "System",
-                        "round": round_num + 1,
-                        "step": current_step,
-                        "message": f"Simulation interrupted: Exceeded maximum time of {max_simulation_time} seconds."
-                    })
-                    break
-
-                stakeholder_name = persona["name"]
-                role = stakeholder_roles.get(stakeholder_name, "Team Member")
-                focus_area = role_focus.get(role, f"Focus on priorities relevant to {role.lower()}.")
-
-                prompt = (
-                    f"You are {stakeholder_name}, role: {role}. Expertise: {focus_area}\n"
-                    f"Goals: {', '.join(persona['goals'])}\nBiases: {', '.join(persona['biases'])}\nTone: {persona['tone']}\n"
-                    f"Step: {current_step} (Round {round_num + 1})\nObjective: {objective}\n"
-                    f"Context (last 500 chars): {cumulative_context[-500:]}\n"
-                    "Provide a 150–200 word response in JSON format with keys 'agent', 'round', 'step', 'message'."
-                )
+        def run_turn(index: int, round_num: int, current_step: str, objective: str, context: str, queued_at: float, tags: Dict) -> Dict:
+            persona = filtered_personas[index]
+            stakeholder_name = persona["name"]
+            role = stakeholder_roles.get(stakeholder_name, "Team Member")
+            focus_area = role_focus.get(role, f"Focus on priorities relevant to {role.lower()}.")
+
+            prompt = (
+                f"You are {stakeholder_name}, role: {role}. Expertise: {focus_area}\n"
+                f"Goals: {', '.join(persona['goals'])}\nBiases: {', '.join(persona['biases'])}\nTone: {persona['tone']}\n"
+                f"Step: {current_step} (Round {round_num + 1})\nObjective: {objective}\n"
+                f"Context:\n{context}\n"
+                "Provide a 150–200 word response in JSON format with keys 'agent', 'round', 'step', 'message'."
+            )
 
-                try:
+            turn_start = time.time()
+            try:
+                with telemetry_tags(**tags), track_llm_call("debate", stakeholder_name, round_num + 1, queued_at):
                     completion = make_api_call(prompt)
                     response = json.loads(completion.choices[0].message.content)
-                    if all(key in response for key in ["agent", "round", "step", "message"]):
-                        round_transcript.append(response)
-                    else:
+                    if not all(key in response for key in ["agent", "round", "step", "message"]):
                         raise ValueError("Invalid JSON structure")
-                except APITimeoutError:
-                    round_transcript.append({
-                        "agent": stakeholder_name,
-                        "round": round_num + 1,
-                        "step": current_step,
-                        "message": f"As {stakeholder_name}, I focus on {focus_area.lower()}. Response timed out."
-                    })
-                except Exception as e:
-                    round_transcript.append({
+                entry = response
+            except DeadlineExceeded:
+                entry = fallback_turn(index, round_num, current_step, objective)
+            except APITimeoutError:
+                entry = {
+                    "agent": stakeholder_name,
+                    "round": round_num + 1,
+                    "step": current_step,
+                    "message": f"As {stakeholder_name}, I focus on {focus_area.lower()}. Response timed out."
+                }
+            except Exception as e:
+                if deadline.remaining() < deadline.min_call_s:
+                    # The last attempt was cut short by the budget rather than failing on its own
+                    entry = fallback_turn(index, round_num, current_step, objective)
+                else:
+                    entry = {
                         "agent": stakeholder_name,
                         "round": round_num + 1,
                         "step": current_step,
                         "message": f"Error generating response: {str(e)}"
-                    })
-
-            transcript.extend(round_transcript)
-            cumulative_context += f"\nRound {round_num + 1} ({current_step}):\n"
-            for entry in round_transcript:
-                cumulative_context += f"- {entry['agent']}: {entry['message'][:100]}...\n"
+                    }
+            entry["latency"] = round(time.time() - turn_start, 3)
+            logger.info(f"Round {round_num + 1} turn for {stakeholder_name} took {entry['latency']:.2f}s")
+            return entry
+
+        # Every persona in a round sees the same context, so a round's turns are
+        # independent and can be fanned out; results are collected in persona order.
+        executor = ThreadPoolExecutor(max_workers=max(1, min(max_concurrent_turns, len(filtered_personas))))
+        budget_notified = False
+        try:
+            for round_num in range(start_round, rounds):
+                current_step = process_steps[round_num]
+                step_key = current_step.split("(")[0].strip()
+                objective = process_objectives.get(step_key, "Continue the discussion.")
+
+                round_start = time.time()
+                round_context = context.render()
+                futures = []
+                if deadline.remaining() >= deadline.min_call_s:
+                    futures = [
+                        executor.submit(run_turn, i, round_num, current_step, objective, round_context, time.time(), current_tags())
+                        for i in range(len(filtered_personas))
+                    ]
+                round_transcript = []
+                out_of_time = False
+                for i in range(len(filtered_personas)):
+                    entry = None
+                    if futures:
+                        if not out_of_time:
+                            wait([futures[i]], timeout=deadline.remaining())
+                        if futures[i].done() and not futures[i].cancelled():
+                            # Turns that finished before the time ran out are kept
+                            entry = futures[i].result()
+                        elif not out_of_time:
+                            # Out of time: drop queued turns; running ones are already bounded by the deadline
+                            out_of_time = True
+                            for future in futures:
+                                if not future.done():
+                                    future.cancel()
+                    if entry is None:
+                        entry = fallback_turn(i, round_num, current_step, objective)
+                    if entry.get("fallback") and not budget_notified:
+                        budget_notified = True
+                        yield emit({
+                            "agent": "System",
+                            "round": round_num + 1,
+                            "step": current_step,
+                            "message": (
+                                f"Simulation time limit of {max_simulation_time} seconds reached: "
+                                "remaining turns use simulated decisions instead of live responses."
+                            )
+                        })
+                    yield add_turn(round_num, current_step, round_transcript, entry)
+                fallback_count = sum(1 for e in round_transcript if e.get("fallback"))
+                logger.info(f"Round {round_num + 1} completed {len(round_transcript) - fallback_count}/{len(round_transcript)} live turns in {time.time() - round_start:.2f}s")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
 
     elif simulation_type == "Monte Carlo Simulation":
-        for round_num in range(rounds):
-            elapsed_time = time.time() - start_time
-            if elapsed_time > max_simulation_time:
-                transcript.append({
+        # Simulate the whole outcome distribution up front; the transcript renders its median run
+        if "monte_carlo" not in engine:
+            engine["monte_carlo"] = run_monte_carlo(
+                filtered_personas,
+                rounds,
+                runs=monte_carlo_runs,
+                time_budget=deadline.remaining(),
+                rng=rng
+            )
+            representative = engine["monte_carlo"]["representative_runs"]
+            engine["decisions"] = representative[0]["decisions"] if representative else []
+        monte_carlo = engine["monte_carlo"]
+        # A run extended past its original length continues the same trajectory
+        engine["decisions"] = extend_trajectory(filtered_personas, engine["decisions"], rounds, rng)
+        sample_run = engine["decisions"]
+
+        for round_num in range(start_round, rounds):
+            if deadline.expired():
+                yield emit({
                     "agent": "System",
                     "round": round_num + 1,
                     "step": process_steps[round_num] if round_num < len(process_steps) else "Unknown",
@@ -168,54 +320,52 @@ def simulate_debate(personas: List[Dict], dilemma: str, process_hint: str, extra
             objective = process_objectives.get(step_key, "Continue the discussion.")
 
             round_transcript = []
-            for persona in filtered_personas:
+            for i, persona in enumerate(filtered_personas):
                 stakeholder_name = persona["name"]
                 role = stakeholder_roles.get(stakeholder_name, "Team Member")
                 focus_area = role_focus.get(role, f"Focus on priorities relevant to {role.lower()}.")
 
-                # Assign probabilities based on biases and goals
-                agree_prob = 0.5
-                if "confirmation bias" in persona["biases"]:
-                    agree_prob += 0.2
-                if "status quo bias" in persona["biases"]:
-                    agree_prob -= 0.1
-                decision = np.random.choice(
-                    ["agree", "disagree", "compromise"],
-                    p=[agree_prob, 0.3 - agree_prob / 2, 0.7 - agree_prob / 2]
-                )
+                decision = DECISIONS[sample_run[round_num][i]]
+                message = template_message(stakeholder_name, role, focus_area, current_step, objective, persona["goals"], decision)
 
-                message = (
-                    f"As {stakeholder_name} ({role}), I {decision} on the proposed approach for {current_step}. "
-                    f"My focus is {focus_area.lower()}. {objective} "
-                    f"Given my goals ({', '.join(persona['goals'])}), I believe this {decision} aligns with our priorities."
-                )
-
-                round_transcript.append({
+                entry = {
                     "agent": stakeholder_name,
                     "round": round_num + 1,
                     "step": current_step,
                     "message": message
-                })
-
-            transcript.extend(round_transcript)
-            cumulative_context += f"\nRound {round_num + 1} ({current_step}):\n"
-            for entry in round_transcript:
-                cumulative_context += f"- {entry['agent']}: {entry['message'][:100]}...\n"
+                }
+                yield add_turn(round_num, current_step, round_transcript, entry)
+
+        if monte_carlo["runs"]:
+            agreement = monte_carlo["agreement"]
+            yield {
+                "agent": "System",
+                "round": rounds,
+                "step": "Monte Carlo Summary",
+                "message": (
+                    f"Across {monte_carlo['runs']:,} simulated debates, final-round agreement averaged {agreement['mean']:.0%} "
+                    f"(95% CI {agreement['ci95'][0]:.1%}–{agreement['ci95'][1]:.1%}) and compromise {monte_carlo['compromise']['mean']:.0%}; "
+                    f"consensus was reached in {monte_carlo['consensus_rate']:.0%} of runs. The transcript above shows the median run."
+                ),
+                "monte_carlo": monte_carlo
+            }
 
     elif simulation_type == "Game Theory Simulation":
-        # Simple Nash equilibrium simulation
-        strategies = ["cooperate", "defect"]
-        payoff_matrix = {
-            ("cooperate", "cooperate"): (3, 3),
-            ("cooperate", "defect"): (0, 5),
-            ("defect", "cooperate"): (5, 0),
-            ("defect", "defect"): (1, 1)
-        }
-
-        for round_num in range(rounds):
-            elapsed_time = time.time() - start_time
-            if elapsed_time > max_simulation_time:
-                transcript.append({
+        # Solve the N-player game once; each round replays one step of the best-response path
+        try:
+            game = solve_game(filtered_personas, rounds) if filtered_personas else None
+        except ValueError as e:
+            yield {
+                "agent": "System",
+                "round": 1,
+                "step": process_steps[0] if process_steps else "Unknown",
+                "message": f"Game theory simulation failed: {str(e)}"
+            }
+            return
+
+        for round_num in range(start_round, rounds if game else 0):
+            if deadline.expired():
+                yield emit({
                     "agent": "System",
                     "round": round_num + 1,
                     "step": process_steps[round_num] if round_num < len(process_steps) else "Unknown",
@@ -233,28 +383,82 @@ def simulate_debate(personas: List[Dict], dilemma: str, process_hint: str, extra
                 role = stakeholder_roles.get(stakeholder_name, "Team Member")
                 focus_area = role_focus.get(role, f"Focus on priorities relevant to {role.lower()}.")
 
-                # Choose strategy based on biases
-                strategy = "cooperate" if "collaborative" in persona["psychological_traits"] else random.choice(strategies)
-                opponent = filtered_personas[(i + 1) % len(filtered_personas)] if len(filtered_personas) > 1 else persona
-                opponent_strategy = "cooperate" if "collaborative" in opponent["psychological_traits"] else random.choice(strategies)
-
-                payoff = payoff_matrix.get((strategy, opponent_strategy), (1, 1))[0]
+                strategy = game["path"][round_num]["profile"][i]
+                payoff = game["path"][round_num]["payoffs"][i]
                 message = (
                     f"As {stakeholder_name} ({role}), I choose to {strategy} in {current_step}. "
                     f"My focus is {focus_area.lower()}. {objective} "
-                    f"Given my goals ({', '.join(persona['goals'])}), this strategy yields a payoff of {payoff}."
+                    f"Given my goals ({', '.join(persona['goals'])}), this strategy yields a payoff of {payoff:.2f}."
                 )
 
-                round_transcript.append({
+                entry = {
                     "agent": stakeholder_name,
                     "round": round_num + 1,
                     "step": current_step,
                     "message": message
-                })
+                }
+                yield add_turn(round_num, current_step, round_transcript, entry)
+
+        if game:
+            mixed = game["mixed_equilibrium"]
+            yield {
+                "agent": "System",
+                "round": rounds,
+                "step": "Game Theory Summary",
+                "message": (
+                    f"The game has {game['pure_equilibrium_count']} pure-strategy Nash equilibria"
+                    + (f"; the highest-welfare one is {', '.join(game['pure_equilibria'][0]['profile'])}" if game["pure_equilibria"] else "")
+                    + f". An approximate mixed equilibrium was found (epsilon {mixed['epsilon']:.3f}). "
+                    + ("The debate settled into an equilibrium." if game["converged"] else "The debate had not reached an equilibrium by the final round.")
+                ),
+                "game_theory": game
+            }
+
+def iter_resumed_debate(run_id: str, rounds: Optional[int] = None, max_simulation_time: Optional[int] = None, **kwargs) -> Iterator[Dict]:
+    """
+    Continue a saved run from its last completed round, checkpointing every further round to the run.
 
-            transcript.extend(round_transcript)
-            cumulative_context += f"\nRound {round_num + 1} ({current_step}):\n"
-            for entry in round_transcript:
-                cumulative_context += f"- {entry['agent']}: {entry['message'][:100]}...\n"
+    Args:
+        run_id (str): Run saved with utils.runs, checkpointed by an earlier iter_debate.
+        rounds (Optional[int]): Total rounds wanted; more than the run was started with extends it.
+            Defaults to the run's original round count.
+        max_simulation_time (Optional[int]): Time budget for the remaining rounds; defaults to the run's own.
+        **kwargs: Any other iter_debate argument, e.g. use_cache or max_concurrent_turns.
+
+    Yields:
+        Dict: Transcript entries of the rounds after the checkpoint.
+    """
+    run = load_run(run_id)
+    if run is None:
+        raise ValueError(f"Unknown run {run_id}")
+    checkpoint = run_checkpoint(run)
+    inputs = run["inputs"] or {}
+    yield from iter_debate(
+        run["personas"] or [],
+        inputs.get("dilemma", ""),
+        inputs.get("process_hint", inputs.get("dilemma", "")),
+        run["extracted"] or {},
+        scenarios=inputs.get("scenarios", ""),
+        rounds=rounds or (checkpoint["rounds"] if checkpoint else DEBATE_ROUNDS),
+        max_simulation_time=max_simulation_time or inputs.get("max_simulation_time", 180),
+        simulation_type=run["simulation_type"],
+        checkpoint=checkpoint,
+        on_checkpoint=lambda state: save_checkpoint(run_id, state),
+        **kwargs
+    )
+
+def resume_debate(run_id: str, rounds: Optional[int] = None, max_simulation_time: Optional[int] = None, **kwargs) -> List[Dict]:
+    """
+    Finish (or extend) a saved run without repeating the rounds it already completed.
 
+    Takes the same arguments as iter_resumed_debate. The run's stored transcript is updated as rounds
+    complete and once more at the end.
+
+    Returns:
+        List[Dict]: The full transcript: the checkpointed rounds followed by the new ones.
+    """
+    run = load_run(run_id)
+    checkpoint = run_checkpoint(run) if run else None
+    transcript = (checkpoint["transcript"] if checkpoint else []) + list(iter_resumed_debate(run_id, rounds, max_simulation_time, **kwargs))
+    save_run({"id": run_id, "transcript": transcript, "status": "simulated"})
     return transcript
@@ -1,12 +1,13 @@
 
 import json
-import os
-from openai import OpenAI
 from typing import Dict, List
 from config import STAKEHOLDER_ANALYSIS
 from tenacity import retry, stop_after_attempt, wait_fixed
+from utils.llm_cache import cached_completion
+from utils.llm_client import get_client, get_model
+from utils.telemetry import track_llm_call
 
-def extract_decision_structure(dilemma: str, process_hint: str, scenarios: str = "") -> Dict:
+def extract_decision_structure(dilemma: str, process_hint: str, scenarios: str = "", use_cache: bool = True, excerpts: str = "") -> Dict:
     """
     Extract a decision structure from user inputs using xAI's Grok-3-Beta.
 
@@ -14,14 +15,13 @@ def extract_decision_structure(dilemma: str, process_hint: str, scenarios: str =
         dilemma (str): The decision context provided by the user.
         process_hint (str): Details about the process and/or stakeholders.
         scenarios (str): Optional alternative scenarios or external factors.
+        use_cache (bool): Serve identical requests from the LLM response cache.
+        excerpts (str): Supporting document passages, e.g. from agents.retrieval.select_passages.
 
     Returns:
         Dict: Extracted decision structure.
     """
-    client = OpenAI(
-        base_url="https://api.x.ai/v1",
-        api_key=os.getenv("XAI_API_KEY")
-    )
+    client = get_client()
 
     prompt = (
         "Extract a decision structure in JSON format with:\n"
@@ -30,13 +30,22 @@ def extract_decision_structure(dilemma: str, process_hint: str, scenarios: str =
         "3. 'issues': 2–3 key issues.\n"
         "4. 'process': 3–5 process steps.\n"
         "5. 'external_factors': 1–2 factors.\n"
-        f"Inputs:\nDilemma: {dilemma}\nProcess Hint: {process_hint}\nScenarios: {scenarios}\n"
+        f"Inputs:\nDilemma: {dilemma}\n"
     )
+    # The UI passes the same text as dilemma and process hint; include it only once
+    if process_hint and process_hint != dilemma:
+        prompt += f"Process Hint: {process_hint}\n"
+    prompt += f"Scenarios: {scenarios}\n"
+    if excerpts:
+        prompt += f"Supporting Document Excerpts:\n{excerpts}\n"
 
     @retry(stop=stop_after_attempt(3), wait=wait_fixed(2))
     def make_api_call():
-        return client.chat.completions.create(
-            model="grok-3-beta",
+        return cached_completion(
+            client,
+            use_cache=use_cache,
+            validate=json.loads,
+            model=get_model(),
             messages=[
                 {"role": "system", "content": "You are extracting decision structures."},
                 {"role": "user", "content": prompt}
@@ -47,8 +56,9 @@ def extract_decision_structure(dilemma: str, process_hint: str, scenarios: str =
         )
 
     try:
-        completion = make_api_call()
-        result = json.loads(completion.choices[0].message.content)
+        with track_llm_call("extract"):
+            completion = make_api_call()
+            result = json.loads(completion.choices[0].message.content)
 
         decision_type = result.get("decision_type", "Strategic (Assumed)")
         stakeholders = result.get("stakeholders", [])
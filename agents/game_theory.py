@@ -0,0 +1,233 @@
+import numpy as np
+from typing import List, Dict, Optional, Tuple
+from config import GT_STRATEGIES, GT_PUBLIC_GOODS_MULTIPLIER, GT_MAX_TENSOR_ENTRIES, GT_MIXED_ITERATIONS, GT_EQUILIBRIUM_TOLERANCE
+
+# How much each strategy contributes to the shared outcome
+CONTRIBUTION = {"cooperate": 1.0, "compromise": 0.5, "defect": 0.0}
+
+def _text(persona: Dict, *fields: str) -> str:
+    parts = []
+    for field in fields:
+        value = persona.get(field, [])
+        parts.extend(value if isinstance(value, list) else [value])
+    return " ".join(str(p) for p in parts).lower()
+
+def persona_parameters(personas: List[Dict]) -> Dict[str, np.ndarray]:
+    """
+    Derive each persona's payoff parameters from their traits, goals and biases.
+
+    Returns:
+        Dict[str, np.ndarray]: Per-persona weight on the collective outcome ("alpha"), private cost of
+        contributing ("cost"), preference for matching others ("conformity") and a per-strategy bonus
+        ("bonus", personas × strategies).
+    """
+    n = len(personas)
+    alpha = np.ones(n)
+    cost = np.ones(n)
+    conformity = np.full(n, 0.5)
+    bonus = np.zeros((n, len(GT_STRATEGIES)))
+    for i, persona in enumerate(personas):
+        traits = _text(persona, "psychological_traits", "historical_behavior")
+        goals = _text(persona, "goals")
+        biases = _text(persona, "biases")
+        if "collaborative" in traits or "consensus" in traits or any(w in goals for w in ["unity", "consensus", "allian", "collabor"]):
+            alpha[i] += 0.5
+        if "competitive" in traits or "assertive" in traits or "zero-sum" in biases:
+            alpha[i] -= 0.4
+        if "risk-averse" in traits or "cautious" in traits or "cost-avoidance" in biases:
+            cost[i] += 0.2
+        if "optimism bias" in biases:
+            cost[i] -= 0.2
+        if "groupthink" in biases:
+            conformity[i] += 0.5
+        if "status quo bias" in biases and "compromise" in GT_STRATEGIES:
+            bonus[i, GT_STRATEGIES.index("compromise")] += 0.3
+    return {"alpha": alpha, "cost": cost, "conformity": conformity, "bonus": bonus}
+
+def build_payoff_tensor(personas: List[Dict], multiplier: float = GT_PUBLIC_GOODS_MULTIPLIER) -> np.ndarray:
+    """
+    Build the N-player payoff tensor for a public-goods game with conformity pressure.
+
+    Player i's payoff at a strategy profile is its weighted share of the collective outcome, minus its
+    private cost of contributing, plus a bonus for agreeing with the other players and any strategy bias.
+
+    Args:
+        personas (List[Dict]): Players, in order.
+        multiplier (float): Return on the group's mean contribution.
+
+    Returns:
+        np.ndarray: Tensor of shape (N, S, ..., S) where entry [i, s_1, ..., s_N] is player i's payoff.
+    """
+    n = len(personas)
+    s = len(GT_STRATEGIES)
+    if n * s ** n > GT_MAX_TENSOR_ENTRIES:
+        raise ValueError(f"Game with {n} players and {s} strategies exceeds {GT_MAX_TENSOR_ENTRIES} payoff entries")
+    params = persona_parameters(personas)
+    expand = (slice(None),) + (None,) * n
+
+    profiles = np.indices((s,) * n)
+    contributions = np.array([CONTRIBUTION.get(name, 0.0) for name in GT_STRATEGIES])[profiles]
+    collective = multiplier * contributions.mean(axis=0)
+    counts = np.stack([(profiles == k).sum(axis=0) for k in range(s)])
+    matching = np.take_along_axis(counts, profiles, axis=0) - 1
+
+    payoffs = params["alpha"][expand] * collective[None] - params["cost"][expand] * contributions
+    payoffs += params["conformity"][expand] * matching / max(1, n - 1)
+    payoffs += np.take_along_axis(params["bonus"].reshape((n, s) + (1,) * (n - 1)), profiles, axis=1)
+    return payoffs
+
+def pure_nash_equilibria(payoffs: np.ndarray, tol: float = GT_EQUILIBRIUM_TOLERANCE) -> np.ndarray:
+    """Return every pure-strategy Nash equilibrium as a (K × N) array of strategy indices."""
+    n = payoffs.shape[0]
+    stable = np.ones(payoffs.shape[1:], dtype=bool)
+    for i in range(n):
+        stable &= payoffs[i] >= payoffs[i].max(axis=i, keepdims=True) - tol
+    return np.argwhere(stable)
+
+def profile_payoffs(payoffs: np.ndarray, profile: np.ndarray) -> np.ndarray:
+    """Payoff of every player at a pure strategy profile."""
+    return payoffs[(slice(None),) + tuple(profile)]
+
+def deviation_payoffs(payoffs: np.ndarray, profile: np.ndarray) -> np.ndarray:
+    """
+    Payoff each player would get from each of its strategies with everyone else held at profile.
+
+    Returns:
+        np.ndarray: (N × S) matrix, gathered with a single fancy-indexing operation.
+    """
+    n, s = payoffs.shape[0], payoffs.shape[1]
+    index = np.tile(profile, (n * s, 1))
+    players = np.repeat(np.arange(n), s)
+    index[np.arange(n * s), players] = np.tile(np.arange(s), n)
+    return payoffs[(players,) + tuple(index.T)].reshape(n, s)
+
+def expected_payoffs(payoffs: np.ndarray, sigma: np.ndarray) -> np.ndarray:
+    """
+    Expected payoff of each player's pure strategies when the others play mixed strategies sigma.
+
+    Args:
+        payoffs (np.ndarray): Payoff tensor (N, S, ..., S).
+        sigma (np.ndarray): (N × S) mixed strategies.
+
+    Returns:
+        np.ndarray: (N × S) expected payoffs.
+    """
+    n = payoffs.shape[0]
+    result = np.empty(sigma.shape)
+    for i in range(n):
+        tensor = payoffs[i]
+        # Contract from the last axis down so the remaining axis indices never shift
+        for j in reversed(range(n)):
+            if j != i:
+                tensor = np.tensordot(tensor, sigma[j], axes=([j], [0]))
+        result[i] = tensor
+    return result
+
+def mixed_nash_equilibrium(payoffs: np.ndarray, iterations: int = GT_MIXED_ITERATIONS, tol: float = GT_EQUILIBRIUM_TOLERANCE, sigma: Optional[np.ndarray] = None) -> Tuple[np.ndarray, float]:
+    """
+    Approximate a mixed Nash equilibrium with exponential-weights (replicator) learning.
+
+    Args:
+        payoffs (np.ndarray): Payoff tensor (N, S, ..., S).
+        iterations (int): Maximum learning iterations.
+        tol (float): Stop once no player can gain more than this by deviating.
+        sigma (Optional[np.ndarray]): Starting mixed strategies; uniform when omitted.
+
+    Returns:
+        Tuple[np.ndarray, float]: (N × S) mixed strategies and their epsilon (largest gain from deviating).
+    """
+    n, s = payoffs.shape[0], payoffs.shape[1]
+    sigma = np.full((n, s), 1.0 / s) if sigma is None else sigma.copy()
+    scale = max(1e-9, float(payoffs.max() - payoffs.min()))
+    average = np.zeros_like(sigma)
+    best_sigma, best_epsilon = sigma, np.inf
+    for t in range(1, iterations + 1):
+        values = expected_payoffs(payoffs, sigma)
+        epsilon = float((values.max(axis=1) - (values * sigma).sum(axis=1)).max())
+        if epsilon < best_epsilon:
+            best_sigma, best_epsilon = sigma, epsilon
+        if epsilon <= tol:
+            break
+        step = 1.0 / (scale * np.sqrt(t))
+        weights = sigma * np.exp(step * (values - values.max(axis=1, keepdims=True)))
+        sigma = weights / weights.sum(axis=1, keepdims=True)
+        average += sigma
+    # Time-averaged play converges even when the last iterate cycles
+    if best_epsilon > tol and average.any():
+        average /= average.sum(axis=1, keepdims=True)
+        values = expected_payoffs(payoffs, average)
+        epsilon = float((values.max(axis=1) - (values * average).sum(axis=1)).max())
+        if epsilon < best_epsilon:
+            best_sigma, best_epsilon = average, epsilon
+    return best_sigma, best_epsilon
+
+def best_response_path(payoffs: np.ndarray, start: np.ndarray, steps: int, tol: float = GT_EQUILIBRIUM_TOLERANCE) -> List[np.ndarray]:
+    """
+    Follow best-response dynamics from start.
+
+    Every player with something to gain switches to its best response at once; if that revisits an
+    earlier profile (a cycle), only the player with the largest gain moves instead.
+
+    Returns:
+        List[np.ndarray]: The start profile followed by the profile after each move (length steps).
+    """
+    profile = start.copy()
+    path = [profile.copy()] if steps > 0 else []
+    seen = {tuple(profile)}
+    for _ in range(steps - 1):
+        deviations = deviation_payoffs(payoffs, profile)
+        current = deviations[np.arange(len(profile)), profile]
+        gains = deviations.max(axis=1) - current
+        if gains.max() > tol:
+            candidate = np.where(gains > tol, deviations.argmax(axis=1), profile)
+            if tuple(candidate) in seen:
+                candidate = profile.copy()
+                mover = int(gains.argmax())
+                candidate[mover] = deviations[mover].argmax()
+            profile = candidate
+            seen.add(tuple(profile))
+        path.append(profile.copy())
+    return path
+
+def initial_profile(personas: List[Dict], payoffs: np.ndarray) -> np.ndarray:
+    """Opening strategies: collaborative personas cooperate, the rest best-respond to uniform play."""
+    uniform = np.full((payoffs.shape[0], payoffs.shape[1]), 1.0 / payoffs.shape[1])
+    profile = expected_payoffs(payoffs, uniform).argmax(axis=1)
+    collaborative = np.array(["collaborative" in _text(p, "psychological_traits") for p in personas])
+    profile[collaborative] = GT_STRATEGIES.index("cooperate")
+    return profile
+
+def solve_game(personas: List[Dict], rounds: int) -> Dict:
+    """
+    Build the game for a set of personas, solve it and compute the equilibrium path for a debate.
+
+    Args:
+        personas (List[Dict]): Players, in order.
+        rounds (int): Number of debate rounds to produce a path for.
+
+    Returns:
+        Dict: Strategies, pure equilibria, the approximate mixed equilibrium and the per-round path
+        with every player's strategy and payoff.
+    """
+    payoffs = build_payoff_tensor(personas)
+    pure = pure_nash_equilibria(payoffs)
+    pure_payoffs = payoffs[(slice(None),) + tuple(pure.T)].T
+    sigma, epsilon = mixed_nash_equilibrium(payoffs)
+    path = best_response_path(payoffs, initial_profile(personas, payoffs), rounds)
+    path_payoffs = [profile_payoffs(payoffs, p) for p in path]
+    final_is_equilibrium = bool(len(pure)) and bool((pure == path[-1]).all(axis=1).any()) if path else False
+    return {
+        "strategies": list(GT_STRATEGIES),
+        "players": [p.get("name", f"Player {i + 1}") for i, p in enumerate(personas)],
+        "pure_equilibria": [
+            {"profile": [GT_STRATEGIES[k] for k in p], "welfare": float(w.sum())}
+            for p, w in sorted(zip(pure, pure_payoffs), key=lambda item: -item[1].sum())[:20]
+        ],
+        "pure_equilibrium_count": int(len(pure)),
+        "mixed_equilibrium": {"strategies": sigma.tolist(), "epsilon": epsilon},
+        "path": [
+            {"round": r + 1, "profile": [GT_STRATEGIES[k] for k in profile], "payoffs": payoff.tolist()}
+            for r, (profile, payoff) in enumerate(zip(path, path_payoffs))
+        ],
+        "converged": final_is_equilibrium
+    }
@@ -0,0 +1,297 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from config import JOB_POLL_INTERVAL_S, JOB_EVENT_FLUSH_S, JOB_HEARTBEAT_S, JOB_STALE_S, SUMMARY_PREFETCH
+import utils.db as db
+from utils.jobs import init_jobs, claim_job, add_events, finish_job, fail_stale_jobs, add_call_records
+from utils.runs import init_runs, load_run, run_checkpoint, save_checkpoint, save_run
+from utils.telemetry import get_telemetry, telemetry_tags
+from utils.transcript import Transcript
+from agents.debater import iter_debate, iter_resumed_debate
+from agents.summarizer import RoundSummarizer, generate_summary_and_suggestion
+from agents.transcript_analyzer import analyze_transcript
+from agents.pipeline import run_pipeline, reset_process_state
+from agents.sweep import iter_sweep, compare_variants
+
+logger = logging.getLogger(__name__)
+
+# iter_debate arguments a simulate job may set
+DEBATE_OPTIONS = ["scenarios", "rounds", "max_simulation_time", "simulation_type", "max_concurrent_turns", "use_cache", "monte_carlo_runs"]
+# iter_sweep arguments a sweep job may set
+SWEEP_OPTIONS = ["simulation_type", "rounds", "max_simulation_time", "workers", "use_cache"]
+
+class JobCancelled(Exception):
+    """Raised inside a handler when its job has been cancelled."""
+
+class JobContext:
+    """
+    A running job's link back to the queue: buffers streamed events and reports cancellation.
+
+    Events are written in small batches (at most every JOB_EVENT_FLUSH_S), and a background thread
+    refreshes the heartbeat while a handler is busy without emitting anything, e.g. during an LLM call.
+    """
+
+    def __init__(self, job_id: str, flush_s: float = JOB_EVENT_FLUSH_S, heartbeat_s: float = JOB_HEARTBEAT_S):
+        self.job_id = job_id
+        self.flush_s = flush_s
+        self.status = "running"
+        self._buffer: List[Any] = []
+        self._lock = threading.Lock()
+        self._last_flush = time.time()
+        self._stop = threading.Event()
+        self._heartbeat = threading.Thread(target=self._beat, args=(heartbeat_s,), daemon=True)
+        self._heartbeat.start()
+
+    def _beat(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"Heartbeat for job {self.job_id} failed: {str(e)}")
+
+    def emit(self, event: Any):
+        """Stream one event (e.g. a transcript entry) to the job's pollers."""
+        with self._lock:
+            self._buffer.append(event)
+        if time.time() - self._last_flush >= self.flush_s:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            events, self._buffer = self._buffer, []
+            self._last_flush = time.time()
+            self.status = add_events(self.job_id, events)
+
+    def cancelled(self) -> bool:
+        return self.status == "cancelling"
+
+    def close(self):
+        self._stop.set()
+        self._heartbeat.join()
+        self.flush()
+
+def _stream_debate(entries, ctx: JobContext, use_cache: bool = True) -> List[Dict]:
+    """
+    Emit debate entries as they arrive, closing the debate (and its queued turns) on cancellation.
+
+    With SUMMARY_PREFETCH, each round is also summarised as soon as it completes; the summaries land
+    in the LLM response cache, where a later analysis of the run finds them. The job never waits for
+    them, and cancelling it drops the rounds not yet summarised.
+    """
+    transcript = []
+    summarizer = RoundSummarizer(use_cache=use_cache) if SUMMARY_PREFETCH else None
+    try:
+        for entry in entries:
+            transcript.append(entry)
+            ctx.emit(entry)
+            if summarizer:
+                summarizer.add(entry)
+            if ctx.cancelled():
+                break
+    finally:
+        entries.close()
+        if summarizer:
+            summarizer.close(cancel=ctx.cancelled())
+    return transcript
+
+def simulate(payload: Dict, ctx: JobContext) -> Dict:
+    """
+    Run a debate, streaming each transcript entry and checkpointing every round to the payload's run.
+
+    Payload: personas, dilemma, extracted, optional process_hint, run_id and any of DEBATE_OPTIONS.
+    """
+    run_id = payload.get("run_id")
+    entries = iter_debate(
+        payload["personas"], payload["dilemma"], payload.get("process_hint") or payload["dilemma"], payload["extracted"],
+        on_checkpoint=(lambda state: save_checkpoint(run_id, state)) if run_id else None,
+        **{key: payload[key] for key in DEBATE_OPTIONS if key in payload}
+    )
+    transcript = _stream_debate(entries, ctx, use_cache=payload.get("use_cache", True))
+    status = "stopped" if ctx.cancelled() else "simulated"
+    if run_id:
+        save_run({"id": run_id, "transcript": transcript, "status": status})
+    return {"turns": len(transcript), "run_status": status}
+
+def resume(payload: Dict, ctx: JobContext) -> Dict:
+    """
+    Continue a saved run from its last checkpoint, streaming only the new entries.
+
+    Payload: run_id and optional rounds (total rounds wanted).
+    """
+    run_id = payload["run_id"]
+    run = load_run(run_id)
+    checkpoint = run_checkpoint(run) if run else None
+    previous = checkpoint["transcript"] if checkpoint else []
+    transcript = previous + _stream_debate(iter_resumed_debate(run_id, rounds=payload.get("rounds")), ctx)
+    status = "stopped" if ctx.cancelled() else "simulated"
+    save_run({"id": run_id, "transcript": transcript, "status": status})
+    return {"turns": len(transcript), "resumed_from": len(previous), "run_status": status}
+
+def analyze(payload: Dict, ctx: JobContext) -> Dict:
+    """
+    Summarise and analyse a transcript, saving the results with the payload's run.
+
+    The summary is kept even if the analysis fails (e.g. the NLTK data is not installed); the
+    analysis then holds only an "error" explaining why.
+
+    Payload: transcript, dilemma and optional run_id.
+    """
+    transcript = Transcript.from_entries(payload["transcript"])
+    summary, suggestion = generate_summary_and_suggestion(transcript)
+    if ctx.cancelled():
+        raise JobCancelled()
+    analysis = analyze_transcript(transcript)
+    if "error" in analysis:
+        logger.warning(f"Job {ctx.job_id}: {analysis['error']}")
+    result = {
+        "summary": summary,
+        "suggestion": suggestion,
+        "analysis": analysis,
+        "keywords": [word for message in transcript.messages() for word in message.split() if len(word) > 5]
+    }
+    if payload.get("run_id"):
+        save_run({"id": payload["run_id"], "analysis": result, "status": "analyzed"})
+    return result
+
+def sweep(payload: Dict, ctx: JobContext) -> Dict:
+    """
+    Debate every variant of a dilemma (see agents.sweep), streaming each variant's result as it finishes.
+
+    On cancellation the variants already finished are kept and compared.
+
+    Payload: variants, personas, dilemma, extracted, optional process_hint and any of SWEEP_OPTIONS.
+    """
+    results = []
+    variants = iter_sweep(
+        payload["variants"], payload["personas"], payload["dilemma"], payload.get("process_hint") or payload["dilemma"], payload["extracted"],
+        **{key: payload[key] for key in SWEEP_OPTIONS if key in payload}
+    )
+    try:
+        for result in variants:
+            results.append(result)
+            ctx.emit(result)
+            if ctx.cancelled():
+                break
+    finally:
+        variants.close()
+    return {"matrix": compare_variants(results) if results else []}
+
+def pipeline(payload: Dict, ctx: JobContext) -> Dict:
+    """Run the whole extract → personas → debate → summarize → analyze pipeline for one dilemma (see agents.pipeline)."""
+    return run_pipeline(payload)
+
+HANDLERS: Dict[str, Callable[[Dict, JobContext], Any]] = {
+    "simulate": simulate,
+    "resume": resume,
+    "analyze": analyze,
+    "sweep": sweep,
+    "pipeline": pipeline
+}
+
+def execute_job(job: Dict):
+    """
+    Run a claimed job with its handler and record the outcome; never raises.
+
+    The LLM calls the handler makes are tagged with the job and the payload's session, and their
+    telemetry records are stored with the job (see utils.jobs.call_records) before it finishes.
+    """
+    ctx = JobContext(job["id"])
+    status, result, error = "completed", None, None
+    try:
+        handler = HANDLERS.get(job["kind"])
+        if handler is None:
+            raise ValueError(f"Unknown job kind: {job['kind']}")
+        with telemetry_tags(session=job["payload"].get("session"), job=job["id"]):
+            result = handler(job["payload"], ctx)
+    except JobCancelled:
+        status = "cancelled"
+    except Exception as e:
+        logger.error(f"Job {job['id']} ({job['kind']}) failed: {str(e)}")
+        status, error = "failed", f"{type(e).__name__}: {str(e)}"
+    finally:
+        try:
+            ctx.close()
+        except Exception as e:
+            logger.warning(f"Failed to flush job {job['id']}: {str(e)}")
+        try:
+            add_call_records(job["id"], get_telemetry().records(job=job["id"]))
+        except Exception as e:
+            logger.warning(f"Failed to store telemetry for job {job['id']}: {str(e)}")
+    if status == "completed" and ctx.cancelled():
+        # Handlers that stop early on cancellation still return what they produced
+        status = "cancelled"
+    finish_job(job["id"], status, result=result, error=error)
+
+def worker_loop(worker: str, stop: Optional[threading.Event] = None, poll_interval: float = JOB_POLL_INTERVAL_S, stale_s: float = JOB_STALE_S):
+    """
+    Claim and run queued jobs one at a time until stop is set.
+
+    While idle, the worker also fails jobs whose worker stopped reporting in, so a crashed worker
+    never leaves a job running forever; a simulation it was running can be continued from its checkpoint.
+    """
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        job = claim_job(worker)
+        if job is None:
+            fail_stale_jobs(stale_s)
+            stop.wait(poll_interval)
+            continue
+        execute_job(job)
+
+def _worker_main(worker: str, stop, db_path: Optional[str]):
+    reset_process_state()
+    if db_path:
+        db._db = db.Database(path=db_path)
+    init_jobs()
+    init_runs()
+    worker_loop(worker, stop)
+
+class WorkerPool:
+    """Worker processes serving the job queue, restarted if one dies."""
+
+    def __init__(self, workers: int, db_path: Optional[str] = None, start_method: str = "spawn"):
+        """
+        Args:
+            workers (int): Worker processes.
+            db_path (Optional[str]): Database holding the queue; defaults to the app database.
+            start_method (str): multiprocessing start method for the workers.
+        """
+        self.workers = workers
+        self.db_path = db_path
+        self._context = multiprocessing.get_context(start_method)
+        self._stop = self._context.Event()
+        self._processes: List[multiprocessing.Process] = []
+
+    def _spawn(self, n: int) -> multiprocessing.Process:
+        process = self._context.Process(target=_worker_main, args=(f"{os.getpid()}-{n}", self._stop, self.db_path), name=f"job-worker-{n}", daemon=True)
+        process.start()
+        return process
+
+    def start(self) -> "WorkerPool":
+        self._processes = [self._spawn(n) for n in range(self.workers)]
+        return self
+
+    def ensure_running(self) -> int:
+        """Replace workers that have exited; returns how many were restarted."""
+        restarted = 0
+        for n, process in enumerate(self._processes):
+            if not process.is_alive() and not self._stop.is_set():
+                self._processes[n] = self._spawn(n)
+                restarted += 1
+        return restarted
+
+    def alive(self) -> int:
+        return sum(1 for p in self._processes if p.is_alive())
+
+    def stop(self, timeout: float = 10):
+        """Let each worker finish its current job, then stop it (terminating any that do not within timeout)."""
+        self._stop.set()
+        deadline = time.time() + timeout
+        for process in self._processes:
+            process.join(max(0.0, deadline - time.time()))
+            if process.is_alive():
+                process.terminate()
+                process.join()
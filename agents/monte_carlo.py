@@ -0,0 +1,191 @@
+import time
+import numpy as np
+from typing import List, Dict, Optional
+from config import MC_RUNS, MC_CHUNK_SIZE, MC_SOCIAL_INFLUENCE, MC_CONSENSUS_THRESHOLD, MC_CONVERGENCE_TOLERANCE
+
+DECISIONS = ["agree", "disagree", "compromise"]
+AGREE, DISAGREE, COMPROMISE = range(3)
+
+def decision_probabilities(personas: List[Dict]) -> np.ndarray:
+    """
+    Derive each persona's base agree/disagree/compromise probabilities from their biases.
+
+    Args:
+        personas (List[Dict]): Personas with a list of biases.
+
+    Returns:
+        np.ndarray: (personas × 3) row-stochastic matrix ordered as DECISIONS.
+    """
+    agree = np.full(len(personas), 0.5)
+    for i, persona in enumerate(personas):
+        biases = [str(b).lower() for b in persona.get("biases", [])]
+        if "confirmation bias" in biases:
+            agree[i] += 0.2
+        if "status quo bias" in biases:
+            agree[i] -= 0.1
+    probs = np.stack([agree, 0.3 - agree / 2, 0.7 - agree / 2], axis=1)
+    # Strong biases push the disagree share below zero; clip and renormalise so every row is a distribution
+    probs = np.clip(probs, 0.0, None)
+    return probs / probs.sum(axis=1, keepdims=True)
+
+def template_message(stakeholder_name: str, role: str, focus_area: str, step: str, objective: str, goals: List[str], decision: str) -> str:
+    """Render a persona's simulated decision as a debate message."""
+    return (
+        f"As {stakeholder_name} ({role}), I {decision} on the proposed approach for {step}. "
+        f"My focus is {focus_area.lower()}. {objective} "
+        f"Given my goals ({', '.join(goals)}), I believe this {decision} aligns with our priorities."
+    )
+
+def _simulate_chunk(base: np.ndarray, rounds: int, runs: int, influence: float, rng: np.random.Generator) -> np.ndarray:
+    """Simulate a batch of trajectories, returning a (runs × rounds × personas) array of decision indices."""
+    n = base.shape[0]
+    decisions = np.empty((runs, rounds, n), dtype=np.int8)
+    # Sample by inverse CDF: only the agree and agree+disagree thresholds are needed
+    base_cumulative = np.cumsum(base, axis=1)
+    agree_cdf = np.broadcast_to(base_cumulative[:, AGREE], (runs, n))
+    disagree_cdf = np.broadcast_to(base_cumulative[:, DISAGREE], (runs, n))
+    for round_num in range(rounds):
+        draws = rng.random((runs, n))
+        round_decisions = (draws > agree_cdf).astype(np.int8) + (draws > disagree_cdf)
+        decisions[:, round_num] = round_decisions
+        # Personas drift towards the previous round's room sentiment
+        agree_share = (round_decisions == AGREE).mean(axis=1)[:, None]
+        disagree_share = (round_decisions == DISAGREE).mean(axis=1)[:, None]
+        agree_cdf = (1.0 - influence) * base_cumulative[None, :, AGREE] + influence * agree_share
+        disagree_cdf = (1.0 - influence) * base_cumulative[None, :, DISAGREE] + influence * (agree_share + disagree_share)
+    return decisions
+
+def extend_trajectory(personas: List[Dict], decisions: List[List[int]], rounds: int, rng: np.random.Generator, influence: float = MC_SOCIAL_INFLUENCE) -> List[List[int]]:
+    """
+    Continue one simulated trajectory to the given number of rounds, under the same dynamics as run_monte_carlo.
+
+    Args:
+        personas (List[Dict]): Personas taking part in the debate.
+        decisions (List[List[int]]): Decision indices per round so far (rounds × personas); may be empty.
+        rounds (int): Total rounds wanted.
+        rng (np.random.Generator): Generator to draw the new rounds from.
+        influence (float): Weight (0–1) of the previous round's sentiment on each persona's next decision.
+
+    Returns:
+        List[List[int]]: The existing rounds followed by newly simulated ones.
+    """
+    decisions = [list(r) for r in decisions]
+    base_cumulative = np.cumsum(decision_probabilities(personas), axis=1)
+    while len(decisions) < rounds and personas:
+        agree_cdf, disagree_cdf = base_cumulative[:, AGREE], base_cumulative[:, DISAGREE]
+        if decisions:
+            previous = np.asarray(decisions[-1])
+            agree_share = (previous == AGREE).mean()
+            disagree_share = (previous == DISAGREE).mean()
+            agree_cdf = (1.0 - influence) * agree_cdf + influence * agree_share
+            disagree_cdf = (1.0 - influence) * disagree_cdf + influence * (agree_share + disagree_share)
+        draws = rng.random(len(personas))
+        decisions.append(((draws > agree_cdf).astype(np.int8) + (draws > disagree_cdf)).tolist())
+    return decisions
+
+def _share_stats(counts: np.ndarray, n: int) -> Dict:
+    """Summarise a distribution of per-run shares k/n given as counts over k = 0..n."""
+    total = counts.sum()
+    values = np.arange(n + 1) / n
+    pmf = counts / total
+    mean = float((values * pmf).sum())
+    std = float(np.sqrt(max(0.0, (values ** 2 * pmf).sum() - mean ** 2)))
+    se = std / np.sqrt(total)
+    cdf = np.cumsum(pmf)
+    return {
+        "mean": mean,
+        "std": std,
+        "ci95": [mean - 1.96 * se, mean + 1.96 * se],
+        "interval95": [float(values[np.searchsorted(cdf, 0.025)]), float(values[min(n, np.searchsorted(cdf, 0.975))])],
+        "distribution": {f"{v:.3f}": float(p) for v, p in zip(values, pmf)}
+    }
+
+def run_monte_carlo(personas: List[Dict], rounds: int, runs: int = MC_RUNS, chunk_size: int = MC_CHUNK_SIZE, influence: float = MC_SOCIAL_INFLUENCE, seed: Optional[int] = None, time_budget: Optional[float] = None, rng: Optional[np.random.Generator] = None) -> Dict:
+    """
+    Simulate many debate trajectories at once and summarise their outcome distributions.
+
+    Runs are processed in chunks of at most chunk_size, so memory stays bounded by
+    chunk_size × rounds × personas regardless of the total number of runs.
+
+    Args:
+        personas (List[Dict]): Personas taking part in the debate.
+        rounds (int): Number of debate rounds per trajectory.
+        runs (int): Total number of trajectories to simulate.
+        chunk_size (int): Maximum trajectories simulated per batch.
+        influence (float): Weight (0–1) of the previous round's sentiment on each persona's next decision.
+        seed (Optional[int]): Seed for reproducible results, ignored when rng is given.
+        time_budget (Optional[float]): Seconds after which no further chunks are started.
+        rng (Optional[np.random.Generator]): Generator to draw from, e.g. to continue a previous run.
+
+    Returns:
+        Dict: Agreement/compromise distributions with confidence intervals, per-round shares,
+        consensus and convergence statistics, and representative runs for rendering transcripts.
+    """
+    start_time = time.time()
+    rng = rng if rng is not None else np.random.default_rng(seed)
+    base = decision_probabilities(personas)
+    n = len(personas)
+    if n == 0 or rounds <= 0 or runs <= 0:
+        return {"runs": 0, "rounds": rounds, "personas": [], "representative_runs": [], "interrupted": False}
+
+    agree_counts = np.zeros(n + 1, dtype=np.int64)
+    compromise_counts = np.zeros(n + 1, dtype=np.int64)
+    round_share_sums = np.zeros((rounds, 3))
+    consensus_rounds = np.zeros(rounds + 1, dtype=np.int64)
+    trace = []
+    representatives = []
+    completed = 0
+    interrupted = False
+
+    while completed < runs:
+        if time_budget is not None and completed and time.time() - start_time > time_budget:
+            interrupted = True
+            break
+        batch = min(chunk_size, runs - completed)
+        decisions = _simulate_chunk(base, rounds, batch, influence, rng)
+        final = decisions[:, -1]
+        final_agree = (final == AGREE).sum(axis=1)
+        agree_counts += np.bincount(final_agree, minlength=n + 1)
+        compromise_counts += np.bincount((final == COMPROMISE).sum(axis=1), minlength=n + 1)
+        round_share_sums += np.stack([(decisions == k).mean(axis=2).sum(axis=0) for k in range(3)], axis=1)
+
+        support = (decisions != DISAGREE).mean(axis=2) >= MC_CONSENSUS_THRESHOLD
+        first = np.where(support.any(axis=1), support.argmax(axis=1), rounds)
+        consensus_rounds += np.bincount(first, minlength=rounds + 1)
+
+        if not representatives:
+            order = np.argsort(final_agree, kind="stable")
+            for label, idx in (("median", order[len(order) // 2]), ("least agreement", order[0]), ("most agreement", order[-1])):
+                representatives.append({"label": label, "decisions": decisions[idx].tolist()})
+
+        completed += batch
+        stats = _share_stats(agree_counts, n)
+        trace.append({"runs": completed, "mean_agreement": stats["mean"], "standard_error": stats["std"] / np.sqrt(completed)})
+
+    agreement = _share_stats(agree_counts, n)
+    compromise = _share_stats(compromise_counts, n)
+    standard_error = trace[-1]["standard_error"]
+    return {
+        "runs": completed,
+        "rounds": rounds,
+        "personas": [p.get("name", f"Persona {i + 1}") for i, p in enumerate(personas)],
+        "decision_probabilities": base.tolist(),
+        "agreement": agreement,
+        "compromise": compromise,
+        "round_shares": [
+            {"round": r + 1, **{DECISIONS[k]: float(round_share_sums[r, k] / completed) for k in range(3)}}
+            for r in range(rounds)
+        ],
+        "consensus_rate": float(consensus_rounds[:rounds].sum() / completed),
+        "rounds_to_consensus": {
+            (str(r + 1) if r < rounds else "none"): float(c / completed) for r, c in enumerate(consensus_rounds)
+        },
+        "convergence": {
+            "trace": trace,
+            "standard_error": standard_error,
+            "converged": bool(1.96 * standard_error <= MC_CONVERGENCE_TOLERANCE)
+        },
+        "representative_runs": representatives,
+        "elapsed_s": time.time() - start_time,
+        "interrupted": interrupted
+    }
@@ -4,22 +4,31 @@ import os
 import json
 import logging
 from tenacity import retry, stop_after_attempt, wait_fixed
+from utils.llm_cache import cached_completion
+from utils.llm_client import get_client, get_model
+from utils.telemetry import track_llm_call
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-@retry(stop=stop_after_attempt(5), wait=wait_fixed(5))
-def generate_personas(extracted: Dict) -> List[Dict]:
+def generate_personas(extracted: Dict, use_cache: bool = True) -> List[Dict]:
     """
     Generate personas for stakeholders based on extracted decision structure using OpenAI API.
 
     Args:
         extracted (Dict): Extracted decision structure with stakeholders, dilemma, and process.
+        use_cache (bool): Serve identical requests from the LLM response cache.
 
     Returns:
         List[Dict]: List of generated personas.
     """
+    # Track outside the retry so every attempt is counted against one call
+    with track_llm_call("personas"):
+        return _generate_personas(extracted, use_cache)
+
+@retry(stop=stop_after_attempt(5), wait=wait_fixed(5))
+def _generate_personas(extracted: Dict, use_cache: bool = True) -> List[Dict]:
     try:
         # Log input data
         logger.info(f"Input extracted: {json.dumps(extracted, indent=2, default=str)}")
@@ -34,9 +43,9 @@ def generate_personas(extracted: Dict) -> List[Dict]:
             raise ValueError("XAI_API_KEY environment variable is not set")
         logger.info("API key configured")
 
-        # Initialize OpenAI client
-        client = openai.OpenAI(api_key=api_key)
-        logger.info("OpenAI client initialized")
+        # Reuse the pooled OpenAI client
+        client = get_client("openai")
+        logger.info("OpenAI client ready")
 
         # Extract stakeholder names
         stakeholders = extracted.get("stakeholders", [])
@@ -67,8 +76,11 @@ def generate_personas(extracted: Dict) -> List[Dict]:
 
         # Call OpenAI API
         logger.info("Making OpenAI API call")
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
+        response = cached_completion(
+            client,
+            use_cache=use_cache,
+            validate=json.loads,
+            model=get_model("openai"),
             messages=[
                 {"role": "system", "content": "You are an expert in creating detailed stakeholder personas."},
                 {"role": "user", "content": prompt}
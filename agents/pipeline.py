@@ -0,0 +1,76 @@
+import time
+from typing import Dict, Optional
+from config import DEBATE_ROUNDS
+import utils.db as db
+import utils.llm_cache as llm_cache
+import utils.llm_client as llm_client
+from utils.deadline import Deadline
+from agents.extractor import extract_decision_structure
+from agents.persona_builder import generate_personas
+from agents.debater import simulate_debate
+from agents.summarizer import generate_summary_and_suggestion
+from agents.transcript_analyzer import analyze_transcript
+
+STAGES = ["extract", "personas", "debate", "summarize", "analyze"]
+
+def reset_process_state():
+    """Drop the database, LLM cache and HTTP clients a forked worker inherited; each reopens on first use."""
+    # Their SQLite connections, writer thread and connection pools belong to the parent process
+    db._db = None
+    llm_cache._cache = None
+    llm_client._clients.clear()
+
+def run_pipeline(job: Dict, use_cache: bool = True, deadline: Optional[Deadline] = None) -> Dict:
+    """
+    Run one decision simulation end to end, as the app's five steps do, without any UI.
+
+    Args:
+        job (Dict): "dilemma" and optionally "process_hint" (defaults to the dilemma), "scenarios",
+            "simulation_type", "rounds" and "max_simulation_time" (seconds for the debate).
+        use_cache (bool): Serve identical LLM requests from the response cache.
+        deadline (Optional[Deadline]): Budget for the whole job; the debate gets whatever is left of
+            it when it starts, capped at max_simulation_time.
+
+    Returns:
+        Dict: extracted, personas, transcript, summary, suggestion, analysis and timings (seconds per stage).
+
+    Raises:
+        ValueError: If the job has no dilemma.
+    """
+    dilemma = str(job.get("dilemma") or "").strip()
+    if not dilemma:
+        raise ValueError("Job has no dilemma")
+    process_hint = job.get("process_hint") or dilemma
+    scenarios = job.get("scenarios", "")
+    timings = {}
+
+    def timed(stage, fn):
+        start = time.time()
+        value = fn()
+        timings[stage] = round(time.time() - start, 3)
+        return value
+
+    extracted = timed("extract", lambda: extract_decision_structure(dilemma, process_hint, scenarios, use_cache=use_cache))
+    personas = timed("personas", lambda: generate_personas(extracted, use_cache=use_cache))
+    max_simulation_time = job.get("max_simulation_time", 180)
+    if deadline is not None:
+        max_simulation_time = max(0, min(max_simulation_time, int(deadline.remaining())))
+    transcript = timed("debate", lambda: simulate_debate(
+        personas, dilemma, process_hint, extracted,
+        scenarios=scenarios,
+        rounds=job.get("rounds", DEBATE_ROUNDS),
+        max_simulation_time=max_simulation_time,
+        simulation_type=job.get("simulation_type", "Grok 3 Beta Simulation"),
+        use_cache=use_cache
+    ))
+    summary, suggestion = timed("summarize", lambda: generate_summary_and_suggestion(transcript, use_cache=use_cache))
+    analysis = timed("analyze", lambda: analyze_transcript(transcript))
+    return {
+        "extracted": extracted,
+        "personas": personas,
+        "transcript": transcript,
+        "summary": summary,
+        "suggestion": suggestion,
+        "analysis": analysis,
+        "timings": timings
+    }
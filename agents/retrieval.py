@@ -0,0 +1,87 @@
+import re
+import numpy as np
+from scipy import sparse
+from typing import Dict, List
+from config import EXTRACT_CONTEXT_TOKENS, BM25_K1, BM25_B
+from agents.context_window import estimate_tokens
+
+WORD_PATTERN = re.compile(r"[^\W_]+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in into is it its of on or our that the their them "
+    "there these they this to was we were what when which who will with would should could can do does "
+    "not no so if than then also such about over under more most other some any all each".split()
+)
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric terms, without stopwords or single characters."""
+    return [t for t in WORD_PATTERN.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+class BM25Index:
+    """Okapi BM25 over a fixed set of passages, stored as a sparse term-frequency matrix."""
+
+    def __init__(self, passages: List[str], k1: float = BM25_K1, b: float = BM25_B):
+        """
+        Args:
+            passages (List[str]): Passages to rank.
+            k1 (float): Term-frequency saturation.
+            b (float): Strength of passage-length normalisation.
+        """
+        self.vocabulary: Dict[str, int] = {}
+        rows, cols = [], []
+        for row, passage in enumerate(passages):
+            for term in tokenize(passage):
+                rows.append(row)
+                cols.append(self.vocabulary.setdefault(term, len(self.vocabulary)))
+        # Duplicate (row, col) pairs are summed, giving term counts
+        tf = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(len(passages), len(self.vocabulary)))
+        lengths = np.asarray(tf.sum(axis=1)).ravel()
+        document_frequency = np.bincount(tf.indices, minlength=len(self.vocabulary))
+        self.idf = np.log1p((len(passages) - document_frequency + 0.5) / (document_frequency + 0.5))
+        norm = k1 * (1 - b + b * lengths / max(lengths.mean(), 1.0)) if len(passages) else lengths
+
+        # Precompute the BM25 weight of every (passage, term) pair so a query is one sparse product
+        tf = tf.tocoo()
+        weights = tf.data * (k1 + 1) / (tf.data + norm[tf.row]) * self.idf[tf.col]
+        self.weights = sparse.csc_matrix((weights, (tf.row, tf.col)), shape=tf.shape)
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every passage for query."""
+        counts = np.zeros(len(self.vocabulary))
+        for term in tokenize(query):
+            if term in self.vocabulary:
+                counts[self.vocabulary[term]] = 1.0
+        return self.weights @ counts
+
+def select_passages(chunks: List[Dict], query: str, token_budget: int = EXTRACT_CONTEXT_TOKENS) -> List[Dict]:
+    """
+    Pick the chunks most relevant to query that fit in token_budget.
+
+    Chunks are taken in order of BM25 score; when nothing matches the query, the opening chunks are
+    used instead. The selection is returned in document order.
+
+    Args:
+        chunks (List[Dict]): Chunks with "text" (and any other keys, e.g. "page" and "start").
+        query (str): Text the passages should be relevant to, e.g. the user's dilemma.
+        token_budget (int): Approximate token budget for the selected passages.
+
+    Returns:
+        List[Dict]: Selected chunks, each with an added "score".
+    """
+    if not chunks:
+        return []
+    scores = BM25Index([c["text"] for c in chunks]).scores(query)
+    order = np.argsort(-scores, kind="stable") if scores.max() > 0 else np.arange(len(chunks))
+    selected, used = [], 0
+    for index in order:
+        if scores.max() > 0 and scores[index] <= 0:
+            break
+        cost = estimate_tokens(chunks[index]["text"])
+        if used + cost > token_budget:
+            continue
+        selected.append({**chunks[index], "score": float(scores[index])})
+        used += cost
+    return sorted(selected, key=lambda c: c.get("start", 0))
+
+def format_passages(passages: List[Dict]) -> str:
+    """Render selected passages for a prompt, labelled with their page numbers."""
+    return "\n".join(f"[p. {p['page'] + 1}] {p['text']}" if "page" in p else p["text"] for p in passages)
@@ -1,39 +1,175 @@
 import json
-import os
-from openai import OpenAI
-from typing import List, Dict, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
 from tenacity import retry, stop_after_attempt, wait_fixed
+from config import SUMMARY_WORKERS, SUMMARY_ROUND_TOKEN_BUDGET, SUMMARY_ROUND_WORDS
+from utils.llm_cache import cached_completion
+from utils.llm_client import get_client, get_model
+from utils.telemetry import track_llm_call, telemetry_tags, current_tags
+from agents.context_window import summarize_entry, truncate_to_tokens
 
-def generate_summary_and_suggestion(transcript: List[Dict]) -> Tuple[str, str]:
+def format_round(entries: List[Dict]) -> str:
+    """Render one round's entries as compact "Agent (step): message" lines, within SUMMARY_ROUND_TOKEN_BUDGET."""
+    lines = [
+        f"{entry.get('agent', 'Unknown')} ({entry.get('step', 'N/A')}): {' '.join(str(entry.get('message', '')).split())}"
+        for entry in entries
+    ]
+    return truncate_to_tokens("\n".join(lines), SUMMARY_ROUND_TOKEN_BUDGET)
+
+def _require_text(content: str) -> str:
+    if not content or not content.strip():
+        raise ValueError("Empty round summary")
+    return content
+
+def summarize_round(round_num, entries: List[Dict], use_cache: bool = True) -> str:
+    """
+    Summarize one debate round.
+
+    The request depends only on the round's own entries, so an unchanged round is served from the
+    LLM response cache however often the transcript is re-analysed.
+
+    Args:
+        round_num: The round's number, as recorded in its entries.
+        entries (List[Dict]): The round's transcript entries.
+        use_cache (bool): Serve identical requests from the LLM response cache.
+
+    Returns:
+        str: The round summary; each speaker's opening sentence if the LLM call fails.
+    """
+    prompt = (
+        f"Summarize round {round_num} of a decision-making debate in at most {SUMMARY_ROUND_WORDS} words: "
+        "each stakeholder's position, where they agree, where they clash, and any decision reached.\n"
+        f"Round {round_num}:\n{format_round(entries)}"
+    )
+
+    @retry(stop=stop_after_attempt(3), wait=wait_fixed(2))
+    def make_api_call():
+        return cached_completion(
+            get_client(),
+            use_cache=use_cache,
+            validate=_require_text,
+            model=get_model(),
+            messages=[
+                {"role": "system", "content": "You summarize one round of a stakeholder debate."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            max_tokens=300
+        )
+
+    try:
+        with track_llm_call("summarize", round_num=round_num if isinstance(round_num, int) else None):
+            completion = make_api_call()
+        return _require_text(completion.choices[0].message.content).strip()
+    except Exception as e:
+        print(f"Round {round_num} Summarization Error: {str(e)}")
+        return " ".join(summarize_entry(entry) for entry in entries)
+
+class RoundSummarizer:
+    """
+    Summarize a transcript round by round as its entries arrive.
+
+    Each round is submitted to a thread pool as soon as the next one starts, so the summaries of a
+    running debate are ready (and cached) shortly after its last round; finish() collects them.
+    """
+
+    def __init__(self, use_cache: bool = True, workers: int = SUMMARY_WORKERS):
+        """
+        Args:
+            use_cache (bool): Serve identical requests from the LLM response cache.
+            workers (int): Rounds summarised at once.
+        """
+        self.use_cache = use_cache
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers))
+        self._futures: List[Tuple[object, Future]] = []
+        self._round = None
+        self._entries: List[Dict] = []
+
+    def _summarize(self, round_num, entries: List[Dict], tags: Dict) -> str:
+        with telemetry_tags(**tags):
+            return summarize_round(round_num, entries, self.use_cache)
+
+    def _submit(self):
+        self._futures.append((self._round, self._executor.submit(self._summarize, self._round, self._entries, current_tags())))
+        self._entries = []
+
+    def add(self, entry: Dict):
+        """Add the next transcript entry; an entry from a new round sends the previous round off for summarizing."""
+        if self._entries and entry.get("round") != self._round:
+            self._submit()
+        self._round = entry.get("round")
+        self._entries.append(entry)
+
+    def finish(self) -> List[Dict]:
+        """
+        Summarize the last round and wait for all of them.
+
+        Returns:
+            List[Dict]: {"round", "summary"} per round, in transcript order.
+        """
+        if self._entries:
+            self._submit()
+        try:
+            return [{"round": round_num, "summary": future.result()} for round_num, future in self._futures]
+        finally:
+            self._executor.shutdown()
+
+    def close(self, cancel: bool = False):
+        """
+        Stop taking rounds without waiting for their summaries, which still land in the LLM response cache.
+
+        Args:
+            cancel (bool): Drop the last round and any rounds not yet started instead of summarizing them.
+        """
+        if self._entries and not cancel:
+            self._submit()
+        self._executor.shutdown(wait=False, cancel_futures=cancel)
+
+def summarize_rounds(transcript: List[Dict], use_cache: bool = True, workers: int = SUMMARY_WORKERS) -> List[Dict]:
+    """Summarize every round of a transcript in parallel; returns {"round", "summary"} per round, in order."""
+    summarizer = RoundSummarizer(use_cache=use_cache, workers=workers)
+    for entry in transcript:
+        summarizer.add(entry)
+    return summarizer.finish()
+
+def generate_summary_and_suggestion(transcript: List[Dict], use_cache: bool = True, round_summaries: Optional[List[Dict]] = None) -> Tuple[str, str]:
     """
     Summarize the debate and provide optimization suggestions.
 
+    The whole transcript is covered: each round is summarized first (see summarize_rounds), and the
+    round summaries are then reduced into the final summary, faultlines, chokepoints and suggestion.
+
     Args:
         transcript (List[Dict]): Debate transcript with agent, round, step, and message.
+        use_cache (bool): Serve identical requests from the LLM response cache.
+        round_summaries (Optional[List[Dict]]): Round summaries already made (e.g. by a RoundSummarizer
+            fed during the debate); computed from the transcript if omitted.
 
     Returns:
         Tuple[str, str]: Summary and optimization suggestion.
     """
-    client = OpenAI(
-        base_url="https://api.x.ai/v1",
-        api_key=os.getenv("XAI_API_KEY")
-    )
+    client = get_client()
 
-    transcript_json = json.dumps(transcript, indent=2)
+    if round_summaries is None:
+        round_summaries = summarize_rounds(transcript, use_cache=use_cache)
+    rounds_text = "\n".join(f"Round {r['round']}: {r['summary']}" for r in round_summaries)
 
     prompt = (
-        "Analyze a decision-making debate transcript and return in JSON format:\n"
+        "Analyze a decision-making debate from its round-by-round summaries and return in JSON format:\n"
         "1. 'summary': 150–200 word summary of key arguments and outcomes.\n"
         "2. 'faultlines': Major conflicts between stakeholders.\n"
         "3. 'chokepoints': Process bottlenecks or constraints.\n"
         "4. 'suggestion': 150–200 word actionable recommendations.\n"
-        f"Transcript:\n{transcript_json[:2000]}...\n"
+        f"Round summaries:\n{rounds_text}\n"
     )
 
     @retry(stop=stop_after_attempt(3), wait=wait_fixed(2))
     def make_api_call():
-        return client.chat.completions.create(
-            model="grok-3-beta",
+        return cached_completion(
+            client,
+            use_cache=use_cache,
+            validate=json.loads,
+            model=get_model(),
             messages=[
                 {"role": "system", "content": "You are analyzing debate transcripts."},
                 {"role": "user", "content": prompt}
@@ -44,8 +180,9 @@ def generate_summary_and_suggestion(transcript: List[Dict]) -> Tuple[str, str]:
         )
 
     try:
-        completion = make_api_call()
-        result = json.loads(completion.choices[0].message.content)
+        with track_llm_call("summarize"):
+            completion = make_api_call()
+            result = json.loads(completion.choices[0].message.content)
         summary = result.get("summary", "No summary generated.")
         faultlines = result.get("faultlines", "No faultlines identified.")
         chokepoints = result.get("chokepoints", "No chokepoints identified.")
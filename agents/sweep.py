@@ -0,0 +1,199 @@
+import re
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional
+from config import DEBATE_ROUNDS, SWEEP_WORKERS, LLM_POOL_MAX_CONNECTIONS
+from utils.deadline import Deadline
+from utils.telemetry import telemetry_tags, current_tags
+from agents.debater import simulate_debate
+from agents.transcript_analyzer import analyze_transcripts
+
+logger = logging.getLogger(__name__)
+
+# Stances read from a turn, checked in order: "disagree" contains "agree"
+STANCE_PATTERNS = [
+    ("oppose", re.compile(r"\b(disagree|oppose|defect|reject)", re.IGNORECASE)),
+    ("compromise", re.compile(r"\bcompromise", re.IGNORECASE)),
+    ("support", re.compile(r"\b(agree|support|cooperate|endorse)", re.IGNORECASE))
+]
+STANCES = ["support", "compromise", "oppose", "neutral"]
+
+def variant_inputs(variant: Dict, personas: List[Dict], extracted: Dict) -> Dict:
+    """
+    Apply a variant to the shared personas and extraction.
+
+    Args:
+        variant (Dict): "name" and any of "scenarios" (str), "personas" (names to keep),
+            "exclude" (names to drop) and "process" (process steps in the order to debate them).
+        personas (List[Dict]): Personas shared by every variant.
+        extracted (Dict): Decision structure shared by every variant.
+
+    Returns:
+        Dict: "personas", "extracted" and "scenarios" for this variant's debate.
+    """
+    selected = personas
+    if variant.get("personas"):
+        keep = set(variant["personas"])
+        selected = [p for p in selected if p["name"] in keep]
+    if variant.get("exclude"):
+        drop = set(variant["exclude"])
+        selected = [p for p in selected if p["name"] not in drop]
+    if variant.get("process"):
+        extracted = {**extracted, "process": list(variant["process"])}
+    return {"personas": selected, "extracted": extracted, "scenarios": variant.get("scenarios", "")}
+
+def stance_shares(transcript: List[Dict]) -> Dict[str, float]:
+    """Share of each stance among the persona turns of the final round."""
+    turns = [e for e in transcript if e.get("agent") != "System"]
+    if not turns:
+        return {stance: 0.0 for stance in STANCES}
+    last_round = max(e.get("round", 0) for e in turns)
+    counts = dict.fromkeys(STANCES, 0)
+    final = [e for e in turns if e.get("round", 0) == last_round]
+    for entry in final:
+        message = str(entry.get("message", ""))
+        stance = next((name for name, pattern in STANCE_PATTERNS if pattern.search(message)), "neutral")
+        counts[stance] += 1
+    return {stance: count / len(final) for stance, count in counts.items()}
+
+def _run_variant(index: int, variant: Dict, personas: List[Dict], dilemma: str, process_hint: str, extracted: Dict, tags: Dict, **debate_kwargs) -> Dict:
+    name = variant.get("name") or f"Variant {index + 1}"
+    inputs = variant_inputs(variant, personas, extracted)
+    start = time.time()
+    try:
+        if not inputs["personas"]:
+            raise ValueError("No personas left in this variant")
+        with telemetry_tags(**tags):
+            transcript = simulate_debate(inputs["personas"], dilemma, process_hint, inputs["extracted"], scenarios=inputs["scenarios"], **debate_kwargs)
+        error = None
+    except Exception as e:
+        logger.warning(f"Sweep variant {name} failed: {str(e)}")
+        transcript, error = [], str(e)
+    return {
+        "index": index,
+        "name": name,
+        "variant": variant,
+        "personas": [p["name"] for p in inputs["personas"]],
+        "transcript": transcript,
+        "elapsed_s": round(time.time() - start, 3),
+        "error": error
+    }
+
+def iter_sweep(variants: List[Dict], personas: List[Dict], dilemma: str, process_hint: str, extracted: Dict, simulation_type: str = "Grok 3 Beta Simulation", rounds: int = DEBATE_ROUNDS, max_simulation_time: int = 180, workers: int = SWEEP_WORKERS, use_cache: bool = True) -> Iterator[Dict]:
+    """
+    Debate every variant of one dilemma concurrently, yielding each result as soon as it finishes.
+
+    All variants reuse the same extraction and personas and share one time budget, so the sweep as a
+    whole finishes within max_simulation_time; Grok turns the budget cannot cover fall back to
+    simulated decisions, as in a single run. Grok turns are spread over the variants so the sweep
+    never has more calls in flight than the LLM connection pool holds.
+
+    Args:
+        variants (List[Dict]): Variants as accepted by variant_inputs.
+        personas (List[Dict]): Personas shared by every variant.
+        dilemma (str): The decision dilemma.
+        process_hint (str): The user-provided process and stakeholder details.
+        extracted (Dict): Decision structure shared by every variant.
+        simulation_type (str): Debate engine, as for simulate_debate.
+        rounds (int): Debate rounds per variant.
+        max_simulation_time (int): Time budget for the whole sweep in seconds.
+        workers (int): Variants debated at once.
+        use_cache (bool): Serve identical Grok turn requests from the LLM response cache.
+
+    Yields:
+        Dict: Per variant, in completion order: index, name, variant, personas (names), transcript,
+        elapsed_s and error (None on success).
+    """
+    if not variants:
+        return
+    workers = max(1, min(workers, len(variants)))
+    deadline = Deadline(max_simulation_time)
+    debate_kwargs = {
+        "rounds": rounds,
+        "max_simulation_time": max_simulation_time,
+        "simulation_type": simulation_type,
+        "max_concurrent_turns": max(1, LLM_POOL_MAX_CONNECTIONS // workers),
+        "use_cache": use_cache,
+        "deadline": deadline
+    }
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = [
+            executor.submit(_run_variant, i, variant, personas, dilemma, process_hint, extracted, current_tags(), **debate_kwargs)
+            for i, variant in enumerate(variants)
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def compare_variants(results: List[Dict], analysis_workers: Optional[int] = 1) -> List[Dict]:
+    """
+    Build the comparison matrix of a sweep: one row per variant, in variant order.
+
+    Sentiment and conflicts come from one batch analysis of every transcript; they are None when the
+    analysis is unavailable (e.g. the NLTK data is not installed).
+
+    Args:
+        results (List[Dict]): Results yielded by iter_sweep, in any order.
+        analysis_workers (Optional[int]): Worker processes for the transcript analysis.
+
+    Returns:
+        List[Dict]: Rows with variant, personas, turns, fallback_turns, the final-round support,
+        compromise, oppose and neutral shares, consensus (Monte Carlo consensus rate or whether the
+        game converged, else None), mean_sentiment, positive, negative, conflicts, elapsed_s and error.
+    """
+    results = sorted(results, key=lambda r: r["index"])
+    analysis = analyze_transcripts([r["transcript"] for r in results], workers=analysis_workers)
+    failed = set(analysis["errors"]["transcript"])
+
+    rows = []
+    for position, result in enumerate(results):
+        transcript = result["transcript"]
+        consensus = None
+        for entry in transcript:
+            if "monte_carlo" in entry:
+                consensus = entry["monte_carlo"]["consensus_rate"]
+            elif "game_theory" in entry:
+                consensus = float(entry["game_theory"]["converged"])
+        row = {
+            "variant": result["name"],
+            "personas": len(result["personas"]),
+            "turns": sum(1 for e in transcript if e.get("agent") != "System"),
+            "fallback_turns": sum(1 for e in transcript if e.get("fallback")),
+            **stance_shares(transcript),
+            "consensus": consensus,
+            "mean_sentiment": None,
+            "positive": None,
+            "negative": None,
+            "conflicts": None,
+            "elapsed_s": result["elapsed_s"],
+            "error": result["error"]
+        }
+        if transcript and position not in failed:
+            scores = [s for t, s in zip(analysis["sentiment"]["transcript"], analysis["sentiment"]["score"]) if t == position]
+            tones = [s for t, s in zip(analysis["sentiment"]["transcript"], analysis["sentiment"]["tone"]) if t == position]
+            row.update({
+                "mean_sentiment": sum(scores) / len(scores) if scores else 0.0,
+                "positive": tones.count("positive"),
+                "negative": tones.count("negative"),
+                "conflicts": analysis["conflicts"]["transcript"].count(position)
+            })
+        rows.append(row)
+    return rows
+
+def run_sweep(variants: List[Dict], personas: List[Dict], dilemma: str, process_hint: str, extracted: Dict, simulation_type: str = "Grok 3 Beta Simulation", rounds: int = DEBATE_ROUNDS, max_simulation_time: int = 180, workers: int = SWEEP_WORKERS, use_cache: bool = True) -> Dict:
+    """
+    Run a scenario sweep to completion and compare its variants.
+
+    Takes the same arguments as iter_sweep.
+
+    Returns:
+        Dict: "results" (per-variant results in variant order) and "matrix" (rows from compare_variants).
+    """
+    results = sorted(
+        iter_sweep(variants, personas, dilemma, process_hint, extracted, simulation_type=simulation_type, rounds=rounds, max_simulation_time=max_simulation_time, workers=workers, use_cache=use_cache),
+        key=lambda r: r["index"]
+    )
+    return {"results": results, "matrix": compare_variants(results)}
@@ -1,19 +1,129 @@
 import json
-from typing import Dict, List
-import nltk
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 from nltk.sentiment.vader import SentimentIntensityAnalyzer
 from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
 import re
 from collections import Counter
+from config import ANALYSIS_WORKERS, ANALYSIS_CHUNK_SIZE
+from utils.nltk_data import ensure_nltk_data
 
-# Download NLTK data at module initialization
-try:
-    nltk.download('vader_lexicon', quiet=True)
-    nltk.download('punkt', quiet=True)
-    nltk.download('stopwords', quiet=True)
-except Exception as e:
-    print(f"Warning: Failed to download NLTK data: {e}")
+# Alphanumeric runs: a regex approximation of word_tokenize's word tokens (it splits contractions such as
+# "don't" and decimals such as "3.5" differently)
+WORD_PATTERN = re.compile(r"[^\W_]+")
+
+_models: Optional[Tuple[SentimentIntensityAnalyzer, frozenset]] = None
+
+def _load_models() -> Tuple[SentimentIntensityAnalyzer, frozenset]:
+    """Build the VADER analyzer and English stopword set (reads the lexicon files from disk)."""
+    # Only the local bundle is used; downloading here would hang on network-isolated hosts
+    missing = ensure_nltk_data()
+    if missing:
+        raise LookupError(f"NLTK data not installed: {', '.join(missing)}. Run `python -m utils.nltk_data --download` once to bundle it.")
+    return SentimentIntensityAnalyzer(), frozenset(stopwords.words('english'))
+
+def get_models() -> Tuple[SentimentIntensityAnalyzer, frozenset]:
+    """Return this process's VADER analyzer and stopword set, loading them on first use."""
+    global _models
+    if _models is None:
+        _models = _load_models()
+    return _models
+
+def analyze_entries(transcript: Sequence[Dict]) -> Dict:
+    """
+    Analyze one debate transcript for keywords, sentiment, arguments, and insights.
+
+    Args:
+        transcript (Sequence[Dict]): Transcript entries with agent, round, step, and message (a list
+            or a utils.transcript.Transcript).
+
+    Returns:
+        Dict: Analysis with topics, sentiment_analysis, key_arguments, conflicts, insights,
+        improvement_areas, and process_suggestions.
+    """
+    sid, stop_words = get_models()
+
+    # Keyword frequency analysis (replacing topic modeling)
+    words = [word for entry in transcript for word in WORD_PATTERN.findall(entry['message'].lower()) if word not in stop_words]
+    word_freq = Counter(words)
+    top_keywords = [{"label": f"Keyword {i+1}", "keywords": [word], "weight": count / len(words)} for i, (word, count) in enumerate(word_freq.most_common(5))]
+
+    # Sentiment analysis
+    sentiment_analysis = []
+    for entry in transcript:
+        scores = sid.polarity_scores(entry['message'])
+        tone = "positive" if scores['compound'] > 0.1 else "negative" if scores['compound'] < -0.1 else "neutral"
+        sentiment_analysis.append({
+            "agent": entry['agent'],
+            "round": entry['round'],
+            "tone": tone,
+            "score": scores['compound']
+        })
+
+    # Argument mining
+    key_arguments = []
+    conflicts = []
+    for i, entry in enumerate(transcript):
+        message = entry['message'].lower()
+        if any(word in message for word in ["propose", "suggest", "recommend"]):
+            key_arguments.append({
+                "agent": entry['agent'],
+                "type": "Proposal",
+                "content": entry['message'][:100] + "..."
+            })
+        elif any(word in message for word in ["agree", "support"]):
+            key_arguments.append({
+                "agent": entry['agent'],
+                "type": "Agreement",
+                "content": entry['message'][:100] + "..."
+            })
+        elif any(word in message for word in ["disagree", "conflict", "oppose"]):
+            key_arguments.append({
+                "agent": entry['agent'],
+                "type": "Disagreement",
+                "content": entry['message'][:100] + "..."
+            })
+            next_entry = transcript[(i+1)%len(transcript)]
+            conflicts.append({
+                "issue": f"Disagreement in {entry['step']}",
+                "stakeholders": [entry['agent'], next_entry['agent']]
+            })
+
+    # Insights
+    insights = (
+        f"The debate focused on {len(top_keywords)} key terms, with {len(conflicts)} conflicts identified. "
+        f"Sentiment varied, with {sum(1 for s in sentiment_analysis if s['tone'] == 'positive')} positive, "
+        f"{sum(1 for s in sentiment_analysis if s['tone'] == 'negative')} negative, and "
+        f"{sum(1 for s in sentiment_analysis if s['tone'] == 'neutral')} neutral statements."
+    )
+
+    # Areas for improvement
+    improvement_areas = []
+    if len(conflicts) > len(transcript) / 4:
+        improvement_areas.append("High conflict rate suggests need for pre-negotiation alignment.")
+    if len(top_keywords) < 2:
+        improvement_areas.append("Limited keyword diversity; encourage broader discussion.")
+
+    # Process suggestions
+    process_suggestions = [
+        "Conduct pre-negotiation workshops to align stakeholder goals.",
+        "Use a neutral facilitator to manage conflicts.",
+        "Implement structured decision-making frameworks to reduce ambiguity.",
+        "Encourage evidence-based arguments to minimize bias."
+    ]
+
+    return {
+        "topics": top_keywords,  # Renamed from "keywords" for compatibility with app.py
+        "sentiment_analysis": sentiment_analysis,
+        "key_arguments": key_arguments,
+        "conflicts": conflicts,
+        "insights": insights,
+        "improvement_areas": improvement_areas,
+        "process_suggestions": process_suggestions
+    }
 
 def transcript_analyzer(input_data: str) -> str:
     """
@@ -27,91 +137,118 @@ def transcript_analyzer(input_data: str) -> str:
     """
     try:
         data = json.loads(input_data)
-        transcript = data.get("transcript", [])
-        dilemma = data.get("dilemma", "")
-
-        # Initialize sentiment analyzer
-        sid = SentimentIntensityAnalyzer()
-        stop_words = set(stopwords.words('english'))
-
-        # Keyword frequency analysis (replacing topic modeling)
-        words = [word.lower() for entry in transcript for word in word_tokenize(entry['message']) if word.lower() not in stop_words and word.isalnum()]
-        word_freq = Counter(words)
-        top_keywords = [{"label": f"Keyword {i+1}", "keywords": [word], "weight": count / len(words)} for i, (word, count) in enumerate(word_freq.most_common(5))]
-
-        # Sentiment analysis
-        sentiment_analysis = []
-        for entry in transcript:
-            scores = sid.polarity_scores(entry['message'])
-            tone = "positive" if scores['compound'] > 0.1 else "negative" if scores['compound'] < -0.1 else "neutral"
-            sentiment_analysis.append({
-                "agent": entry['agent'],
-                "round": entry['round'],
-                "tone": tone,
-                "score": scores['compound']
-            })
-
-        # Argument mining
-        key_arguments = []
-        conflicts = []
-        for i, entry in enumerate(transcript):
-            message = entry['message'].lower()
-            if any(word in message for word in ["propose", "suggest", "recommend"]):
-                key_arguments.append({
-                    "agent": entry['agent'],
-                    "type": "Proposal",
-                    "content": entry['message'][:100] + "..."
-                })
-            elif any(word in message for word in ["agree", "support"]):
-                key_arguments.append({
-                    "agent": entry['agent'],
-                    "type": "Agreement",
-                    "content": entry['message'][:100] + "..."
-                })
-            elif any(word in message for word in ["disagree", "conflict", "oppose"]):
-                key_arguments.append({
-                    "agent": entry['agent'],
-                    "type": "Disagreement",
-                    "content": entry['message'][:100] + "..."
-                })
-                next_entry = transcript[(i+1)%len(transcript)]
-                conflicts.append({
-                    "issue": f"Disagreement in {entry['step']}",
-                    "stakeholders": [entry['agent'], next_entry['agent']]
-                })
-
-        # Insights
-        insights = (
-            f"The debate focused on {len(top_keywords)} key terms, with {len(conflicts)} conflicts identified. "
-            f"Sentiment varied, with {sum(1 for s in sentiment_analysis if s['tone'] == 'positive')} positive, "
-            f"{sum(1 for s in sentiment_analysis if s['tone'] == 'negative')} negative, and "
-            f"{sum(1 for s in sentiment_analysis if s['tone'] == 'neutral')} neutral statements."
-        )
-
-        # Areas for improvement
-        improvement_areas = []
-        if len(conflicts) > len(transcript) / 4:
-            improvement_areas.append("High conflict rate suggests need for pre-negotiation alignment.")
-        if len(top_keywords) < 2:
-            improvement_areas.append("Limited keyword diversity; encourage broader discussion.")
-
-        # Process suggestions
-        process_suggestions = [
-            "Conduct pre-negotiation workshops to align stakeholder goals.",
-            "Use a neutral facilitator to manage conflicts.",
-            "Implement structured decision-making frameworks to reduce ambiguity.",
-            "Encourage evidence-based arguments to minimize bias."
-        ]
-
-        analysis = {
-            "topics": top_keywords,  # Renamed from "keywords" for compatibility with app.py
-            "sentiment_analysis": sentiment_analysis,
-            "key_arguments": key_arguments,
-            "conflicts": conflicts,
-            "insights": insights,
-            "improvement_areas": improvement_areas,
-            "process_suggestions": process_suggestions
-        }
-        return json.dumps(analysis)
     except Exception as e:
         return json.dumps({"error": f"Analysis failed: {str(e)}"})
+    return json.dumps(analyze_transcript(data.get("transcript", [])))
+
+def analyze_transcript(transcript: Sequence[Dict]) -> Dict:
+    """
+    Analyze a transcript already in memory, as transcript_analyzer does without the JSON round trip.
+
+    Returns:
+        Dict: The analysis (see analyze_entries), or {"error": ...} if it failed.
+    """
+    try:
+        return analyze_entries(transcript)
+    except Exception as e:
+        return {"error": f"Analysis failed: {str(e)}"}
+
+def _empty_columns() -> Dict[str, Dict[str, List]]:
+    return {
+        "sentiment": {"transcript": [], "agent": [], "round": [], "tone": [], "score": []},
+        "keywords": {"transcript": [], "keyword": [], "weight": []},
+        "arguments": {"transcript": [], "agent": [], "type": [], "content": []},
+        "conflicts": {"transcript": [], "issue": [], "stakeholders": []},
+        "errors": {"transcript": [], "error": []}
+    }
+
+def _extend_columns(columns: Dict[str, Dict[str, List]], part: Dict[str, Dict[str, List]]):
+    for table, fields in part.items():
+        for field, values in fields.items():
+            columns[table][field].extend(values)
+
+def _analyze_chunk(start: int, transcripts: List[List[Dict]]) -> Dict[str, Dict[str, List]]:
+    """Analyze consecutive transcripts, numbered from start, into column lists."""
+    columns = _empty_columns()
+    for offset, transcript in enumerate(transcripts):
+        index = start + offset
+        try:
+            analysis = analyze_entries(transcript)
+        except Exception as e:
+            columns["errors"]["transcript"].append(index)
+            columns["errors"]["error"].append(f"Analysis failed: {str(e)}")
+            continue
+        sentiment = columns["sentiment"]
+        for s in analysis["sentiment_analysis"]:
+            sentiment["transcript"].append(index)
+            sentiment["agent"].append(s["agent"])
+            sentiment["round"].append(s["round"])
+            sentiment["tone"].append(s["tone"])
+            sentiment["score"].append(s["score"])
+        for topic in analysis["topics"]:
+            columns["keywords"]["transcript"].append(index)
+            columns["keywords"]["keyword"].append(topic["keywords"][0])
+            columns["keywords"]["weight"].append(topic["weight"])
+        for arg in analysis["key_arguments"]:
+            columns["arguments"]["transcript"].append(index)
+            columns["arguments"]["agent"].append(arg["agent"])
+            columns["arguments"]["type"].append(arg["type"])
+            columns["arguments"]["content"].append(arg["content"])
+        for conflict in analysis["conflicts"]:
+            columns["conflicts"]["transcript"].append(index)
+            columns["conflicts"]["issue"].append(conflict["issue"])
+            columns["conflicts"]["stakeholders"].append(conflict["stakeholders"])
+    return columns
+
+def _init_worker():
+    # Load VADER and the stopwords once per worker rather than once per transcript
+    try:
+        get_models()
+    except LookupError:
+        # Reported per transcript in the errors table instead of breaking the pool
+        pass
+
+def analyze_transcripts(transcripts: Iterable[List[Dict]], workers: Optional[int] = ANALYSIS_WORKERS, chunk_size: int = ANALYSIS_CHUNK_SIZE) -> Dict:
+    """
+    Analyze many transcripts at once, fanned out over a process pool.
+
+    Each worker loads the NLP models once and analyzes transcripts in chunks, so thousands of stored
+    transcripts can be scored in one call. Results come back as columns rather than one analysis dict
+    per transcript; every row carries the index of its transcript in the input.
+
+    Args:
+        transcripts (Iterable[List[Dict]]): Transcripts, each a list of entries with agent, round, step, and message.
+            Consumed lazily, so a generator over stored runs works without loading them all up front.
+        workers (Optional[int]): Worker processes; None uses every CPU, 1 analyzes in this process.
+        chunk_size (int): Transcripts per task sent to a worker.
+
+    Returns:
+        Dict: "transcripts" (count) and column tables "sentiment" (transcript, agent, round, tone, score),
+        "keywords" (transcript, keyword, weight), "arguments" (transcript, agent, type, content),
+        "conflicts" (transcript, issue, stakeholders) and "errors" (transcript, error), each a dict of
+        equal-length lists ready for pandas.DataFrame.
+    """
+    workers = workers or os.cpu_count() or 1
+    iterator = iter(transcripts)
+    chunks = iter(lambda: list(islice(iterator, chunk_size)), [])
+    columns = _empty_columns()
+    count = 0
+
+    if workers == 1:
+        for chunk in chunks:
+            _extend_columns(columns, _analyze_chunk(count, chunk))
+            count += len(chunk)
+        return {"transcripts": count, **columns}
+
+    # Spawned workers stay safe inside threaded callers (the Streamlit server, job workers), unlike forked ones
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"), initializer=_init_worker) as executor:
+        # Keep a bounded number of chunks in flight so a huge catalogue is never fully materialised
+        pending = []
+        for chunk in chunks:
+            pending.append(executor.submit(_analyze_chunk, count, chunk))
+            count += len(chunk)
+            if len(pending) >= 2 * workers:
+                _extend_columns(columns, pending.pop(0).result())
+        for future in pending:
+            _extend_columns(columns, future.result())
+    return {"transcripts": count, **columns}
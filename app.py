@@ -2,26 +2,39 @@ import streamlit as st
 import json
 import os
 import random
-import PyPDF2
-from io import BytesIO
+from datetime import datetime
+from uuid import uuid4
 from typing import List, Dict
-import matplotlib.pyplot as plt
-import plotly.express as px
-import pandas as pd
-import networkx as nx
-from agents.extractor import extract_decision_structure
-from agents.persona_builder import generate_personas
-from agents.debater import simulate_debate
-from agents.summarizer import generate_summary_and_suggestion
-from agents.transcript_analyzer import transcript_analyzer
-from utils.visualizer import generate_visualizations
-from utils.db import save_persona, get_all_personas, init_db, update_persona, delete_persona
+from utils.lazy import lazy_import, lazy_function
+from utils.telemetry import get_telemetry, telemetry_tags, summarize_records
+
+# Heavy libraries and the LLM agents load on first use, so the landing page renders without them
+load_pdf = lazy_function("utils.pdf_ingest", "load_pdf")
+px = lazy_import("plotly.express")
+pd = lazy_import("pandas")
+extract_decision_structure = lazy_function("agents.extractor", "extract_decision_structure")
+generate_personas = lazy_function("agents.persona_builder", "generate_personas")
+WorkerPool = lazy_function("agents.job_worker", "WorkerPool")
+select_passages = lazy_function("agents.retrieval", "select_passages")
+format_passages = lazy_function("agents.retrieval", "format_passages")
+generate_visualizations = lazy_function("utils.visualizer", "generate_visualizations")
+wordcloud_png = lazy_function("utils.visualizer", "wordcloud_png")
+network_figure_json = lazy_function("utils.visualizer", "network_figure_json")
+process_flowchart_png = lazy_function("utils.visualizer", "process_flowchart_png")
+pio = lazy_import("plotly.io")
+from utils.db import save_persona, save_personas, init_db, update_persona, delete_persona, index_personas, index_persona_files, search_personas
+from utils.runs import init_runs, input_hash, save_run, load_run, list_runs, load_checkpoint
+from utils.transcript import Transcript
+from utils.jobs import FINISHED, init_jobs, submit_job, get_job, job_events, cancel_job, call_records
+from config import JOB_LOCAL_WORKERS, JOB_POLL_INTERVAL_S, PERSONA_DIR
 
 # Initialize database
 init_db()
+init_runs()
+init_jobs()
 
 # Create personas directory
-os.makedirs("personas", exist_ok=True)
+os.makedirs(PERSONA_DIR, exist_ok=True)
 
 # Check for API key
 if not os.getenv("XAI_API_KEY"):
@@ -92,6 +105,15 @@ HARDCODED_PERSONAS = [
     }
 ]
 
+# Index the built-in and file personas once per session; unchanged files are skipped
+if "persona_index_synced" not in st.session_state:
+    try:
+        index_personas(HARDCODED_PERSONAS, source="builtin")
+        index_persona_files(PERSONA_DIR)
+    except Exception as e:
+        st.warning(f"Persona library could not be fully indexed: {str(e)}")
+    st.session_state.persona_index_synced = True
+
 # Initialize session state
 if "step" not in st.session_state:
     st.session_state.step = 0
@@ -111,6 +133,20 @@ if "analysis" not in st.session_state:
     st.session_state.analysis = {}
 if "replace_index" not in st.session_state:
     st.session_state.replace_index = {}
+if "job" not in st.session_state:
+    st.session_state.job = None
+if "job_notice" not in st.session_state:
+    st.session_state.job_notice = None
+if "pdf_passages" not in st.session_state:
+    st.session_state.pdf_passages = []
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid4().hex
+if "run_id" not in st.session_state:
+    st.session_state.run_id = None
+if "keywords" not in st.session_state:
+    st.session_state.keywords = []
+if "sweep" not in st.session_state:
+    st.session_state.sweep = None
 
 # Sidebar with logo and navigation
 st.sidebar.image("https://github.com/sargonx646/DF_22AprilLate/raw/main/assets/decisionforge_logo.png.png", use_column_width=True)
@@ -141,17 +177,19 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def read_pdf(file) -> str:
-    """Extract text from uploaded PDF."""
+def read_pdf_chunks(file) -> List[Dict]:
+    """Split uploaded PDF into passages, reusing the cached text of a file seen before."""
     try:
-        pdf_reader = PyPDF2.PdfReader(file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() or ""
-        return text
+        document = load_pdf(file.getvalue())
+        if not document.cached:
+            progress = st.progress(0.0, text="Reading PDF...")
+            for page_num, _ in document.iter_pages():
+                progress.progress((page_num + 1) / document.page_count, text=f"Reading PDF page {page_num + 1} of {document.page_count}")
+            progress.empty()
+        return list(document.iter_chunks())
     except Exception as e:
         st.error(f"Error reading PDF: {str(e)}")
-        return ""
+        return []
 
 def generate_mock_dilemma():
     """Generate a mock decision dilemma."""
@@ -172,7 +210,7 @@ def generate_mock_dilemma():
 def save_persona_to_json(persona: Dict, filename: str):
     """Save persona to a JSON file."""
     try:
-        with open(f"personas/{filename}", "w") as f:
+        with open(os.path.join(PERSONA_DIR, filename), "w") as f:
             json.dump(persona, f, indent=2)
     except Exception as e:
         st.error(f"Error saving persona to JSON: {str(e)}")
@@ -180,7 +218,7 @@ def save_persona_to_json(persona: Dict, filename: str):
 def load_persona_from_json(filename: str) -> Dict:
     """Load persona from a JSON file or return embedded data."""
     try:
-        with open(f"personas/{filename}", "r") as f:
+        with open(os.path.join(PERSONA_DIR, filename), "r") as f:
             return json.load(f)
     except FileNotFoundError:
         for persona in HARDCODED_PERSONAS:
@@ -238,24 +276,308 @@ def display_persona_cards(personas: List[Dict]):
                     st.session_state.replace_index[i] = True
                     st.rerun()
                 if st.session_state.replace_index.get(i, False):
-                    saved_personas = get_all_personas()
-                    hardcoded_personas = HARDCODED_PERSONAS
-                    library_options = [p["name"] for p in saved_personas + hardcoded_personas if p]
+                    query = st.text_input("Search Library", key=f"search_persona_{i}", placeholder="Name, role, trait, goal...")
+                    results = search_personas(query)
+                    library_options = results["personas"]
                     if library_options:
-                        selected_persona = st.selectbox("Select Persona", library_options, key=f"select_persona_{i}")
+                        selected_persona = st.selectbox(
+                            "Select Persona", library_options, key=f"select_persona_{i}",
+                            format_func=lambda p: f"{p['name']} ({p.get('role', 'Unknown Role')})"
+                        )
+                        if results["total"] > len(library_options):
+                            st.caption(f"Showing the top {len(library_options)} of {results['total']} matches; refine the search to narrow them down.")
                         if st.button("Confirm Replace", key=f"confirm_replace_{i}"):
-                            for p in saved_personas + hardcoded_personas:
-                                if p and p["name"] == selected_persona:
-                                    personas[i] = p
-                                    save_persona(p)
-                                    save_persona_to_json(p, f"{p['name'].replace(' ', '_').lower()}.json")
-                                    st.session_state.replace_index[i] = False
-                                    st.rerun()
+                            p = {k: v for k, v in selected_persona.items() if k != "id"}
+                            personas[i] = p
+                            save_persona(p)
+                            save_persona_to_json(p, f"{p['name'].replace(' ', '_').lower()}.json")
+                            st.session_state.replace_index[i] = False
+                            st.rerun()
                     else:
-                        st.warning("No personas in library.")
+                        st.warning("No matching personas in library." if query else "No personas in library.")
             except Exception as e:
                 st.error(f"Error in replace persona: {str(e)}")
 
+def display_transcript_entry(entry: Dict):
+    """Render a single debate transcript entry."""
+    st.markdown(f"**{entry['agent']} (Round {entry['round']}, {entry['step']})**")
+    st.write(entry['message'])
+    if "latency" in entry:
+        st.caption(f"Response time: {entry['latency']:.1f}s")
+    st.markdown("---")
+
+def display_monte_carlo_results(monte_carlo: Dict):
+    """Show outcome distributions from a Monte Carlo simulation."""
+    st.markdown("### Monte Carlo Outcomes")
+    agreement = monte_carlo["agreement"]
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Simulated Debates", f"{monte_carlo['runs']:,}")
+    col2.metric("Mean Agreement", f"{agreement['mean']:.0%}", help=f"95% CI {agreement['ci95'][0]:.1%}–{agreement['ci95'][1]:.1%}")
+    col3.metric("Consensus Rate", f"{monte_carlo['consensus_rate']:.0%}")
+    df = pd.DataFrame({
+        "Share of Stakeholders": [float(k) for k in agreement["distribution"]] * 2,
+        "Probability": list(agreement["distribution"].values()) + list(monte_carlo["compromise"]["distribution"].values()),
+        "Outcome": ["Agree"] * len(agreement["distribution"]) + ["Compromise"] * len(monte_carlo["compromise"]["distribution"])
+    })
+    fig = px.bar(df, x="Share of Stakeholders", y="Probability", color="Outcome", barmode="group", title="Final-Round Outcome Distribution")
+    st.plotly_chart(fig, use_container_width=True)
+    df = pd.DataFrame(monte_carlo["round_shares"]).melt(id_vars="round", var_name="Decision", value_name="Share")
+    fig = px.line(df, x="round", y="Share", color="Decision", title="Mean Decision Shares by Round")
+    st.plotly_chart(fig, use_container_width=True)
+
+def display_game_theory_results(game: Dict):
+    """Show the equilibrium path and equilibria from a game theory simulation."""
+    st.markdown("### Game Theory Outcomes")
+    col1, col2 = st.columns(2)
+    col1.metric("Pure Nash Equilibria", game["pure_equilibrium_count"])
+    col2.metric("Mixed Equilibrium Epsilon", f"{game['mixed_equilibrium']['epsilon']:.3f}")
+    path = pd.DataFrame([step["profile"] for step in game["path"]], columns=game["players"], index=[f"Round {step['round']}" for step in game["path"]])
+    st.markdown("**Strategy Path**")
+    st.dataframe(path, use_container_width=True)
+    mixed = pd.DataFrame(game["mixed_equilibrium"]["strategies"], columns=game["strategies"], index=game["players"])
+    st.markdown("**Mixed Equilibrium (probability of each strategy)**")
+    st.dataframe(mixed.style.format("{:.2f}"), use_container_width=True)
+
+def display_transcript(transcript: List[Dict]):
+    """Render a debate transcript, with Monte Carlo and game-theory results after their summary entries."""
+    for entry in transcript:
+        display_transcript_entry(entry)
+        if entry.get("monte_carlo", {}).get("runs"):
+            display_monte_carlo_results(entry["monte_carlo"])
+        if entry.get("game_theory"):
+            display_game_theory_results(entry["game_theory"])
+
+@st.cache_resource
+def start_job_workers():
+    """Start the local job worker pool once per server; None when JOB_LOCAL_WORKERS leaves jobs to job_service.py."""
+    if JOB_LOCAL_WORKERS <= 0:
+        return None
+    return WorkerPool(JOB_LOCAL_WORKERS).start()
+
+def start_job(kind: str, payload: Dict, **state):
+    """
+    Queue a job for the worker pool and follow it from this session; its LLM calls are tagged with the session.
+
+    Any extra keyword arguments are kept with the session's job, e.g. to collect what it streams.
+    """
+    pool = start_job_workers()
+    if pool:
+        pool.ensure_running()
+    payload = {**payload, "session": st.session_state.session_id}
+    st.session_state.job = {"id": submit_job(kind, payload), "kind": kind, "seq": 0, **state}
+    st.session_state.job_notice = None
+
+def stop_job():
+    """Ask the worker to stop the session's job; a simulation keeps the turns it already generated."""
+    if st.session_state.job:
+        cancel_job(st.session_state.job["id"])
+
+def apply_job_result(job: Dict):
+    """Take a finished job's outcome into the session and move to the step that shows it."""
+    active = st.session_state.job
+    kind = active["kind"]
+    st.session_state.job = None
+    if kind in ("simulate", "resume"):
+        if job["status"] == "failed":
+            st.session_state.job_notice = ("error", f"Simulation failed: {job['error']}")
+        elif st.session_state.transcript:
+            st.session_state.step = 4
+        else:
+            st.session_state.job_notice = ("warning", "Simulation stopped before any turns were generated.")
+    elif kind == "analyze":
+        if job["status"] == "completed":
+            result = job["result"]
+            st.session_state.summary = result["summary"]
+            st.session_state.suggestion = result["suggestion"]
+            st.session_state.analysis = result["analysis"]
+            st.session_state.keywords = result["keywords"]
+            try:
+                generate_visualizations(st.session_state.keywords, st.session_state.transcript, st.session_state.personas)
+            except Exception as e:
+                st.session_state.job_notice = ("error", f"Failed to generate visualizations: {str(e)}")
+        else:
+            st.session_state.job_notice = ("error", f"Failed to generate analysis: {job['error'] or job['status']}")
+        st.session_state.step = 5
+    elif kind == "sweep":
+        if job["status"] == "failed":
+            st.session_state.job_notice = ("error", f"Sweep failed: {job['error']}")
+        elif active["results"] and job["result"]:
+            st.session_state.sweep = {"results": sorted(active["results"], key=lambda r: r["index"]), "matrix": job["result"]["matrix"]}
+        else:
+            st.session_state.job_notice = ("warning", "Sweep stopped before any variant finished.")
+
+@st.fragment(run_every=JOB_POLL_INTERVAL_S)
+def watch_job():
+    """Poll the session's job, streaming new transcript entries (or sweep results) in, until it finishes and the app moves on."""
+    active = st.session_state.job
+    if not active:
+        return
+    # Read the status before the events, so none written before it finished are missed
+    job = get_job(active["id"], with_result=False)
+    if job is None:
+        st.session_state.job = None
+        st.rerun()
+    events = job_events(active["id"], after=active["seq"])
+    if events:
+        active["seq"] = events[-1]["seq"]
+        if active["kind"] in ("simulate", "resume"):
+            st.session_state.transcript.extend(event["data"] for event in events)
+        elif active["kind"] == "sweep":
+            active["results"].extend(event["data"] for event in events)
+    if job["status"] in FINISHED:
+        apply_job_result(get_job(active["id"]))
+        st.rerun()
+    if job["status"] == "queued":
+        st.info("Queued, waiting for a free worker...")
+    elif job["status"] == "cancelling":
+        st.info("Stopping after the current turn...")
+    elif active["kind"] == "analyze":
+        st.info("Generating summary, suggestions, and visualizations...")
+    if active["kind"] in ("simulate", "resume"):
+        st.button("Stop Simulation", key="stop_simulation", on_click=stop_job, disabled=job["status"] != "running")
+        display_transcript(st.session_state.transcript)
+    elif active["kind"] == "sweep":
+        finished = active["results"]
+        st.progress(len(finished) / active["variants"], text=f"Finished {finished[-1]['name']}" if finished else f"Running {active['variants']} variants...")
+        st.button("Stop Sweep", key="stop_sweep", on_click=stop_job, disabled=job["status"] != "running")
+
+def persist_run(run: Dict):
+    """Save (part of) the current run, keeping its ID in the session; a storage failure never stops the app."""
+    try:
+        st.session_state.run_id = save_run({"id": st.session_state.run_id, **run} if st.session_state.run_id else run)
+    except Exception as e:
+        st.warning(f"Could not save this run: {str(e)}")
+
+def reopen_run(run_id: str):
+    """Restore a saved run into the session and jump to its results, without recomputing anything."""
+    run = load_run(run_id)
+    if not run:
+        st.error("That run is no longer available.")
+        return
+    inputs = run["inputs"] or {}
+    results = run["analysis"] or {}
+    st.session_state.run_id = run["id"]
+    st.session_state.dilemma = inputs.get("dilemma", "")
+    st.session_state.pdf_passages = inputs.get("pdf_passages", [])
+    st.session_state.extracted = run["extracted"] or {}
+    st.session_state.personas = run["personas"] or []
+    st.session_state.transcript = run["transcript"] or []
+    st.session_state.summary = results.get("summary", "")
+    st.session_state.suggestion = results.get("suggestion", "")
+    st.session_state.analysis = results.get("analysis", {})
+    st.session_state.keywords = results.get("keywords", [])
+    st.session_state.replace_index = {}
+    # A job still running for the previous run finishes in the background and saves to that run
+    st.session_state.job = None
+    st.session_state.step = 5 if run["analysis"] is not None else 4
+
+def display_past_runs():
+    """List recent runs in the sidebar, each with a button to reopen it."""
+    with st.sidebar.expander("Past Runs"):
+        try:
+            runs = list_runs()
+        except Exception as e:
+            st.warning(f"Could not load past runs: {str(e)}")
+            return
+        if not runs:
+            st.write("No saved runs yet.")
+        for run in runs:
+            st.markdown(f"**{run['title'] or 'Untitled run'}**")
+            st.caption(
+                f"{datetime.fromtimestamp(run['updated_at']):%Y-%m-%d %H:%M} · {run['simulation_type']} · "
+                f"{run['turns']} turns · {run['status']}"
+            )
+            if st.button("Reopen", key=f"reopen_run_{run['id']}"):
+                reopen_run(run["id"])
+                st.rerun()
+
+def display_continue_debate():
+    """Offer to finish an interrupted run, or extend a finished one, from its last completed round."""
+    run_id = st.session_state.run_id
+    try:
+        checkpoint = load_checkpoint(run_id) if run_id else None
+    except Exception as e:
+        st.warning(f"Could not load the run checkpoint: {str(e)}")
+        return
+    if not checkpoint:
+        return
+    completed, planned = checkpoint["next_round"], checkpoint["rounds"]
+    with st.expander(f"Continue Debate ({completed} of {planned} rounds completed)", expanded=completed < planned):
+        extra = st.number_input("Additional rounds", min_value=0, max_value=10, value=0 if completed < planned else 1, key="extra_rounds")
+        target = max(planned, completed) + extra
+        if st.button("Continue Debate", key="continue_debate", disabled=target <= completed):
+            # Earlier rounds come from the checkpoint; only the remaining ones are simulated
+            st.session_state.transcript = list(checkpoint["transcript"])
+            start_job("resume", {"run_id": run_id, "rounds": target})
+            st.rerun()
+
+def parse_sweep_variants(rows: List[Dict]) -> List[Dict]:
+    """Turn the sweep editor's rows into variants, skipping empty rows; lists are comma- or '>'-separated."""
+    variants = []
+    for i, row in enumerate(rows):
+        name, scenarios = str(row.get("name") or "").strip(), str(row.get("scenarios") or "").strip()
+        exclude = [p.strip() for p in str(row.get("exclude") or "").split(",") if p.strip()]
+        process = [p.strip() for p in str(row.get("process") or "").split(">") if p.strip()]
+        if not (name or scenarios or exclude or process):
+            continue
+        variants.append({"name": name or f"Variant {i + 1}", "scenarios": scenarios, "exclude": exclude, "process": process})
+    return variants
+
+def display_scenario_sweep(simulation_type: str, max_simulation_time: int):
+    """Debate several what-if variants of the dilemma at once and compare their outcomes side by side."""
+    sweeping = st.session_state.job is not None and st.session_state.job["kind"] == "sweep"
+    with st.expander("Scenario Sweep", expanded=sweeping or st.session_state.sweep is not None):
+        st.write(
+            "Compare variants of this dilemma without repeating the earlier steps: one row per variant, with an optional scenario, "
+            "personas to leave out (comma-separated) and a different process order (steps separated by '>'). "
+            "All variants share the extracted structure and personas and run together within the time limit."
+        )
+        # The reversed order, so the default row actually changes the debate
+        reversed_process = " > ".join(reversed(st.session_state.extracted.get("process", [])))
+        rows = st.data_editor(
+            [
+                {"name": "Baseline", "scenarios": "", "exclude": "", "process": ""},
+                {"name": "Reduced budget", "scenarios": "The available budget is cut by 30%.", "exclude": "", "process": ""},
+                {"name": "Reordered process", "scenarios": "", "exclude": "", "process": reversed_process}
+            ],
+            num_rows="dynamic",
+            use_container_width=True,
+            key="sweep_variants"
+        )
+        if st.button("Run Sweep", key="run_sweep", disabled=st.session_state.job is not None):
+            variants = parse_sweep_variants(rows)
+            if not variants:
+                st.warning("Add at least one variant.")
+                return
+            dilemma = str(st.session_state.dilemma) if st.session_state.dilemma else "Unknown dilemma"
+            # A worker debates the variants, streaming each result back as it finishes
+            st.session_state.sweep = None
+            start_job("sweep", {
+                "variants": variants,
+                "personas": st.session_state.personas,
+                "dilemma": dilemma,
+                "process_hint": dilemma,
+                "extracted": st.session_state.extracted,
+                "simulation_type": simulation_type,
+                "max_simulation_time": max_simulation_time
+            }, results=[], variants=len(variants))
+            st.rerun()
+        if sweeping:
+            watch_job()
+        sweep = st.session_state.sweep
+        if not sweep:
+            return
+        st.markdown("#### Variant Comparison")
+        st.dataframe(pd.DataFrame(sweep["matrix"]).set_index("variant"), use_container_width=True)
+        names = [result["name"] for result in sweep["results"]]
+        chosen = st.selectbox("Open a variant's debate:", names, key="sweep_open_variant")
+        if st.button("Open Variant", key="open_sweep_variant"):
+            # The variant becomes the current debate, ready for the usual analysis in Steps 4 and 5
+            st.session_state.transcript = sweep["results"][names.index(chosen)]["transcript"]
+            st.session_state.run_id = None
+            st.session_state.step = 4
+            st.rerun()
+
 def display_process_visualization(process: List[str]):
     """Display the decision-making process as ASCII timeline, graph, and a networkx graph."""
     st.markdown("### Decision-Making Process")
@@ -275,20 +597,7 @@ def display_process_visualization(process: List[str]):
     st.code(ascii_graph)
     st.markdown("#### Process Flowchart")
     try:
-        if not hasattr(nx, 'DiGraph'):
-            raise ImportError("networkx module is not properly loaded")
-        G = nx.DiGraph()
-        for i, step in enumerate(process):
-            G.add_node(f"S{i+1}", label=step)
-            if i < len(process) - 1:
-                G.add_edge(f"S{i+1}", f"S{i+2}")
-        G.add_node("End", label="End")
-        G.add_edge(f"S{len(process)}", "End")
-        pos = nx.spring_layout(G)
-        plt.figure(figsize=(10, 6))
-        nx.draw(G, pos, with_labels=True, labels=nx.get_node_attributes(G, 'label'), node_color='lightblue', node_size=2000, font_size=10, font_weight='bold', arrows=True)
-        st.pyplot(plt)
-        plt.close()
+        st.image(process_flowchart_png(process), use_column_width=True)
     except ImportError as e:
         st.error(f"Failed to generate process graph: {str(e)}. Please ensure networkx is installed.")
     except Exception as e:
@@ -296,6 +605,12 @@ def display_process_visualization(process: List[str]):
 
 def main():
     st.markdown("<h1 class='main-title'>DecisionTwin for Decision Making</h1>", unsafe_allow_html=True)
+    if st.session_state.step > 0:
+        display_past_runs()
+    if st.session_state.job_notice:
+        level, message = st.session_state.job_notice
+        st.session_state.job_notice = None
+        getattr(st, level)(message)
 
     # Step 0: Password Authentication
     if st.session_state.step == 0:
@@ -328,13 +643,13 @@ def main():
             uploaded_file = st.file_uploader("Upload a PDF with additional context (optional)", type="pdf", key="pdf_upload")
             if st.form_submit_button("Extract Decision Structure"):
                 if context_input.strip():
-                    if uploaded_file:
-                        pdf_text = read_pdf(uploaded_file)
-                        context_input += "\n\nPDF Context:\n" + pdf_text
+                    # Only the PDF passages most relevant to the dilemma go into the prompt
+                    st.session_state.pdf_passages = select_passages(read_pdf_chunks(uploaded_file), context_input) if uploaded_file else []
+                    excerpts = format_passages(st.session_state.pdf_passages)
                     try:
                         with st.spinner("Extracting decision structure..."):
-                            st.session_state.extracted = extract_decision_structure(context_input, context_input, "")
-                            st.session_state.dilemma = context_input
+                            st.session_state.extracted = extract_decision_structure(context_input, context_input, "", excerpts=excerpts)
+                            st.session_state.dilemma = context_input + ("\n\nPDF Context:\n" + excerpts if excerpts else "")
                         st.session_state.step = 2
                         st.success("Decision structure extracted successfully!")
                         st.rerun()
@@ -349,6 +664,11 @@ def main():
         st.info("Review and modify the AI-generated personas and process. Use the persona library to swap or save personas.")
         st.markdown("### Decision Context")
         st.markdown(f'<div class="step-box">{st.session_state.dilemma}</div>', unsafe_allow_html=True)
+        if st.session_state.pdf_passages:
+            with st.expander(f"PDF passages used for extraction ({len(st.session_state.pdf_passages)})"):
+                for passage in st.session_state.pdf_passages:
+                    st.markdown(f"**Page {passage['page'] + 1}** · relevance {passage['score']:.2f}")
+                    st.write(passage["text"])
         st.markdown("### Personas")
         if not st.session_state.personas:
             st.write("Debug: Extracted data:", st.session_state.extracted)  # Enhanced debug
@@ -357,8 +677,8 @@ def main():
                     with st.spinner("Generating personas..."):
                         st.session_state.personas = generate_personas(st.session_state.extracted)
                         st.session_state.replace_index = {}
+                        save_personas(st.session_state.personas)
                         for persona in st.session_state.personas:
-                            save_persona(persona)
                             save_persona_to_json(persona, f"{persona['name'].replace(' ', '_').lower()}.json")
                     st.success("Personas generated and saved successfully!")
                     st.rerun()
@@ -368,10 +688,22 @@ def main():
         else:
             display_persona_cards(st.session_state.personas)
         st.markdown("### Persona Library")
-        saved_personas = get_all_personas()
-        if saved_personas:
-            with st.expander("View/Edit Persona Library", expanded=False):
-                for persona in saved_personas:
+        with st.expander("View/Edit Persona Library", expanded=False):
+            library_query = st.text_input("Search Library", key="library_search", placeholder="Name, role, trait, goal...")
+            if st.session_state.get("library_last_query") != library_query:
+                st.session_state.library_page = 1
+                st.session_state.library_last_query = library_query
+            results = search_personas(library_query, page=st.session_state.get("library_page", 1) - 1)
+            if results["pages"] and st.session_state.get("library_page", 1) > results["pages"]:
+                st.session_state.library_page = results["pages"]
+                results = search_personas(library_query, page=results["pages"] - 1)
+            if results["pages"] > 1:
+                st.number_input(f"Page (of {results['pages']})", min_value=1, max_value=results["pages"], key="library_page")
+            st.caption(f"{results['total']} persona(s) found.")
+            if not results["personas"]:
+                st.write("No matching personas in library." if library_query else "No personas in library.")
+            else:
+                for persona in results["personas"]:
                     if not persona.get("id"):
                         continue
                     with st.form(key=f"edit_db_persona_{persona['id']}", clear_on_submit=True):
@@ -393,17 +725,19 @@ def main():
                                     "bio": bio,
                                     "expected_behavior": expected_behavior
                                 }
-                                update_persona(updated_persona)
-                                save_persona_to_json(updated_persona, f"{name.replace(' ', '_').lower()}.json")
-                                st.success(f"Persona {name} updated in database!")
-                                st.rerun()
+                                try:
+                                    update_persona(updated_persona)
+                                except ValueError as e:
+                                    st.error(f"Could not update persona: {str(e)}")
+                                else:
+                                    save_persona_to_json({**persona, **updated_persona}, f"{name.replace(' ', '_').lower()}.json")
+                                    st.success(f"Persona {name} updated in database!")
+                                    st.rerun()
                         with col2:
                             if st.form_submit_button("Delete Persona"):
                                 delete_persona(persona["id"])
                                 st.success(f"Persona {name} deleted from database!")
                                 st.rerun()
-        else:
-            st.write("No personas in library.")
         st.markdown("### Decision Process")
         if st.session_state.extracted.get("process"):
             display_process_visualization(st.session_state.extracted["process"])
@@ -437,68 +771,99 @@ def main():
             key="simulation_time"
         )
         simulation_time_seconds = simulation_time_minutes * 60
-        if st.button("Start Simulation", key="start_simulation"):
+        run_hash = input_hash(st.session_state.dilemma, st.session_state.personas, simulation_type, st.session_state.extracted)
+        previous_runs = [run for run in list_runs(input_hash=run_hash) if run["turns"]]
+        if previous_runs:
+            st.info(f"This exact simulation was already run on {datetime.fromtimestamp(previous_runs[0]['updated_at']):%Y-%m-%d %H:%M}.")
+            if st.button("Reopen Previous Run", key="reopen_previous_run"):
+                reopen_run(previous_runs[0]["id"])
+                st.rerun()
+        if st.button("Start Simulation", key="start_simulation", disabled=st.session_state.job is not None):
             try:
-                with st.spinner(f"Running {simulation_type} (timeout: {simulation_time_minutes} minutes)..."):
-                    dilemma = str(st.session_state.dilemma) if st.session_state.dilemma else "Unknown dilemma"
-                    if simulation_type == "AgentIQ Simulation (Work in Progress)":
-                        st.warning("AgentIQ Simulation is under development and not yet available.")
-                        st.session_state.transcript = [{
-                            "agent": "System",
-                            "round": 1,
-                            "step": "N/A",
-                            "message": "AgentIQ Simulation is not implemented. Please select another method."
-                        }]
-                    else:
-                        st.session_state.transcript = simulate_debate(
-                            personas=st.session_state.personas,
-                            dilemma=dilemma,
-                            process_hint=dilemma,
-                            extracted=st.session_state.extracted,
-                            scenarios="",
-                            max_simulation_time=simulation_time_seconds,
-                            simulation_type=simulation_type
-                        )
+                dilemma = str(st.session_state.dilemma) if st.session_state.dilemma else "Unknown dilemma"
+                if simulation_type == "AgentIQ Simulation (Work in Progress)":
+                    st.warning("AgentIQ Simulation is under development and not yet available.")
+                    st.session_state.transcript = [{
+                        "agent": "System",
+                        "round": 1,
+                        "step": "N/A",
+                        "message": "AgentIQ Simulation is not implemented. Please select another method."
+                    }]
+                else:
+                    # A worker runs the debate, saving each round to the run, so stopping keeps everything generated so far
+                    st.session_state.transcript = []
+                    st.session_state.run_id = None
+                    persist_run({
+                        "input_hash": run_hash,
+                        "title": next((line.strip() for line in dilemma.splitlines() if line.strip()), "")[:80],
+                        "simulation_type": simulation_type,
+                        "status": "running",
+                        "inputs": {
+                            "dilemma": st.session_state.dilemma,
+                            "simulation_type": simulation_type,
+                            "max_simulation_time": simulation_time_seconds,
+                            "pdf_passages": st.session_state.pdf_passages
+                        },
+                        "extracted": st.session_state.extracted,
+                        "personas": st.session_state.personas,
+                        "transcript": []
+                    })
+                    start_job("simulate", {
+                        "personas": st.session_state.personas,
+                        "dilemma": dilemma,
+                        "process_hint": dilemma,
+                        "extracted": st.session_state.extracted,
+                        "scenarios": "",
+                        "max_simulation_time": simulation_time_seconds,
+                        "simulation_type": simulation_type,
+                        "run_id": st.session_state.run_id
+                    })
+                    st.rerun()
                 st.session_state.step = 4
-                st.success("Simulation complete!")
                 st.rerun()
             except Exception as e:
                 st.error(f"Simulation failed: {str(e)}")
+        if st.session_state.job and st.session_state.job["kind"] == "simulate":
+            watch_job()
+        if simulation_type != "AgentIQ Simulation (Work in Progress)":
+            display_scenario_sweep(simulation_type, simulation_time_seconds)
 
     # Step 4: Watch Debate
     elif st.session_state.step == 4:
         st.header("Step 4: Watch the Debate")
         st.info("Follow the simulated debate among stakeholders.")
-        for entry in st.session_state.transcript:
-            st.markdown(f"**{entry['agent']} (Round {entry['round']}, {entry['step']})**")
-            st.write(entry['message'])
-            st.markdown("---")
-        if st.button("Analyze Results", key="analyze_results"):
-            try:
-                with st.spinner("Generating summary, suggestions, and visualizations..."):
-                    st.session_state.summary, st.session_state.suggestion = generate_summary_and_suggestion(st.session_state.transcript)
-                    analysis_input = json.dumps({"transcript": st.session_state.transcript, "dilemma": st.session_state.dilemma})
-                    st.session_state.analysis = json.loads(transcript_analyzer(analysis_input))
-                    st.session_state.keywords = [word for entry in st.session_state.transcript for word in entry['message'].split() if len(word) > 5]
-                    generate_visualizations(st.session_state.keywords, st.session_state.transcript, st.session_state.personas)
-                st.session_state.step = 5
-                st.success("Analysis complete!")
-                st.rerun()
-            except Exception as e:
-                st.error(f"Failed to generate analysis: {str(e)}")
-                st.session_state.step = 5
+        job = st.session_state.job
+        if job and job["kind"] == "resume":
+            watch_job()
+        else:
+            display_transcript(st.session_state.transcript)
+        if job:
+            if job["kind"] == "analyze":
+                watch_job()
+        else:
+            display_continue_debate()
+            if st.button("Analyze Results", key="analyze_results"):
+                # The worker saves the summary and analysis with the run
+                start_job("analyze", {
+                    "transcript": st.session_state.transcript,
+                    "dilemma": st.session_state.dilemma,
+                    "run_id": st.session_state.run_id
+                })
                 st.rerun()
 
     # Step 5: View Results
     elif st.session_state.step == 5:
         st.header("Step 5: Unlock Your Insights")
         st.info("Explore the simulation results, optimization suggestions, and visualizations.")
+        transcript = Transcript.from_entries(st.session_state.transcript)
         st.markdown("### Decision Summary")
         st.markdown(f'<div class="summary-box">{st.session_state.summary}</div>', unsafe_allow_html=True)
         st.markdown("### Optimization Suggestion")
         st.markdown(f'<div class="suggestion-box">{st.session_state.suggestion}</div>', unsafe_allow_html=True)
         st.markdown("### Negotiation Analysis")
         analysis = st.session_state.analysis
+        if analysis.get("error"):
+            st.warning(f"Negotiation analysis unavailable: {analysis['error']}")
         if analysis.get("topics"):
             st.markdown("**Key Topics**")
             for topic in analysis["topics"]:
@@ -529,42 +894,15 @@ def main():
 
         st.markdown("### Visual Insights")
         st.subheader("Word Cloud")
+        # Rendered artifacts are cached by content, so reruns and downloads reuse them
         try:
-            fig = plt.figure(figsize=(10, 5))
-            wordcloud = WordCloud(width=800, height=400, background_color='white').generate(" ".join(st.session_state.keywords))
-            plt.imshow(wordcloud, interpolation='bilinear')
-            plt.axis('off')
-            st.pyplot(fig)
-            plt.close()
+            st.image(wordcloud_png(st.session_state.keywords), use_column_width=True)
         except Exception as e:
             st.warning(f"Failed to generate word cloud: {str(e)}")
 
         st.subheader("Stakeholder Interaction Network")
         try:
-            import plotly.graph_objects as go
-            G = nx.DiGraph()
-            agents = list(set(entry['agent'] for entry in st.session_state.transcript))
-            for agent in agents:
-                G.add_node(agent)
-            for i, entry in enumerate(st.session_state.transcript[:-1]):
-                G.add_edge(entry['agent'], st.session_state.transcript[i+1]['agent'])
-            pos = nx.spring_layout(G)
-            edge_x, edge_y = [], []
-            for edge in G.edges():
-                x0, y0 = pos[edge[0]]
-                x1, y1 = pos[edge[1]]
-                edge_x.extend([x0, x1, None])
-                edge_y.extend([y0, y1, None])
-            node_x, node_y = [], []
-            for node in G.nodes():
-                x, y = pos[node]
-                node_x.append(x)
-                node_y.append(y)
-            edge_trace = go.Scatter(x=edge_x, y=edge_y, line=dict(width=0.5, color='#888'), hoverinfo='none', mode='lines')
-            node_trace = go.Scatter(x=node_x, y=node_y, mode='markers+text', text=list(G.nodes()), textposition='top center', marker=dict(size=10, color='lightblue'))
-            fig = go.Figure(data=[edge_trace, node_trace], layout=go.Layout(showlegend=False, hovermode='closest', margin=dict(b=0,l=0,r=0,t=0), xaxis=dict(showgrid=False, zeroline=False), yaxis=dict(showgrid=False, zeroline=False)))
-            fig.update_layout(title="Stakeholder Interaction Network")
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(pio.from_json(network_figure_json(st.session_state.transcript)), use_container_width=True)
         except Exception as e:
             st.warning(f"Failed to generate interaction network: {str(e)}")
 
@@ -586,14 +924,51 @@ def main():
         except Exception as e:
             st.warning(f"Failed to generate sentiment trend: {str(e)}")
 
+        st.subheader("Debate Transcript")
+        with st.expander(f"All {len(transcript)} turns"):
+            filter_col1, filter_col2 = st.columns(2)
+            round_filter = filter_col1.selectbox("Round", ["All"] + transcript.rounds, key="transcript_round")
+            agent_filter = filter_col2.selectbox("Agent", ["All"] + transcript.agents, key="transcript_agent")
+            table = (transcript if round_filter == "All" else transcript.by_round(round_filter)).to_pandas()
+            if agent_filter != "All":
+                table = table[table["agent"] == agent_filter]
+            st.dataframe(table, use_container_width=True, hide_index=True)
+
+        st.markdown("### Performance")
+        # Calls made in this process (extraction, personas) plus those the session's jobs stored
+        session_calls = sorted(
+            [r for r in get_telemetry().records(session=st.session_state.session_id) if not r.get("job")]
+            + call_records(session=st.session_state.session_id),
+            key=lambda r: r["started_at"]
+        )
+        if session_calls:
+            stage_summary = pd.DataFrame(summarize_records(session_calls))
+            st.dataframe(stage_summary, use_container_width=True)
+            st.caption(
+                f"{stage_summary['calls'].sum()} LLM calls, {stage_summary['cached'].sum()} served from cache, "
+                f"{stage_summary['prompt_tokens'].sum() + stage_summary['completion_tokens'].sum()} tokens, "
+                f"estimated cost ${stage_summary['cost_usd'].sum():.4f}"
+            )
+            with st.expander("Per-call details"):
+                st.dataframe(pd.DataFrame(session_calls), use_container_width=True)
+            st.download_button(
+                label="⏱️ Telemetry (JSONL)",
+                data="\n".join(json.dumps(record) for record in session_calls),
+                file_name="telemetry.jsonl",
+                mime="application/x-ndjson",
+                key="download_telemetry"
+            )
+        else:
+            st.write("No LLM calls recorded for this session.")
+
         st.markdown("### Export Results")
         col1, col2, col3, col4 = st.columns(4)
         with col1:
             st.download_button(
-                label="📄 Transcript (JSON)",
-                data=json.dumps(st.session_state.transcript, indent=2),
-                file_name="transcript.json",
-                mime="application/json",
+                label="📄 Transcript (JSONL)",
+                data=transcript.to_jsonl(),
+                file_name="transcript.jsonl",
+                mime="application/x-ndjson",
                 key="download_transcript"
             )
         with col2:
@@ -606,17 +981,9 @@ def main():
             )
         with col3:
             try:
-                buf = BytesIO()
-                fig = plt.figure(figsize=(10, 5))
-                wordcloud = WordCloud(width=800, height=400, background_color='white').generate(" ".join(st.session_state.keywords))
-                plt.imshow(wordcloud, interpolation='bilinear')
-                plt.axis('off')
-                plt.savefig(buf, format="png")
-                plt.close()
-                buf.seek(0)
                 st.download_button(
                     label="🖼️ Word Cloud (PNG)",
-                    data=buf,
+                    data=wordcloud_png(st.session_state.keywords),
                     file_name="word_cloud.png",
                     mime="image/png",
                     key="download_word_cloud"
@@ -645,4 +1012,6 @@ def main():
         ''', unsafe_allow_html=True)
 
 if __name__ == "__main__":
-    main()
+    # Tag every LLM call made during this script run with the browser session
+    with telemetry_tags(session=st.session_state.session_id):
+        main()
@@ -0,0 +1,336 @@
+import argparse
+import json
+import logging
+import multiprocessing
+import sys
+import time
+from multiprocessing.connection import wait
+from typing import Callable, Dict, Iterator, List, Optional, Set
+import numpy as np
+from config import BATCH_WORKERS, BATCH_JOB_TIMEOUT_S, BATCH_TIMEOUT_GRACE_S, BATCH_START_METHOD
+import utils.db as db
+from utils.deadline import Deadline
+from utils.runs import init_runs, input_hash, save_run
+from utils.telemetry import get_telemetry, telemetry_tags
+# Imported up front so forked workers inherit the loaded pipeline instead of each importing it again
+from agents.pipeline import run_pipeline, reset_process_state
+
+RUN_STORE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+
+def read_jobs(path: str) -> Iterator[Dict]:
+    """
+    Read dilemma jobs from a JSONL file, one JSON object per line, lazily.
+
+    Jobs without an "id" get one from their line number, so a rerun over the same file matches them up.
+    A line that is not a JSON object is yielded as a job carrying an "invalid" message.
+    """
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                job = json.loads(line)
+                if not isinstance(job, dict):
+                    raise ValueError(f"expected an object, got {type(job).__name__}")
+            except ValueError as e:
+                yield {"id": f"line-{number}", "invalid": f"Line {number} is not a valid job: {str(e)}"}
+                continue
+            job["id"] = str(job.get("id") or f"line-{number}")
+            yield job
+
+class JsonlSink:
+    """Appends one result per line to a JSONL file as each job finishes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+
+    def completed(self) -> Set[str]:
+        """IDs of jobs that already completed in an earlier run; failed and timed-out jobs are retried."""
+        done = set()
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except ValueError:
+                    # A line cut short by a crash; the job simply runs again
+                    continue
+                if result.get("status") == "completed":
+                    done.add(result["id"])
+        return done
+
+    def write(self, result: Dict):
+        self._file.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+class RunStoreSink:
+    """Saves each result as a run in a SQLite run store, where the app can reopen it like any other run."""
+
+    def __init__(self, path: str):
+        db._db = db.Database(path=path)
+        init_runs()
+        self._database = db._db
+
+    @staticmethod
+    def run_id(job_id: str) -> str:
+        return f"batch-{job_id}"
+
+    def completed(self) -> Set[str]:
+        rows = self._database.reader().execute("SELECT id FROM runs WHERE id LIKE 'batch-%' AND status = 'analyzed'").fetchall()
+        return {row[0][len("batch-"):] for row in rows}
+
+    def write(self, result: Dict):
+        job = result["job"]
+        outputs = result.get("result") or {}
+        run = {
+            "id": self.run_id(result["id"]),
+            "input_hash": input_hash(job.get("dilemma", ""), outputs.get("personas", []), job.get("simulation_type", "Grok 3 Beta Simulation"), outputs.get("extracted")),
+            "title": next((line.strip() for line in str(job.get("dilemma", "")).splitlines() if line.strip()), result["id"])[:80],
+            "simulation_type": job.get("simulation_type", "Grok 3 Beta Simulation"),
+            # Completed jobs are fully analysed; anything else keeps its batch status
+            "status": "analyzed" if result["status"] == "completed" else result["status"],
+            "inputs": {key: value for key, value in job.items() if key != "id"}
+        }
+        if outputs:
+            run.update({
+                "extracted": outputs["extracted"],
+                "personas": outputs["personas"],
+                "transcript": outputs["transcript"],
+                "analysis": {
+                    "summary": outputs["summary"],
+                    "suggestion": outputs["suggestion"],
+                    "analysis": outputs["analysis"],
+                    "keywords": [word for entry in outputs["transcript"] for word in entry["message"].split() if len(word) > 5]
+                }
+            })
+        save_run(run)
+
+    def close(self):
+        self._database.close()
+        if db._db is self._database:
+            db._db = None
+
+def open_sink(path: str):
+    """Pick the result store from the output path: a run store for SQLite files, JSONL otherwise."""
+    return RunStoreSink(path) if path.lower().endswith(RUN_STORE_EXTENSIONS) else JsonlSink(path)
+
+def run_job(job: Dict, timeout_s: float, use_cache: bool = True) -> Dict:
+    """
+    Run one job through the whole pipeline, returning its result record instead of raising.
+
+    The debate is budgeted to end BATCH_TIMEOUT_GRACE_S (at most a quarter of the limit) before
+    timeout_s, leaving time to summarise and analyse what it produced.
+
+    Returns:
+        Dict: id, status ("completed" or "failed"), error, elapsed_s, timings, llm (telemetry per
+        stage), job, and result (the pipeline outputs, when completed).
+    """
+    start = time.time()
+    record = {"id": job["id"], "status": "completed", "error": None, "job": job, "result": None, "timings": {}, "llm": []}
+    try:
+        if "invalid" in job:
+            raise ValueError(job["invalid"])
+        deadline = Deadline(timeout_s - min(BATCH_TIMEOUT_GRACE_S, timeout_s / 4))
+        with telemetry_tags(batch_job=job["id"]):
+            record["result"] = run_pipeline(job, use_cache=use_cache, deadline=deadline)
+        record["timings"] = record["result"].pop("timings")
+    except Exception as e:
+        record["status"] = "failed"
+        record["error"] = f"{type(e).__name__}: {str(e)}"
+    record["llm"] = get_telemetry().summary(batch_job=job["id"])
+    record["elapsed_s"] = round(time.time() - start, 3)
+    record["finished_at"] = time.time()
+    return record
+
+def _worker_main(conn, use_cache: bool):
+    """Worker process loop: run jobs sent over conn until it receives None."""
+    reset_process_state()
+    while True:
+        message = conn.recv()
+        if message is None:
+            return
+        job, timeout_s = message
+        conn.send(run_job(job, timeout_s, use_cache))
+
+class _Worker:
+    """One pooled worker process and the job it is running, if any."""
+
+    def __init__(self, context, use_cache: bool):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, use_cache), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.job: Optional[Dict] = None
+        self.started_at = 0.0
+        self.expires_at = 0.0
+
+    def submit(self, job: Dict, timeout_s: float):
+        self.job = job
+        self.started_at = time.time()
+        self.expires_at = self.started_at + timeout_s
+        self.conn.send((job, timeout_s))
+
+    def stop(self, force: bool = False):
+        if force:
+            self.process.terminate()
+        else:
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+        self.process.join(5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+def _lost_job(worker: _Worker, status: str, error: str) -> Dict:
+    now = time.time()
+    return {"id": worker.job["id"], "status": status, "error": error, "job": worker.job, "result": None, "timings": {}, "llm": [], "elapsed_s": round(now - worker.started_at, 3), "finished_at": now}
+
+def summarize_batch(results: List[Dict], skipped: int, wall_s: float) -> Dict:
+    """Throughput and outcome summary of a batch run."""
+    elapsed = np.array([r["elapsed_s"] for r in results]) if results else np.zeros(1)
+    stages: Dict[str, List[float]] = {}
+    for result in results:
+        for stage, seconds in result["timings"].items():
+            stages.setdefault(stage, []).append(seconds)
+    llm = [row for result in results for row in result["llm"]]
+    return {
+        "jobs": len(results),
+        "completed": sum(1 for r in results if r["status"] == "completed"),
+        "failed": sum(1 for r in results if r["status"] == "failed"),
+        "timeout": sum(1 for r in results if r["status"] == "timeout"),
+        "skipped": skipped,
+        "wall_s": wall_s,
+        "jobs_per_min": len(results) / wall_s * 60 if wall_s > 0 else 0.0,
+        "p50_job_s": float(np.percentile(elapsed, 50)),
+        "p95_job_s": float(np.percentile(elapsed, 95)),
+        "stage_mean_s": {stage: float(np.mean(seconds)) for stage, seconds in stages.items()},
+        "llm_calls": sum(row["calls"] for row in llm),
+        "tokens": sum(row["prompt_tokens"] + row["completion_tokens"] for row in llm),
+        "cost_usd": float(sum(row["cost_usd"] for row in llm))
+    }
+
+def run_batch(jobs_path: str, output_path: str, workers: int = BATCH_WORKERS, timeout_s: float = BATCH_JOB_TIMEOUT_S, use_cache: bool = True, start_method: str = BATCH_START_METHOD, on_result: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """
+    Run every job in a JSONL file across a pool of worker processes, streaming results to a store.
+
+    Each result is written the moment its job finishes, so an interrupted batch loses at most the
+    jobs in flight; rerunning with the same output skips jobs that already completed. A job that
+    overruns its time limit has its worker killed and replaced, and is recorded as "timeout".
+
+    Args:
+        jobs_path (str): JSONL file of jobs as accepted by agents.pipeline.run_pipeline, each with an
+            optional "id" and "timeout_s".
+        output_path (str): JSONL file, or a SQLite run store (.db, .sqlite, .sqlite3) the app can open.
+        workers (int): Worker processes.
+        timeout_s (float): Default per-job time limit in seconds.
+        use_cache (bool): Serve identical LLM requests from the response cache.
+        start_method (str): multiprocessing start method for the workers.
+        on_result (Optional[Callable[[Dict], None]]): Called with each result as it is stored.
+
+    Returns:
+        Dict: Summary from summarize_batch.
+    """
+    context = multiprocessing.get_context(start_method)
+    sink = open_sink(output_path)
+    start = time.time()
+    results: List[Dict] = []
+    skipped = 0
+    pool: List[_Worker] = []
+    try:
+        done = sink.completed()
+        jobs = iter(read_jobs(jobs_path))
+        exhausted = False
+
+        def next_job() -> Optional[Dict]:
+            nonlocal exhausted, skipped
+            for job in jobs:
+                if job["id"] in done:
+                    skipped += 1
+                    continue
+                return job
+            exhausted = True
+            return None
+
+        def finish(result: Dict):
+            sink.write(result)
+            results.append(result)
+            if on_result:
+                on_result(result)
+
+        while True:
+            # Hand a job to every idle worker, starting workers up to the pool size as needed
+            idle = [w for w in pool if w.job is None]
+            while not exhausted and (idle or len(pool) < workers):
+                job = next_job()
+                if job is None:
+                    break
+                if not idle:
+                    pool.append(_Worker(context, use_cache))
+                    idle.append(pool[-1])
+                idle.pop().submit(job, float(job.get("timeout_s", timeout_s)))
+            busy = [w for w in pool if w.job is not None]
+            if not busy:
+                break
+            wait([w.conn for w in busy] + [w.process.sentinel for w in busy], timeout=max(0.0, min(w.expires_at for w in busy) - time.time()))
+            for worker in busy:
+                result = None
+                if worker.conn.poll():
+                    try:
+                        result = worker.conn.recv()
+                    except EOFError:
+                        pass
+                if result is None and worker.process.is_alive() and time.time() < worker.expires_at:
+                    continue
+                if result is None:
+                    if worker.process.is_alive():
+                        result = _lost_job(worker, "timeout", f"Job exceeded its time limit of {worker.expires_at - worker.started_at:g} seconds")
+                    else:
+                        result = _lost_job(worker, "failed", f"Worker process exited with code {worker.process.exitcode}")
+                    worker.stop(force=True)
+                    pool.remove(worker)
+                else:
+                    worker.job = None
+                finish(result)
+    finally:
+        for worker in pool:
+            worker.stop(force=worker.job is not None)
+        sink.close()
+    return summarize_batch(results, skipped, time.time() - start)
+
+def format_summary(summary: Dict) -> str:
+    lines = [
+        f"Jobs: {summary['jobs']} run ({summary['completed']} completed, {summary['failed']} failed, {summary['timeout']} timed out), {summary['skipped']} already done",
+        f"Wall time: {summary['wall_s']:.1f}s, throughput {summary['jobs_per_min']:.1f} jobs/min",
+        f"Job time: p50 {summary['p50_job_s']:.1f}s, p95 {summary['p95_job_s']:.1f}s",
+        f"LLM: {summary['llm_calls']} calls, {summary['tokens']:,} tokens, ${summary['cost_usd']:.4f}"
+    ]
+    if summary["stage_mean_s"]:
+        lines.append("Mean stage time: " + ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in summary["stage_mean_s"].items()))
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run decision simulations headlessly (extract → personas → debate → summarize → analyze) for every job in a JSONL file.")
+    parser.add_argument("jobs", help="JSONL file with one job per line: dilemma plus optional id, process_hint, scenarios, simulation_type, rounds, max_simulation_time, timeout_s")
+    parser.add_argument("--output", "-o", required=True, help="Results JSONL file, or a SQLite run store (.db/.sqlite) to reopen runs in the app")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="Worker processes")
+    parser.add_argument("--timeout", type=float, default=BATCH_JOB_TIMEOUT_S, help="Per-job time limit in seconds")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the LLM response cache")
+    args = parser.parse_args(argv)
+
+    def report(result: Dict):
+        suffix = f": {result['error']}" if result["error"] else ""
+        print(f"{result['id']} {result['status']} in {result['elapsed_s']:.1f}s{suffix}", flush=True)
+
+    summary = run_batch(args.jobs, args.output, workers=args.workers, timeout_s=args.timeout, use_cache=not args.no_cache, on_result=report)
+    print(format_summary(summary))
+    return 0 if summary["failed"] == 0 and summary["timeout"] == 0 else 1
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    sys.exit(main())
@@ -0,0 +1,139 @@
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.db as db
+
+PERSONA = {"goals": ["Grow revenue"], "biases": ["Optimism bias"], "tone": "Confident", "bio": "Benchmark persona.", "expected_behavior": "Argues for growth."}
+
+class ConnectPerCallStore:
+    """The previous persona store: a new rollback-journal connection for every call."""
+
+    def __init__(self, path: str):
+        self.path = path
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE IF NOT EXISTS personas (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, goals TEXT, biases TEXT, tone TEXT, bio TEXT, expected_behavior TEXT)")
+        conn.commit()
+        conn.close()
+
+    def save_persona(self, persona: Dict):
+        conn = sqlite3.connect(self.path)
+        c = conn.cursor()
+        c.execute("SELECT id FROM personas WHERE name = ?", (persona["name"],))
+        existing = c.fetchone()
+        values = (json.dumps(persona["goals"]), json.dumps(persona["biases"]), persona["tone"], persona["bio"], persona["expected_behavior"])
+        if existing:
+            c.execute("UPDATE personas SET goals = ?, biases = ?, tone = ?, bio = ?, expected_behavior = ? WHERE id = ?", values + (existing[0],))
+        else:
+            c.execute("INSERT INTO personas (name, goals, biases, tone, bio, expected_behavior) VALUES (?, ?, ?, ?, ?, ?)", (persona["name"],) + values)
+        conn.commit()
+        conn.close()
+
+    def get_all_personas(self) -> List:
+        conn = sqlite3.connect(self.path)
+        rows = conn.execute("SELECT id, name, goals, biases, tone, bio, expected_behavior FROM personas").fetchall()
+        conn.close()
+        return [
+            {"id": r[0], "name": r[1], "goals": json.loads(r[2]), "biases": json.loads(r[3]), "tone": r[4], "bio": r[5], "expected_behavior": r[6]}
+            for r in rows
+        ]
+
+    def close(self):
+        pass
+
+class PooledStore:
+    """The current persona store in utils/db.py, pointed at a scratch database."""
+
+    def __init__(self, path: str):
+        self.database = db.Database(path=path)
+        db._db = self.database
+        db.init_db()
+
+    def save_persona(self, persona: Dict):
+        db.save_persona(persona)
+
+    def get_all_personas(self) -> List:
+        return db.get_all_personas()
+
+    def close(self):
+        self.database.close()
+        db._db = None
+
+def run_users(store, users: int, ops: int, write_ratio: float) -> Dict:
+    """Run concurrent simulated users against a store and report throughput, latency and errors."""
+    latencies: List[float] = []
+    errors: List[str] = []
+    lock = threading.Lock()
+
+    def user(n: int):
+        rng = np.random.default_rng(n)
+        local, local_errors = [], []
+        for i in range(ops):
+            start = time.perf_counter()
+            try:
+                if rng.random() < write_ratio:
+                    store.save_persona({**PERSONA, "name": f"User {n} persona {i % 20}"})
+                else:
+                    store.get_all_personas()
+            except sqlite3.OperationalError as e:
+                local_errors.append(str(e))
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+            errors.extend(local_errors)
+
+    threads = [threading.Thread(target=user, args=(n,)) for n in range(users)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return {
+        "users": users,
+        "ops": len(latencies),
+        "ops_per_s": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p95_ms": float(np.percentile(latencies, 95) * 1000),
+        "errors": len(errors)
+    }
+
+STORES: Dict[str, Callable] = {"connect-per-call": ConnectPerCallStore, "pooled-wal": PooledStore}
+
+def run_benchmark(users: List[int], ops: int = 200, write_ratio: float = 0.3) -> List[Dict]:
+    rows = []
+    for name, factory in STORES.items():
+        for count in users:
+            with tempfile.TemporaryDirectory() as tmp:
+                store = factory(os.path.join(tmp, "bench.db"))
+                try:
+                    rows.append({"store": name, **run_users(store, count, ops, write_ratio)})
+                finally:
+                    store.close()
+    return rows
+
+def format_report(rows: List[Dict]) -> str:
+    lines = [f"{'store':<18}{'users':>6}{'ops/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'errors':>8}"]
+    for r in rows:
+        lines.append(f"{r['store']:<18}{r['users']:>6}{r['ops_per_s']:>10.0f}{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['errors']:>8}")
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark persona store throughput under concurrent users.")
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 8, 32], help="Concurrent user counts")
+    parser.add_argument("--ops", type=int, default=200, help="Operations per user")
+    parser.add_argument("--write-ratio", type=float, default=0.3, help="Share of operations that are saves")
+    args = parser.parse_args(argv)
+    print(format_report(run_benchmark(args.users, args.ops, args.write_ratio)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.llm_cache as llm_cache
+from config import LLM_PROVIDERS
+from utils.llm_client import close_clients
+from benchmarks.stub_llm_server import StubLLMServer
+from agents.extractor import extract_decision_structure
+from agents.persona_builder import generate_personas
+from agents.debater import simulate_debate
+from agents.summarizer import generate_summary_and_suggestion
+from agents.transcript_analyzer import transcript_analyzer
+
+STAGES = ["extract", "personas", "debate", "summarize", "analyze"]
+DILEMMA = (
+    "Should the company invest in a new AI-driven product line or expand its existing market share?\n"
+    "Process: 1. R&D evaluates feasibility. 2. Marketing assesses demand. 3. Board decides."
+)
+
+def run_pipeline(server: StubLLMServer, rounds: int, simulation_type: str) -> Dict[str, Dict]:
+    """Run every pipeline stage once, returning wall time, call count and tokens per stage."""
+    results = {}
+    state = {}
+
+    def stage(name, fn):
+        server.reset_stats()
+        start = time.perf_counter()
+        state[name] = fn()
+        elapsed = time.perf_counter() - start
+        stats = server.stats()
+        results[name] = {
+            "seconds": elapsed,
+            "calls": stats["calls"],
+            "errors": stats["errors"],
+            "tokens": stats["prompt_tokens"] + stats["completion_tokens"]
+        }
+
+    stage("extract", lambda: extract_decision_structure(DILEMMA, DILEMMA, "", use_cache=False))
+    stage("personas", lambda: generate_personas(state["extract"], use_cache=False))
+    stage("debate", lambda: simulate_debate(
+        state["personas"], DILEMMA, DILEMMA, state["extract"],
+        rounds=rounds, max_simulation_time=3600, simulation_type=simulation_type, use_cache=False
+    ))
+    stage("summarize", lambda: generate_summary_and_suggestion(state["debate"], use_cache=False))
+    stage("analyze", lambda: json.loads(transcript_analyzer(json.dumps({"transcript": state["debate"], "dilemma": DILEMMA}))))
+    return results
+
+def run_benchmark(stakeholders: List[int], rounds: List[int], repeat: int = 3, latency_ms: float = 50.0, jitter_ms: float = 10.0, error_rate: float = 0.0, simulation_type: str = "Grok 3 Beta Simulation", responses: Optional[Dict] = None) -> List[Dict]:
+    """
+    Benchmark the full pipeline against a local stub LLM server.
+
+    Args:
+        stakeholders (List[int]): Stakeholder counts to benchmark.
+        rounds (List[int]): Debate round counts to benchmark.
+        repeat (int): Pipeline runs per (stakeholders, rounds) pair.
+        latency_ms (float): Mean stub latency per LLM call.
+        jitter_ms (float): Standard deviation of the stub latency.
+        error_rate (float): Fraction of LLM calls the stub fails.
+        simulation_type (str): Debate engine to benchmark.
+        responses (Dict): Optional canned stub bodies.
+
+    Returns:
+        List[Dict]: One row per (stakeholders, rounds, stage) with p50/p95 seconds, mean calls and mean tokens per run.
+    """
+    server = StubLLMServer(latency_ms=latency_ms, jitter_ms=jitter_ms, error_rate=error_rate, responses=responses)
+    base_url = server.start()
+    saved_providers = {name: dict(settings) for name, settings in LLM_PROVIDERS.items()}
+    saved_key = os.environ.get("XAI_API_KEY")
+    saved_cache = llm_cache._cache
+    cache_dir = tempfile.TemporaryDirectory()
+    try:
+        for settings in LLM_PROVIDERS.values():
+            settings["base_url"] = base_url
+        os.environ["XAI_API_KEY"] = "stub-key"
+        llm_cache._cache = llm_cache.LLMCache(path=os.path.join(cache_dir.name, "bench_cache.db"))
+        close_clients()
+
+        rows = []
+        for n_stakeholders in stakeholders:
+            for n_rounds in rounds:
+                server.stakeholders = n_stakeholders
+                server.rounds = n_rounds
+                runs = [run_pipeline(server, n_rounds, simulation_type) for _ in range(repeat)]
+                for name in STAGES + ["total"]:
+                    if name == "total":
+                        seconds = [sum(run[s]["seconds"] for s in STAGES) for run in runs]
+                        calls = [sum(run[s]["calls"] for s in STAGES) for run in runs]
+                        tokens = [sum(run[s]["tokens"] for s in STAGES) for run in runs]
+                    else:
+                        seconds = [run[name]["seconds"] for run in runs]
+                        calls = [run[name]["calls"] for run in runs]
+                        tokens = [run[name]["tokens"] for run in runs]
+                    rows.append({
+                        "stakeholders": n_stakeholders,
+                        "rounds": n_rounds,
+                        "stage": name,
+                        "p50_s": float(np.percentile(seconds, 50)),
+                        "p95_s": float(np.percentile(seconds, 95)),
+                        "calls": float(np.mean(calls)),
+                        "tokens": float(np.mean(tokens))
+                    })
+        return rows
+    finally:
+        server.stop()
+        close_clients()
+        for name, settings in saved_providers.items():
+            LLM_PROVIDERS[name].update(settings)
+        if saved_key is None:
+            os.environ.pop("XAI_API_KEY", None)
+        else:
+            os.environ["XAI_API_KEY"] = saved_key
+        llm_cache._cache = saved_cache
+        cache_dir.cleanup()
+
+def format_report(rows: List[Dict]) -> str:
+    lines = [f"{'stake':>5} {'rounds':>6} {'stage':<10} {'p50 s':>8} {'p95 s':>8} {'calls':>7} {'tokens':>9}"]
+    for row in rows:
+        lines.append(
+            f"{row['stakeholders']:>5} {row['rounds']:>6} {row['stage']:<10} "
+            f"{row['p50_s']:>8.3f} {row['p95_s']:>8.3f} {row['calls']:>7.1f} {row['tokens']:>9.0f}"
+        )
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the extract → personas → debate → summarize → analyze pipeline against a stub LLM.")
+    parser.add_argument("--stakeholders", type=int, nargs="+", default=[4, 7, 10])
+    parser.add_argument("--rounds", type=int, nargs="+", default=[3, 5, 10])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--simulation-type", default="Grok 3 Beta Simulation")
+    parser.add_argument("--responses", help="JSON file with canned stub bodies keyed by extract/personas/turn/summary")
+    parser.add_argument("--json", dest="json_path", help="Also write the report rows to this JSON file")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    responses = None
+    if args.responses:
+        with open(args.responses) as f:
+            responses = json.load(f)
+    rows = run_benchmark(args.stakeholders, args.rounds, args.repeat, args.latency_ms, args.jitter_ms, args.error_rate, args.simulation_type, responses)
+    print(format_report(rows))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(rows, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+from typing import Dict, List, Optional
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["matplotlib.pyplot", "plotly.express", "pandas", "networkx", "wordcloud", "PyPDF2", "nltk", "openai"]
+
+# Runs in a fresh interpreter so every measurement is a cold start
+_COLD_START = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+streamlit_ready = time.perf_counter()
+app = AppTest.from_file("app.py", default_timeout=300)
+app.run()
+rendered = time.perf_counter()
+print(json.dumps({
+    "streamlit_import_s": streamlit_ready - start,
+    "first_render_s": rendered - streamlit_ready,
+    "total_s": rendered - start,
+    "errors": [str(e.value) for e in app.exception],
+    "heavy_modules_loaded": [m for m in HEAVY if m in sys.modules]
+}))
+"""
+
+_IMPORT_TIME = """
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+def _run(code: str, cwd: str) -> str:
+    env = {**os.environ, "XAI_API_KEY": os.environ.get("XAI_API_KEY", "bench-key"), "PYTHONDONTWRITEBYTECODE": "1"}
+    result = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, capture_output=True, text=True, timeout=600)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "benchmark subprocess failed")
+    return result.stdout.strip().splitlines()[-1]
+
+def measure_cold_start(tree: str = ROOT, repeat: int = 3) -> Dict:
+    """
+    Render the app's first page in fresh interpreters and report median timings.
+
+    Args:
+        tree (str): Directory containing app.py.
+        repeat (int): Cold starts to run.
+
+    Returns:
+        Dict: Median streamlit import, first render and total seconds, plus which heavy modules the
+        first render loaded and any exceptions it raised.
+    """
+    code = f"HEAVY = {HEAVY_MODULES!r}\n" + _COLD_START
+    runs = [json.loads(_run(code, tree)) for _ in range(repeat)]
+    return {
+        "streamlit_import_s": float(np.median([r["streamlit_import_s"] for r in runs])),
+        "first_render_s": float(np.median([r["first_render_s"] for r in runs])),
+        "total_s": float(np.median([r["total_s"] for r in runs])),
+        "heavy_modules_loaded": runs[-1]["heavy_modules_loaded"],
+        "errors": runs[-1]["errors"]
+    }
+
+def measure_imports(modules: List[str], tree: str = ROOT) -> Dict[str, float]:
+    """Cold import time of each module in its own interpreter."""
+    return {module: float(_run(_IMPORT_TIME.format(module=module), tree)) for module in modules}
+
+def export_tree(ref: str) -> str:
+    """Extract the tree at a git ref into a temporary directory, for before/after comparisons."""
+    archive = subprocess.run(["git", "archive", ref], cwd=ROOT, capture_output=True, check=True).stdout
+    target = tempfile.mkdtemp(prefix="bench_startup_")
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(target)
+    return target
+
+def format_report(label: str, result: Dict) -> str:
+    lines = [
+        f"{label}: first render {result['first_render_s']:.2f}s "
+        f"(streamlit import {result['streamlit_import_s']:.2f}s, total {result['total_s']:.2f}s)",
+        f"  heavy modules loaded: {', '.join(result['heavy_modules_loaded']) or 'none'}"
+    ]
+    if result["errors"]:
+        lines.append(f"  errors: {'; '.join(result['errors'])}")
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Measure DecisionTwin cold-start import time and time to first render.")
+    parser.add_argument("--repeat", type=int, default=3, help="Cold starts per tree")
+    parser.add_argument("--compare", metavar="REF", help="Also measure the tree at this git ref (e.g. HEAD~1)")
+    parser.add_argument("--imports", action="store_true", help="Also report the cold import time of each heavy module")
+    args = parser.parse_args(argv)
+
+    trees = [("current", ROOT)]
+    if args.compare:
+        trees.insert(0, (args.compare, export_tree(args.compare)))
+    for label, tree in trees:
+        print(format_report(label, measure_cold_start(tree, args.repeat)))
+    if args.imports:
+        for module, seconds in measure_imports(HEAVY_MODULES).items():
+            print(f"  import {module}: {seconds:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import argparse
+import gc
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.transcript import Transcript
+
+STEPS = ["Situation Assessment", "Options Development", "Evaluation", "Decision"]
+
+def make_entries(turns: int, stakeholders: int = 10, seed: int = 0) -> List[Dict]:
+    """Synthetic debate turns shaped like the debater's: about 60 words each, with a latency."""
+    rng = np.random.default_rng(seed)
+    words = ["budget", "risk", "growth", "staff", "market", "timeline", "cost", "support", "oppose", "compromise"]
+    return [
+        {
+            "agent": f"Stakeholder {i % stakeholders + 1}",
+            "round": i // stakeholders + 1,
+            "step": STEPS[(i // stakeholders) % len(STEPS)],
+            "message": " ".join(rng.choice(words, size=60)),
+            "latency": round(float(rng.uniform(0.5, 4.0)), 3)
+        }
+        for i in range(turns)
+    ]
+
+def timed(fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def measure(build: Callable[[], object]) -> Dict:
+    """Memory still held once a representation is built, and the time to build it (timed untraced)."""
+    build_s = timed(build)
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    gc.collect()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"value": value, "build_s": build_s, "held_mb": held / 1e6}
+
+def run_benchmark(turns: List[int]) -> List[Dict]:
+    import pandas as pd
+    rows = []
+    for n in turns:
+        # Entries arrive as JSON (job events, saved runs), so both representations are built from it
+        data = json.dumps(make_entries(n))
+        lines = Transcript(json.loads(data)).to_jsonl()
+        listed = measure(lambda: json.loads(data))
+        entries = listed["value"]
+        columnar = measure(lambda: Transcript.read_jsonl(io.StringIO(lines)))
+        transcript = columnar["value"]
+        rows.append({
+            "format": "list of dicts", "turns": n, "held_mb": listed["held_mb"], "build_s": listed["build_s"],
+            "serialize_s": timed(lambda: json.dumps(entries, indent=2)),
+            "per_round_s": timed(lambda: [[e for e in entries if e["round"] == r] for r in range(1, 11)]),
+            "pandas_s": timed(lambda: pd.DataFrame(entries))
+        })
+        rows.append({
+            "format": "Transcript", "turns": n, "held_mb": columnar["held_mb"], "build_s": columnar["build_s"],
+            "serialize_s": timed(lambda: transcript.write_jsonl(io.StringIO())),
+            "per_round_s": timed(lambda: [transcript.by_round(r) for r in range(1, 11)]),
+            "pandas_s": timed(transcript.to_pandas)
+        })
+    return rows
+
+def format_report(rows: List[Dict]) -> str:
+    lines = [f"{'format':<16}{'turns':>8}{'held MB':>10}{'build s':>10}{'serialize s':>13}{'10 rounds s':>13}{'pandas s':>10}"]
+    for r in rows:
+        lines.append(f"{r['format']:<16}{r['turns']:>8}{r['held_mb']:>10.1f}{r['build_s']:>10.4f}{r['serialize_s']:>13.4f}{r['per_round_s']:>13.5f}{r['pandas_s']:>10.4f}")
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark transcript memory and serialization: list of dicts vs the columnar Transcript.")
+    parser.add_argument("--turns", type=int, nargs="+", default=[1000, 10000, 100000], help="Transcript lengths")
+    args = parser.parse_args(argv)
+    print(format_report(run_benchmark(args.turns)))
+
+if __name__ == "__main__":
+    main()
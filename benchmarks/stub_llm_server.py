@@ -0,0 +1,228 @@
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (about 4 tokens per 3 words) used for stub usage accounting."""
+    return max(1, int(len(text.split()) * 4 / 3))
+
+def default_extraction(stakeholders: int, rounds: int) -> Dict:
+    steps = [
+        "Situation Assessment",
+        "Options Development",
+        "Interagency Coordination",
+        "Task Force Deliberation",
+        "Recommendation and Approval"
+    ]
+    return {
+        "decision_type": "Strategic",
+        "stakeholders": [
+            {
+                "name": f"Stakeholder {i + 1}",
+                "role": f"Role {i + 1}",
+                "psychological_traits": ["analytical", "collaborative"] if i % 2 else ["decisive"],
+                "influences": ["shareholders"],
+                "biases": ["confirmation bias"] if i % 3 == 0 else ["status quo bias"],
+                "historical_behavior": "consensus-driven",
+                "bio": f"Stakeholder {i + 1} has a long track record in the organization."
+            }
+            for i in range(stakeholders)
+        ],
+        "issues": ["Cost", "Timeline"],
+        "process": [steps[i % len(steps)] for i in range(min(rounds, 5))],
+        "external_factors": ["Market volatility"]
+    }
+
+def default_persona(name: str) -> Dict:
+    return {
+        "name": name,
+        "role": "Team Member",
+        "bio": f"{name} is a seasoned stakeholder.",
+        "psychological_traits": ["analytical", "collaborative"],
+        "influences": ["shareholders"],
+        "biases": ["confirmation bias"],
+        "historical_behavior": "consensus-driven",
+        "tone": "diplomatic",
+        "goals": ["reduce cost", "protect delivery"],
+        "expected_behavior": f"{name} seeks a balanced compromise."
+    }
+
+def default_turn(agent: str, round_num: int, step: str) -> Dict:
+    return {
+        "agent": agent,
+        "round": round_num,
+        "step": step,
+        "message": (
+            f"As {agent}, I propose we phase the investment during {step}. "
+            "I agree with the cost concerns raised, but I disagree that we should delay the launch. "
+            "We should recommend a pilot with clear milestones and a review after the first quarter."
+        )
+    }
+
+DEFAULT_SUMMARY = {
+    "summary": "Stakeholders converged on a phased investment with a pilot programme.",
+    "faultlines": "Cost control versus speed of delivery.",
+    "chokepoints": "Budget approval between options development and deliberation.",
+    "suggestion": "Run a time-boxed pilot and align finance and delivery leads early."
+}
+
+class StubLLMServer:
+    """Local OpenAI-compatible chat completions server with canned responses, for benchmarks and tests."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0, stakeholders: int = 4, rounds: int = 3, responses: Optional[Dict] = None, seed: int = 0):
+        """
+        Configure the stub server.
+
+        Args:
+            host (str): Interface to bind.
+            port (int): Port to bind; 0 picks a free port.
+            latency_ms (float): Mean artificial latency per request.
+            jitter_ms (float): Standard deviation of the latency.
+            error_rate (float): Fraction of requests answered with HTTP 500.
+            stakeholders (int): Number of stakeholders returned by the extraction response.
+            rounds (int): Number of process steps returned by the extraction response (capped at 5).
+            responses (Dict): Optional canned bodies overriding the defaults, keyed by "extract", "personas", "turn" or "summary".
+            seed (int): Seed for latency jitter and error injection.
+        """
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.stakeholders = stakeholders
+        self.rounds = rounds
+        self.responses = responses or {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+        self.reset_stats()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {"calls": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0}
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self._stats)
+
+    def start(self) -> str:
+        """Start serving in a background thread and return the base URL."""
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                status, body = stub.handle(request)
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def handle(self, request: Dict):
+        """Produce the (status, body) answer for one chat completions request."""
+        with self._lock:
+            delay = max(0.0, self._random.gauss(self.latency_ms, self.jitter_ms)) / 1000 if self.jitter_ms else self.latency_ms / 1000
+            fail = self._random.random() < self.error_rate
+        time.sleep(delay)
+        messages: List[Dict] = request.get("messages", [])
+        prompt_tokens = sum(estimate_tokens(m.get("content", "")) for m in messages)
+        if fail:
+            with self._lock:
+                self._stats["calls"] += 1
+                self._stats["errors"] += 1
+                self._stats["prompt_tokens"] += prompt_tokens
+            return 500, {"error": {"message": "Injected stub failure", "type": "server_error"}}
+
+        content = json.dumps(self.canned_body(messages))
+        completion_tokens = estimate_tokens(content)
+        with self._lock:
+            self._stats["calls"] += 1
+            self._stats["prompt_tokens"] += prompt_tokens
+            self._stats["completion_tokens"] += completion_tokens
+        return 200, {
+            "id": f"stub-{time.time_ns()}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens}
+        }
+
+    def canned_body(self, messages: List[Dict]):
+        """Pick a response body from the system prompt so each agent gets the shape it parses."""
+        system = messages[0].get("content", "") if messages else ""
+        prompt = messages[-1].get("content", "") if messages else ""
+        if "extracting decision structures" in system:
+            return self.responses.get("extract") or default_extraction(self.stakeholders, self.rounds)
+        if "stakeholder personas" in system:
+            if "personas" in self.responses:
+                return self.responses["personas"]
+            match = re.search(r"involved in a decision: (.*?)\. Decision context:", prompt, re.S)
+            names = match.group(1).split(", ") if match else [f"Stakeholder {i + 1}" for i in range(self.stakeholders)]
+            return [default_persona(name) for name in names]
+        if "stakeholder in a debate" in system:
+            agent = re.search(r"You are (.+?), role:", prompt)
+            step = re.search(r"Step: (.+?) \(Round (\d+)\)", prompt)
+            body = dict(self.responses.get("turn") or default_turn("Stakeholder", 1, "Discussion"))
+            if agent:
+                body["agent"] = agent.group(1)
+            if step:
+                body["step"], body["round"] = step.group(1), int(step.group(2))
+            return body
+        return self.responses.get("summary") or DEFAULT_SUMMARY
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local OpenAI-compatible stub LLM server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--stakeholders", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--responses", help="JSON file with canned bodies keyed by extract/personas/turn/summary")
+    args = parser.parse_args()
+
+    responses = None
+    if args.responses:
+        with open(args.responses) as f:
+            responses = json.load(f)
+    server = StubLLMServer(args.host, args.port, args.latency_ms, args.jitter_ms, args.error_rate, args.stakeholders, args.rounds, responses)
+    print(f"Stub LLM server listening on {server.start()}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
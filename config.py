@@ -1,4 +1,9 @@
 # Configuration settings for DecisionTwin for Decision Making
+import os
+
+# Files the app keeps on disk are anchored here rather than to the working directory, so the app,
+# batch.py and job_service.py share them wherever they are started from
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # Decision types
 DECISION_TYPES = [
@@ -77,3 +82,122 @@ MAX_STAKEHOLDERS = 10
 DEBATE_ROUNDS = 5
 MAX_TOKENS = 4000
 TIMEOUT_S = 60
+
+# Maximum number of persona turns requested concurrently within a debate round
+MAX_CONCURRENT_TURNS = 8
+
+# LLM response cache settings
+LLM_CACHE_PATH = os.path.join(APP_DIR, "llm_cache.db")
+LLM_CACHE_MAX_BYTES = 100 * 1024 * 1024
+LLM_CACHE_TTL_S = 7 * 24 * 3600
+
+# LLM client settings: one entry per API endpoint, shared by every agent
+LLM_PROVIDERS = {
+    "xai": {"base_url": "https://api.x.ai/v1", "api_key_env": "XAI_API_KEY", "model": "grok-3-beta"},
+    "openai": {"base_url": None, "api_key_env": "XAI_API_KEY", "model": "gpt-3.5-turbo"}
+}
+DEFAULT_LLM_PROVIDER = "xai"
+LLM_TIMEOUT_S = TIMEOUT_S
+LLM_CONNECT_TIMEOUT_S = 10
+LLM_POOL_MAX_CONNECTIONS = 32
+LLM_POOL_MAX_KEEPALIVE = 16
+LLM_POOL_KEEPALIVE_EXPIRY_S = 60
+
+# Monte Carlo simulation settings
+MC_RUNS = 10000
+MC_CHUNK_SIZE = 50000
+MC_SOCIAL_INFLUENCE = 0.3
+MC_CONSENSUS_THRESHOLD = 2 / 3
+MC_CONVERGENCE_TOLERANCE = 0.01
+
+# Game theory simulation settings
+GT_STRATEGIES = ["cooperate", "compromise", "defect"]
+GT_PUBLIC_GOODS_MULTIPLIER = 2.0
+GT_MAX_TENSOR_ENTRIES = 5000000
+GT_MIXED_ITERATIONS = 500
+GT_EQUILIBRIUM_TOLERANCE = 1e-3
+
+# Debate context window settings (approximate tokens per prompt)
+CONTEXT_TOKEN_BUDGET = 600
+CONTEXT_SUMMARY_WORDS = 25
+
+# LLM telemetry settings; prices are USD per million (prompt, completion) tokens
+LLM_PRICING = {
+    "grok-3-beta": (3.0, 15.0),
+    "gpt-3.5-turbo": (0.5, 1.5)
+}
+TELEMETRY_MAX_RECORDS = 10000
+TELEMETRY_LOG_PATH = None
+
+# Simulation deadline settings
+DEADLINE_MIN_CALL_S = 2
+DEADLINE_FALLBACK_RUNS = 200
+
+# Batch transcript analysis settings
+ANALYSIS_WORKERS = None  # None uses every CPU
+ANALYSIS_CHUNK_SIZE = 64
+
+# Map-reduce summarization: each round is summarised on its own (in parallel, and cached), then the
+# round summaries are reduced into the final summary and suggestion
+SUMMARY_WORKERS = 8
+SUMMARY_ROUND_TOKEN_BUDGET = 3000  # Approximate tokens of one round's transcript sent for its summary
+SUMMARY_ROUND_WORDS = 80
+SUMMARY_PREFETCH = False  # Simulation jobs summarise each round as it completes, so analysis finds them cached (one extra LLM call per round)
+
+# Scenario sweep settings: variants debated at once; Grok turns are split over them within the LLM connection pool
+SWEEP_WORKERS = 20
+
+# Headless batch runner settings (python batch.py): worker processes, per-job time limit, and how long
+# before that limit the debate's own budget ends so a job can still summarise and save its results
+BATCH_WORKERS = 4
+BATCH_JOB_TIMEOUT_S = 900
+BATCH_TIMEOUT_GRACE_S = 60
+BATCH_START_METHOD = "spawn"
+
+# Background job service: simulations and analyses run in worker processes fed from a SQLite queue
+JOB_LOCAL_WORKERS = 2  # Started by the app itself; 0 leaves the queue to a separate `python job_service.py`
+JOB_POLL_INTERVAL_S = 1.0
+JOB_EVENT_FLUSH_S = 0.25
+JOB_HEARTBEAT_S = 5
+JOB_STALE_S = 60
+JOB_LIST_LIMIT = 20
+JOB_SERVICE_HOST = "127.0.0.1"
+JOB_SERVICE_PORT = 8765
+
+# Offline NLTK data bundle (built by startup.sh/Procfile, or once with `python -m utils.nltk_data --download`)
+NLTK_DATA_DIR = os.path.join(APP_DIR, "nltk_data")
+NLTK_RESOURCES = {
+    "vader_lexicon": "sentiment/vader_lexicon.zip",
+    "stopwords": "corpora/stopwords"
+}
+
+# PDF ingestion settings
+PDF_CACHE_DIR = os.path.join(APP_DIR, "pdf_cache")
+PDF_CACHE_MAX_FILES = 50
+PDF_PARALLEL_MIN_PAGES = 32
+PDF_PAGES_PER_TASK = 8
+PDF_WORKERS = None  # None uses every CPU
+PDF_CHUNK_CHARS = 1500
+
+# PDF passage retrieval for the extraction prompt
+EXTRACT_CONTEXT_TOKENS = 1500
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Persona database settings
+DB_PATH = os.path.join(APP_DIR, "decisionforge.db")
+DB_BUSY_TIMEOUT_S = 5
+DB_WRITE_BATCH_SIZE = 64
+PERSONA_PAGE_SIZE = 20
+PERSONA_DIR = os.path.join(APP_DIR, "personas")
+
+# Saved simulation runs
+RUN_COMPRESSION_LEVEL = 6
+RUN_LIST_LIMIT = 10
+
+# Rendered visualization cache (word cloud PNGs, Plotly JSON), shared by every session in the process
+VIZ_CACHE_MAX_BYTES = 64 * 1024 * 1024
+VIZ_CACHE_MAX_ENTRIES = 256
+VIZ_LAYOUT_SEED = 42
+VIZ_EDGE_WIDTH_BUCKETS = 5
+VIZ_MAX_EDGE_WIDTH = 8.0
@@ -0,0 +1,142 @@
+import argparse
+import json
+import logging
+import re
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+from config import JOB_SERVICE_HOST, JOB_SERVICE_PORT, JOB_LOCAL_WORKERS, JOB_POLL_INTERVAL_S, JOB_LIST_LIMIT
+from utils.jobs import FINISHED, init_jobs, submit_job, get_job, job_events, list_jobs, cancel_job
+from utils.runs import init_runs
+from agents.job_worker import HANDLERS, WorkerPool
+
+logger = logging.getLogger(__name__)
+
+JOB_PATH = re.compile(r"^/jobs/([0-9a-f]+)(/events|/cancel)?$")
+
+class JobRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON API over the job queue.
+
+    POST /jobs                  {"kind", "payload"} → {"id"}
+    GET  /jobs?status=&limit=   → {"jobs": [...]}
+    GET  /jobs/<id>             → the job, with its result once completed
+    GET  /jobs/<id>/events?after=N[&stream=1]
+                                → {"events": [...]}; with stream=1, one JSON event per line as they
+                                  arrive, until the job finishes
+    POST /jobs/<id>/cancel      → {"status"}
+    """
+
+    poll_interval = JOB_POLL_INTERVAL_S
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _send_json(self, body: Dict, status: int = 200):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _route(self) -> Tuple[Optional[str], Optional[str], Dict[str, List[str]]]:
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path.rstrip("/") == "/jobs":
+            return "", None, query
+        match = JOB_PATH.match(url.path)
+        if not match:
+            return None, None, query
+        return match.group(1), (match.group(2) or "").lstrip("/") or None, query
+
+    def do_GET(self):
+        job_id, action, query = self._route()
+        if job_id is None:
+            return self._send_json({"error": "Not found"}, 404)
+        if job_id == "":
+            status = query.get("status", [None])[0]
+            limit = int(query.get("limit", [JOB_LIST_LIMIT])[0])
+            return self._send_json({"jobs": list_jobs(status=status, limit=limit)})
+        job = get_job(job_id, with_result=action is None)
+        if job is None:
+            return self._send_json({"error": f"Unknown job {job_id}"}, 404)
+        if action is None:
+            return self._send_json(job)
+        if action != "events":
+            return self._send_json({"error": "Not found"}, 404)
+        after = int(query.get("after", ["0"])[0])
+        if query.get("stream", ["0"])[0] not in ("1", "true"):
+            return self._send_json({"events": job_events(job_id, after), "status": job["status"]})
+        self._stream_events(job_id, after)
+
+    def _stream_events(self, job_id: str, after: int):
+        """Write events as newline-delimited JSON while the job runs; the response ends when it finishes."""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        try:
+            while True:
+                # Read the status before the events, so none written before it finished are missed
+                status = get_job(job_id, with_result=False)["status"]
+                for event in job_events(job_id, after):
+                    self.wfile.write((json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8"))
+                    after = event["seq"]
+                self.wfile.flush()
+                if status in FINISHED:
+                    return
+                time.sleep(self.poll_interval)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def do_POST(self):
+        job_id, action, _ = self._route()
+        if job_id == "":
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                kind, payload = body["kind"], body.get("payload", {})
+            except (ValueError, KeyError, TypeError) as e:
+                return self._send_json({"error": f"Invalid job: {str(e)}"}, 400)
+            if kind not in HANDLERS:
+                return self._send_json({"error": f"Unknown job kind {kind}; expected one of {', '.join(HANDLERS)}"}, 400)
+            return self._send_json({"id": submit_job(kind, payload)}, 201)
+        if job_id and action == "cancel":
+            status = cancel_job(job_id)
+            if status is None:
+                return self._send_json({"error": f"Unknown job {job_id}"}, 404)
+            return self._send_json({"status": status})
+        self._send_json({"error": "Not found"}, 404)
+
+def create_server(host: str = JOB_SERVICE_HOST, port: int = JOB_SERVICE_PORT) -> ThreadingHTTPServer:
+    """Create the job API server (call serve_forever on it); the queue tables are created if needed."""
+    init_jobs()
+    init_runs()
+    server = ThreadingHTTPServer((host, port), JobRequestHandler)
+    server.daemon_threads = True
+    return server
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve the simulation job queue over HTTP/JSON and run its worker processes.")
+    parser.add_argument("--host", default=JOB_SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=JOB_SERVICE_PORT)
+    parser.add_argument("--workers", type=int, default=max(1, JOB_LOCAL_WORKERS), help="Worker processes (0 serves the API only)")
+    args = parser.parse_args(argv)
+
+    server = create_server(args.host, args.port)
+    pool = WorkerPool(args.workers).start() if args.workers else None
+    print(f"Job service on http://{server.server_address[0]}:{server.server_address[1]}/jobs with {args.workers} workers", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if pool:
+            pool.stop()
+    return 0
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
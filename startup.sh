@@ -5,5 +5,7 @@
      else
          echo "NVIDIA_API_KEY not set; skipping agentiq installation."
      fi
+     # Check the bundled NLTK data the transcript analyzer reads; boot never downloads it
+     python -m utils.nltk_data || echo "Analyses will report the NLTK data as missing."
      # Start Streamlit
      streamlit run app.py --server.port=8501 --server.address=0.0.0.0
@@ -0,0 +1,20 @@
+import pytest
+import utils.llm_cache as llm_cache
+from config import LLM_PROVIDERS
+from utils.llm_client import close_clients
+from benchmarks.stub_llm_server import StubLLMServer
+
+@pytest.fixture
+def stub_llm(tmp_path, monkeypatch):
+    """A local stub LLM server every provider points at, with a fresh response cache in tmp_path."""
+    server = StubLLMServer()
+    base_url = server.start()
+    for name in LLM_PROVIDERS:
+        monkeypatch.setitem(LLM_PROVIDERS, name, {**LLM_PROVIDERS[name], "base_url": base_url})
+    monkeypatch.setenv("XAI_API_KEY", "stub-key")
+    monkeypatch.setattr(llm_cache, "LLM_CACHE_PATH", str(tmp_path / "llm_cache.db"))
+    monkeypatch.setattr(llm_cache, "_cache", None)
+    close_clients()
+    yield server
+    server.stop()
+    close_clients()
@@ -0,0 +1,59 @@
+import json
+import os
+import pytest
+import utils.db as db
+from batch import run_batch
+
+@pytest.fixture
+def batch_llm(stub_llm, tmp_path, monkeypatch):
+    # Forked workers inherit the stub's URL, key and cache path
+    stub_llm.latency_ms, stub_llm.stakeholders, stub_llm.rounds = 50.0, 2, 1
+    monkeypatch.chdir(tmp_path)
+    return stub_llm
+
+def write_jobs(path, lines):
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+def test_run_batch_streams_results_and_resumes(batch_llm, tmp_path):
+    jobs = write_jobs(tmp_path / "jobs.jsonl", [
+        json.dumps({"id": "a", "dilemma": "Expand or invest?", "rounds": 1, "simulation_type": "Monte Carlo Simulation"}),
+        json.dumps({"dilemma": "Hire or outsource?", "rounds": 1, "simulation_type": "Monte Carlo Simulation"}),
+        "not json",
+        json.dumps({"id": "empty", "dilemma": ""})
+    ])
+    output = str(tmp_path / "results.jsonl")
+
+    summary = run_batch(jobs, output, workers=2, timeout_s=30, start_method="fork")
+    results = {r["id"]: r for r in map(json.loads, open(output))}
+
+    assert summary["jobs"] == 4 and summary["completed"] == 2 and summary["failed"] == 2
+    assert results["a"]["status"] == "completed"
+    assert results["a"]["result"]["transcript"] and set(results["a"]["timings"]) == {"extract", "personas", "debate", "summarize", "analyze"}
+    assert results["line-2"]["status"] == "completed"
+    assert "not a valid job" in results["line-3"]["error"]
+    assert summary["llm_calls"] >= 6
+
+    # Only the failed jobs run again
+    summary = run_batch(jobs, output, workers=2, timeout_s=30, start_method="fork")
+    assert summary["skipped"] == 2 and summary["jobs"] == 2
+
+def test_run_batch_kills_overrunning_jobs_and_saves_runs(batch_llm, tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "_db", None)
+    batch_llm.latency_ms = 500.0
+    jobs = write_jobs(tmp_path / "jobs.jsonl", [
+        json.dumps({"id": "slow", "dilemma": "Expand or invest?", "timeout_s": 0.3}),
+        json.dumps({"id": "fast", "dilemma": "Hire or outsource?", "rounds": 1, "simulation_type": "Monte Carlo Simulation"})
+    ])
+    output = str(tmp_path / "runs.db")
+
+    summary = run_batch(jobs, output, workers=1, timeout_s=30, start_method="fork")
+
+    assert summary["timeout"] == 1 and summary["completed"] == 1
+    store = db.Database(path=output)
+    monkeypatch.setattr(db, "_db", store)
+    from utils.runs import load_run
+    assert load_run("batch-slow")["status"] == "timeout"
+    fast = load_run("batch-fast")
+    assert fast["status"] == "analyzed" and fast["transcript"] and fast["analysis"]["summary"]
+    store.close()
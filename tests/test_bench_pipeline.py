@@ -0,0 +1,12 @@
+from benchmarks.bench_pipeline import run_benchmark, STAGES
+
+def test_run_benchmark_counts_calls_per_stage():
+    rows = run_benchmark(stakeholders=[4], rounds=[2], repeat=1, latency_ms=0.0, jitter_ms=0.0)
+    by_stage = {row["stage"]: row for row in rows}
+    assert set(by_stage) == set(STAGES + ["total"])
+    assert by_stage["extract"]["calls"] == 1
+    assert by_stage["personas"]["calls"] == 1
+    assert by_stage["debate"]["calls"] == 8
+    assert by_stage["summarize"]["calls"] == 2 + 1  # one per round, then the reduce
+    assert by_stage["total"]["tokens"] > 0
+    assert by_stage["total"]["p95_s"] >= by_stage["total"]["p50_s"]
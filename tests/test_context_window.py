@@ -0,0 +1,25 @@
+from agents.context_window import DebateContext, estimate_tokens
+
+def make_round(round_num, agents=5):
+    return [
+        {"agent": f"Agent {i}", "message": f"In round {round_num} I propose option {i}. " + "Detailed reasoning follows here. " * 20}
+        for i in range(agents)
+    ]
+
+def test_render_stays_within_budget_and_keeps_dilemma():
+    context = DebateContext("Allocate the $10M surplus between transit and housing.", token_budget=400)
+    sizes = []
+    for round_num in range(1, 31):
+        context.add_round(round_num, "Options Development", make_round(round_num))
+        rendered = context.render()
+        sizes.append(estimate_tokens(rendered))
+    assert max(sizes) <= 400
+    assert rendered.startswith("Dilemma: Allocate the $10M surplus")
+    assert "Round 30 (Options Development), latest turns:" in rendered
+    assert "earlier rounds omitted" in rendered
+    assert "Round 29 (Options Development): Agent 0: In round 29 I propose option 0." in rendered
+
+def test_truncation_happens_on_word_boundaries():
+    context = DebateContext("word " * 500, token_budget=200)
+    pinned = context.render()
+    assert pinned.endswith("word…")
@@ -0,0 +1,120 @@
+import json
+import sqlite3
+import threading
+import pytest
+import utils.db as db
+
+PERSONA = {"name": "CEO", "goals": ["Lead"], "biases": ["Optimism bias"], "tone": "Confident", "bio": "Runs the company.", "expected_behavior": "Pushes for growth."}
+
+@pytest.fixture(autouse=True)
+def database(tmp_path, monkeypatch):
+    database = db.Database(path=str(tmp_path / "test.db"))
+    monkeypatch.setattr(db, "_db", database)
+    db.init_db()
+    yield database
+    database.close()
+
+def test_save_update_delete_round_trip(database):
+    persona_id = db.save_persona(PERSONA)
+    assert db.save_persona({**PERSONA, "tone": "Calm"}) == persona_id
+    assert db.get_all_personas() == [{**PERSONA, "tone": "Calm", "id": persona_id}]
+
+    db.update_persona({**PERSONA, "id": persona_id, "name": "Chief Executive"})
+    assert db.get_personas_by_ids([persona_id])[0]["name"] == "Chief Executive"
+    other_id = db.save_persona({**PERSONA, "name": "Chief Financial"})
+    with pytest.raises(ValueError, match="already exists"):
+        db.update_persona({"id": other_id, "name": "Chief Executive"})
+    db.delete_persona(other_id)
+    db.delete_persona(persona_id)
+    assert db.get_all_personas() == []
+    assert database.reader().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+def test_bulk_save_and_ordered_lookup():
+    ids = db.save_personas([{**PERSONA, "name": f"P{i}"} for i in range(600)])
+    assert len(set(ids)) == 600
+    picked = db.get_personas_by_ids([ids[599], 10**9, ids[0]])
+    assert [p["name"] for p in picked] == ["P599", "P0"]
+
+def test_concurrent_writers_are_serialised_without_lock_errors():
+    errors = []
+
+    def user(n):
+        try:
+            for i in range(50):
+                db.save_persona({**PERSONA, "name": f"U{n}-{i}"})
+                db.get_all_personas()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=user, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert len(db.get_all_personas()) == 400
+
+def test_failed_write_does_not_roll_back_its_batch(database):
+    good = database.submit(lambda conn: conn.execute("INSERT INTO personas (name) VALUES ('ok')"))
+    bad = database.submit(lambda conn: conn.execute("INSERT INTO missing_table VALUES (1)"))
+    good.result()
+    with pytest.raises(Exception):
+        bad.result()
+    assert [p["name"] for p in db.get_all_personas()] == ["ok"]
+
+FULL_PERSONA = {
+    "name": "Jane Doe", "role": "CFO", "bio": "Guards the balance sheet.", "psychological_traits": ["cautious"],
+    "influences": ["auditors"], "biases": ["loss aversion"], "historical_behavior": "Risk-averse",
+    "tone": "Measured", "goals": ["Cut costs"], "expected_behavior": "Questions every expense."
+}
+
+def test_save_keeps_every_field_and_partial_updates_keep_the_rest():
+    persona_id = db.save_persona(FULL_PERSONA)
+    assert db.get_personas_by_ids([persona_id]) == [{**FULL_PERSONA, "id": persona_id}]
+    db.update_persona({"id": persona_id, "tone": "Blunt"})
+    db.save_persona({"name": "Jane Doe", "bio": "New bio."})
+    assert db.get_personas_by_ids([persona_id]) == [{**FULL_PERSONA, "tone": "Blunt", "bio": "New bio.", "id": persona_id}]
+
+def test_search_ranks_by_relevance_and_paginates():
+    db.save_personas([{**PERSONA, "name": f"Analyst {i:02d}", "bio": "Reads reports."} for i in range(25)])
+    db.save_persona(FULL_PERSONA)
+    assert [p["name"] for p in db.search_personas("cfo")["personas"]] == ["Jane Doe"]
+    assert db.search_personas("aud")["personas"][0]["name"] == "Jane Doe"  # word prefixes match
+    assert db.search_personas("cfo analyst")["total"] == 0  # every term must match
+
+    first, last = db.search_personas("analyst", page=0, page_size=10), db.search_personas("analyst", page=2, page_size=10)
+    assert (first["total"], first["pages"], len(last["personas"])) == (25, 3, 5)
+    assert db.search_personas("", page_size=100)["total"] == 26
+
+    db.delete_persona(db.search_personas("cfo")["personas"][0]["id"])
+    assert db.search_personas("cfo")["total"] == 0
+
+def test_indexed_sources_never_override_saved_personas(tmp_path):
+    db.save_persona({**FULL_PERSONA, "tone": "Saved"})
+    db.index_personas([{**FULL_PERSONA, "tone": "Builtin"}, {**PERSONA, "name": "Builtin Only"}], source="builtin")
+    (tmp_path / "files").mkdir()
+    path = tmp_path / "files" / "people.json"
+    path.write_text(json.dumps([{**PERSONA, "name": "From File"}, {**FULL_PERSONA, "tone": "File"}]))
+    assert db.index_persona_files(str(tmp_path / "files")) == 1
+    assert db.index_persona_files(str(tmp_path / "files")) == 0  # unchanged files are skipped
+    tones = {p["name"]: p["tone"] for p in db.get_all_personas()}
+    assert tones == {"Jane Doe": "Saved", "Builtin Only": "Confident", "From File": "Confident"}
+
+    path.unlink()
+    assert db.index_persona_files(str(tmp_path / "files")) == 1
+    assert db.search_personas("from file")["total"] == 0
+
+def test_init_db_migrates_an_old_table_with_duplicate_names(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE personas (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, goals TEXT, biases TEXT, tone TEXT, bio TEXT, expected_behavior TEXT)")
+    conn.executemany("INSERT INTO personas (name, goals, biases, tone, bio, expected_behavior) VALUES (?, '[]', '[]', ?, 'Old bio', '')", [("Dup", "first"), ("Dup", "second")])
+    conn.commit()
+    conn.close()
+    old = db.Database(path=path)
+    db._db = old
+    try:
+        db.init_db()
+        assert [(p["name"], p["tone"]) for p in db.search_personas("old bio")["personas"]] == [("Dup", "second")]
+    finally:
+        old.close()
@@ -0,0 +1,46 @@
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from utils.deadline import Deadline, DeadlineExceeded
+
+def test_timeout_shrinks_to_remaining_budget():
+    deadline = Deadline(5, min_call_s=1)
+    assert deadline.timeout(30) <= 5
+    assert deadline.timeout(2) == 2
+    with pytest.raises(DeadlineExceeded):
+        Deadline(0.5, min_call_s=1).timeout(30)
+
+def test_retry_stops_before_deadline():
+    deadline = Deadline(1.5, min_call_s=0.5)
+    calls = []
+
+    @deadline.retry(attempts=5, wait_s=0.5)
+    def flaky():
+        calls.append(time.monotonic())
+        raise ValueError("boom")
+
+    start = time.monotonic()
+    with pytest.raises(Exception):
+        flaky()
+    assert time.monotonic() - start < 1.5
+    assert 1 <= len(calls) < 5
+
+def test_deadline_exceeded_is_not_retried():
+    deadline = Deadline(10)
+    calls = []
+
+    @deadline.retry(attempts=3, wait_s=0)
+    def out_of_time():
+        calls.append(1)
+        raise DeadlineExceeded("no time")
+
+    with pytest.raises(DeadlineExceeded):
+        out_of_time()
+    assert len(calls) == 1
+
+def test_result_cancels_slow_future():
+    deadline = Deadline(0.5, min_call_s=0.1)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(time.sleep, 1)
+        with pytest.raises(DeadlineExceeded):
+            deadline.result(future)
@@ -1,17 +1,165 @@
+import json
+import threading
+import time
 import pytest
-from agents.debater import simulate_debate
-from unittest.mock import patch
+import utils.llm_cache as llm_cache
+from agents.debater import simulate_debate, iter_debate, resume_debate
+from unittest.mock import patch, MagicMock
 
-def test_simulate_debate_success():
+def test_simulate_debate_success(stub_llm):
     personas = [
         {"name": "CEO", "goals": ["Lead"], "biases": ["Pro-growth"], "tone": "Strategic"},
         {"name": "CFO", "goals": ["Save"], "biases": ["Cost-conscious"], "tone": "Analytical"},
         {"name": "HR", "goals": ["Support"], "biases": ["Compliance-focused"], "tone": "Emotional"}
     ]
-    with patch("requests.post") as mock_post:
-        mock_post.return_value.json.return_value = {
-            "choices": [{"message": {"content": "I propose investing in growth."}}]
-        }
-        transcript = simulate_debate(personas, rounds=1)
-        assert len(transcript) == 3
-        assert all("agent" in t and "message" in t for t in transcript)
+    extracted = {"process": ["Situation Assessment"], "stakeholders": []}
+    transcript = simulate_debate(personas, "Dilemma", "", extracted, rounds=1, use_cache=False)
+    assert [t["agent"] for t in transcript] == ["CEO", "CFO", "HR"]
+    assert all(t["round"] == 1 and "I propose" in t["message"] for t in transcript)
+    assert stub_llm.stats()["calls"] == 3
+
+def test_simulate_debate_grok_runs_round_concurrently(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, "_cache", llm_cache.LLMCache(path=str(tmp_path / "cache.db")))
+    personas = [
+        {"name": f"P{i}", "goals": ["Lead"], "biases": ["None"], "tone": "Neutral"}
+        for i in range(4)
+    ]
+    extracted = {"process": ["Situation Assessment"], "stakeholders": []}
+
+    in_flight = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def fake_create(**kwargs):
+        with lock:
+            in_flight["now"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        time.sleep(0.2)
+        with lock:
+            in_flight["now"] -= 1
+        agent = kwargs["messages"][1]["content"].split(",")[0].replace("You are ", "")
+        content = json.dumps({"agent": agent, "round": 1, "step": "Situation Assessment", "message": "ok"})
+        return MagicMock(choices=[MagicMock(message=MagicMock(content=content))])
+
+    with patch("agents.debater.get_client") as mock_get_client:
+        mock_get_client.return_value.chat.completions.create.side_effect = fake_create
+        transcript = simulate_debate(personas, "Dilemma", "", extracted, rounds=1, max_concurrent_turns=4, use_cache=False)
+
+    assert [t["agent"] for t in transcript] == ["P0", "P1", "P2", "P3"]
+    assert all(t["latency"] >= 0.2 for t in transcript)
+    assert in_flight["peak"] == 4
+
+def test_iter_debate_streams_entries():
+    personas = [
+        {"name": "CEO", "goals": ["Lead"], "biases": ["None"], "tone": "Strategic"},
+        {"name": "CFO", "goals": ["Save"], "biases": ["None"], "tone": "Analytical"}
+    ]
+    extracted = {"process": ["Situation Assessment", "Options Development"], "stakeholders": []}
+    stream = iter_debate(personas, "Dilemma", "", extracted, rounds=2, simulation_type="Monte Carlo Simulation")
+    first = next(stream)
+    assert first["agent"] == "CEO" and first["round"] == 1
+    rest = list(stream)
+    assert len(rest) == 4
+    assert rest[-1]["step"] == "Monte Carlo Summary" and rest[-1]["monte_carlo"]["runs"] > 0
+
+def test_simulate_debate_finishes_within_deadline(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, "_cache", llm_cache.LLMCache(path=str(tmp_path / "cache.db")))
+    personas = [
+        {"name": f"P{i}", "goals": ["Lead"], "biases": ["None"], "tone": "Neutral"}
+        for i in range(3)
+    ]
+    extracted = {"process": ["Situation Assessment", "Options Development"], "stakeholders": []}
+
+    def hanging_create(**kwargs):
+        # A server that only gives up when the client-side timeout expires
+        time.sleep(kwargs["timeout"])
+        raise TimeoutError("Request timed out")
+
+    with patch("agents.debater.get_client") as mock_get_client:
+        mock_get_client.return_value.chat.completions.create.side_effect = hanging_create
+        start = time.time()
+        transcript = simulate_debate(personas, "Dilemma", "", extracted, rounds=2, max_simulation_time=3, use_cache=False)
+        elapsed = time.time() - start
+
+    assert elapsed < 3.5
+    turns = [t for t in transcript if t["agent"] != "System"]
+    assert len(turns) == 6 and all(t.get("fallback") for t in turns)
+    assert sum(1 for t in transcript if t["agent"] == "System") == 1
+
+def test_simulate_debate_keeps_turns_finished_before_the_deadline(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, "_cache", llm_cache.LLMCache(path=str(tmp_path / "cache.db")))
+    personas = [
+        {"name": f"P{i}", "goals": ["Lead"], "biases": ["None"], "tone": "Neutral"}
+        for i in range(3)
+    ]
+    extracted = {"process": ["Situation Assessment"], "stakeholders": []}
+
+    def create(**kwargs):
+        agent = kwargs["messages"][1]["content"].split(",")[0].replace("You are ", "")
+        if agent == "P0":
+            time.sleep(kwargs["timeout"])
+            raise TimeoutError("Request timed out")
+        content = json.dumps({"agent": agent, "round": 1, "step": "Situation Assessment", "message": "ok"})
+        return MagicMock(choices=[MagicMock(message=MagicMock(content=content))])
+
+    with patch("agents.debater.get_client") as mock_get_client:
+        mock_get_client.return_value.chat.completions.create.side_effect = create
+        transcript = simulate_debate(personas, "Dilemma", "", extracted, rounds=1, max_simulation_time=3, max_concurrent_turns=3, use_cache=False)
+
+    turns = {t["agent"]: t for t in transcript if t["agent"] != "System"}
+    assert turns["P0"].get("fallback")
+    assert [turns[name]["message"] for name in ("P1", "P2")] == ["ok", "ok"]
+
+def test_monte_carlo_debate_resumes_and_extends_from_a_checkpoint():
+    personas = [
+        {"name": "CEO", "goals": ["Lead"], "biases": ["None"], "tone": "Strategic"},
+        {"name": "CFO", "goals": ["Save"], "biases": ["None"], "tone": "Analytical"}
+    ]
+    extracted = {"process": ["Situation Assessment", "Options Development", "Recommendation and Approval"], "stakeholders": []}
+    checkpoints = []
+    full = simulate_debate(personas, "Dilemma", "", extracted, rounds=3, simulation_type="Monte Carlo Simulation", on_checkpoint=checkpoints.append)
+    assert [c["next_round"] for c in checkpoints] == [1, 2, 3]
+    assert extracted["process"] == ["Situation Assessment", "Options Development", "Recommendation and Approval"]
+
+    # Resuming after round 1 (JSON round-tripped, as stored) replays nothing and continues identically
+    after_first = json.loads(json.dumps(checkpoints[0]))
+    resumed = simulate_debate(personas, "Dilemma", "", extracted, rounds=3, simulation_type="Monte Carlo Simulation", checkpoint=after_first)
+    assert [e["message"] for e in resumed] == [e["message"] for e in full[2:]]
+
+    extended = simulate_debate(personas, "Dilemma", "", extracted, rounds=5, simulation_type="Monte Carlo Simulation", checkpoint=checkpoints[-1])
+    assert [e["round"] for e in extended[:-1]] == [4, 4, 5, 5]
+    assert extended[-1]["step"] == "Monte Carlo Summary"
+
+def test_resume_debate_skips_completed_grok_rounds(tmp_path, monkeypatch):
+    import utils.db as db
+    import utils.runs as runs
+    monkeypatch.setattr(llm_cache, "_cache", llm_cache.LLMCache(path=str(tmp_path / "cache.db")))
+    monkeypatch.setattr(db, "_db", db.Database(path=str(tmp_path / "runs.db")))
+    runs.init_runs()
+    personas = [{"name": f"P{i}", "goals": ["Lead"], "biases": ["None"], "tone": "Neutral"} for i in range(2)]
+    extracted = {"process": ["Situation Assessment", "Options Development"], "stakeholders": []}
+    run_id = runs.save_run({
+        "input_hash": "h", "simulation_type": "Grok 3 Beta Simulation", "inputs": {"dilemma": "Dilemma"},
+        "extracted": extracted, "personas": personas, "transcript": []
+    })
+    prompts = []
+
+    def fake_create(**kwargs):
+        prompts.append(kwargs["messages"][1]["content"])
+        agent = kwargs["messages"][1]["content"].split(",")[0].replace("You are ", "")
+        content = json.dumps({"agent": agent, "round": len(prompts), "step": "s", "message": f"turn {len(prompts)}"})
+        return MagicMock(choices=[MagicMock(message=MagicMock(content=content))])
+
+    with patch("agents.debater.get_client") as mock_get_client:
+        mock_get_client.return_value.chat.completions.create.side_effect = fake_create
+        stream = iter_debate(personas, "Dilemma", "Dilemma", extracted, rounds=2, use_cache=False, on_checkpoint=lambda c: runs.save_checkpoint(run_id, c))
+        first_round = [next(stream), next(stream)]
+        stream.close()  # interrupted before round 2
+        assert runs.load_checkpoint(run_id)["next_round"] == 1
+
+        transcript = resume_debate(run_id, use_cache=False)
+
+    assert len(prompts) == 4
+    assert "Round 1 (Situation Assessment)" in prompts[-1]  # resumed turns see the restored context
+    assert transcript[:2] == first_round and len(transcript) == 4
+    assert runs.load_run(run_id)["turns"] == 4
+    db._db.close()
@@ -1,19 +1,16 @@
-import pytest
-from agents.extractor import extract_info
-from unittest.mock import patch
+from agents.extractor import extract_decision_structure
 
-def test_extract_info_success():
-    with patch("requests.post") as mock_post:
-        mock_post.return_value.json.return_value = {
-            "choices": [{"message": {"content": '{"stakeholders": ["CEO", "CFO", "HR"], "issues": [], "process": []}'}}]
-        }
-        result = extract_info("Test dilemma", "Test process")
-        assert result["stakeholders"] == ["CEO", "CFO", "HR"]
+def test_extract_decision_structure_success(stub_llm):
+    stub_llm.stakeholders, stub_llm.rounds = 5, 3
+    result = extract_decision_structure("Test dilemma", "Test process")
+    assert [s["name"] for s in result["stakeholders"]] == [f"Stakeholder {i + 1}" for i in range(5)]
+    assert result["decision_type"] == "Strategic"
+    assert result["process"] == ["Situation Assessment", "Options Development", "Interagency Coordination"]
+    assert "Stakeholder 1" in result["ascii_stakeholders"]
 
-def test_extract_info_invalid_stakeholders():
-    with patch("requests.post") as mock_post:
-        mock_post.return_value.json.return_value = {
-            "choices": [{"message": {"content": '{"stakeholders": ["CEO"], "issues": [], "process": []}'}}]
-        }
-        with pytest.raises(ValueError, match="Invalid response"):
-            extract_info("Test dilemma", "Test process")
+def test_extract_decision_structure_pads_too_few_stakeholders(stub_llm):
+    stub_llm.responses = {"extract": {"decision_type": "Tactical", "stakeholders": [{"name": "CEO", "role": "Chief Executive"}], "issues": [], "process": ["Decide"]}}
+    result = extract_decision_structure("Test dilemma", "Test process")
+    names = [s["name"] for s in result["stakeholders"]]
+    assert len(names) == 4 and names[0] == "CEO"
+    assert all("(Inferred by AI)" in name for name in names[1:])
@@ -0,0 +1,37 @@
+import numpy as np
+from agents.game_theory import (
+    build_payoff_tensor,
+    pure_nash_equilibria,
+    deviation_payoffs,
+    expected_payoffs,
+    solve_game
+)
+
+PERSONAS = [
+    {"name": "CEO", "psychological_traits": ["collaborative"], "biases": ["groupthink"], "goals": ["unity"]},
+    {"name": "CFO", "psychological_traits": ["competitive"], "biases": ["status quo bias"], "goals": ["save"]},
+    {"name": "HR", "psychological_traits": ["cautious"], "biases": ["optimism bias"], "goals": ["support"]},
+    {"name": "CTO", "psychological_traits": ["analytical"], "biases": [], "goals": ["innovate"]}
+]
+
+def test_pure_equilibria_admit_no_profitable_deviation():
+    payoffs = build_payoff_tensor(PERSONAS)
+    assert payoffs.shape == (4, 3, 3, 3, 3)
+    equilibria = pure_nash_equilibria(payoffs)
+    assert len(equilibria) > 0
+    for profile in equilibria:
+        deviations = deviation_payoffs(payoffs, profile)
+        current = deviations[np.arange(4), profile]
+        assert (deviations.max(axis=1) - current <= 1e-3).all()
+
+def test_expected_payoffs_match_pure_profile():
+    payoffs = build_payoff_tensor(PERSONAS)
+    profile = np.array([0, 2, 1, 0])
+    sigma = np.eye(3)[profile]
+    assert np.allclose(expected_payoffs(payoffs, sigma), deviation_payoffs(payoffs, profile))
+
+def test_solve_game_path_starts_from_opening_strategies():
+    game = solve_game(PERSONAS, rounds=5)
+    assert len(game["path"]) == 5
+    assert game["path"][0]["profile"][0] == "cooperate"
+    assert game["mixed_equilibrium"]["epsilon"] < 0.1
@@ -0,0 +1,167 @@
+import json
+import threading
+import time
+import urllib.request
+import pytest
+import utils.db as db
+import utils.jobs as jobs
+import utils.runs as runs
+import agents.job_worker as job_worker
+import agents.transcript_analyzer as transcript_analyzer
+import utils.telemetry as telemetry
+from agents.job_worker import WorkerPool, worker_loop
+from job_service import JobRequestHandler, create_server
+
+PERSONAS = [
+    {"name": "CEO", "goals": ["Lead"], "biases": ["None"], "tone": "Strategic"},
+    {"name": "CFO", "goals": ["Save"], "biases": ["None"], "tone": "Analytical"}
+]
+EXTRACTED = {"process": ["Situation Assessment", "Options Development"], "stakeholders": []}
+
+@pytest.fixture(autouse=True)
+def database(tmp_path, monkeypatch):
+    database = db.Database(path=str(tmp_path / "test.db"))
+    monkeypatch.setattr(db, "_db", database)
+    # No LLM here; round summaries would only fall back after their retries
+    monkeypatch.setattr(job_worker, "SUMMARY_PREFETCH", False)
+    jobs.init_jobs()
+    runs.init_runs()
+    yield database
+    database.close()
+
+@pytest.fixture
+def worker():
+    stop = threading.Event()
+    thread = threading.Thread(target=worker_loop, args=("test-worker", stop, 0.05), daemon=True)
+    thread.start()
+    yield
+    stop.set()
+    thread.join()
+
+def wait_for(job_id, timeout=20):
+    end = time.time() + timeout
+    while time.time() < end:
+        job = jobs.get_job(job_id)
+        if job["status"] in jobs.FINISHED:
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+def simulate_payload(run_id=None):
+    payload = {"personas": PERSONAS, "dilemma": "Expand?", "extracted": EXTRACTED, "rounds": 2, "simulation_type": "Monte Carlo Simulation"}
+    if run_id:
+        payload["run_id"] = run_id
+    return payload
+
+def test_queue_claims_once_streams_events_and_cancels():
+    job_id = jobs.submit_job("simulate", {"x": 1})
+    claimed = jobs.claim_job("w1")
+    assert claimed == {"id": job_id, "kind": "simulate", "payload": {"x": 1}}
+    assert jobs.claim_job("w2") is None
+
+    assert jobs.add_events(job_id, [{"n": 1}, {"n": 2}]) == "running"
+    assert jobs.cancel_job(job_id) == "cancelling"
+    assert jobs.add_events(job_id, [{"n": 3}]) == "cancelling"
+    assert [e["data"]["n"] for e in jobs.job_events(job_id, after=1)] == [2, 3]
+
+    jobs.finish_job(job_id, "cancelled")
+    assert jobs.get_job(job_id)["events"] == 3
+    queued = jobs.submit_job("analyze", {})
+    assert jobs.cancel_job(queued) == "cancelled"
+    assert [j["status"] for j in jobs.list_jobs()] == ["cancelled", "cancelled"]
+
+def test_fail_stale_jobs():
+    job_id = jobs.submit_job("simulate", {})
+    jobs.claim_job("w1")
+    assert jobs.fail_stale_jobs(stale_s=60) == 0
+    time.sleep(0.05)
+    assert jobs.fail_stale_jobs(stale_s=0.01) == 1
+    assert jobs.get_job(job_id)["error"] == "Worker stopped responding"
+
+def test_simulate_job_streams_transcript_and_saves_run(worker):
+    run_id = runs.save_run({"input_hash": "h", "status": "running", "transcript": []})
+    job_id = jobs.submit_job("simulate", simulate_payload(run_id))
+    job = wait_for(job_id)
+
+    assert job["status"] == "completed" and job["result"]["run_status"] == "simulated"
+    events = [e["data"] for e in jobs.job_events(job_id)]
+    run = runs.load_run(run_id)
+    assert events == run["transcript"] and len(events) == 5
+    assert run["status"] == "simulated" and runs.load_checkpoint(run_id)["next_round"] == 2
+
+    job_id = jobs.submit_job("nonsense", {})
+    assert wait_for(job_id)["error"].startswith("ValueError: Unknown job kind")
+
+def test_sweep_job_streams_each_variant_and_compares_them(worker):
+    variants = [{"name": "Baseline"}, {"name": "Without CFO", "exclude": ["CFO"]}]
+    payload = {"variants": variants, "personas": PERSONAS, "dilemma": "Expand?", "extracted": EXTRACTED, "rounds": 2, "simulation_type": "Monte Carlo Simulation"}
+    job_id = jobs.submit_job("sweep", payload)
+    job = wait_for(job_id)
+
+    assert job["status"] == "completed"
+    results = sorted((e["data"] for e in jobs.job_events(job_id)), key=lambda r: r["index"])
+    assert [(r["name"], r["personas"]) for r in results] == [("Baseline", ["CEO", "CFO"]), ("Without CFO", ["CEO"])]
+    assert [row["variant"] for row in job["result"]["matrix"]] == ["Baseline", "Without CFO"]
+
+def test_analyze_job_keeps_summary_when_nltk_data_is_missing(worker, monkeypatch):
+    monkeypatch.setattr(job_worker, "generate_summary_and_suggestion", lambda transcript: ("Summary.", "Suggestion."))
+    monkeypatch.setattr(transcript_analyzer, "_models", None)
+    monkeypatch.setattr(transcript_analyzer, "ensure_nltk_data", lambda: ["vader_lexicon"])
+    run_id = runs.save_run({"input_hash": "h", "status": "simulated", "transcript": []})
+    transcript = [{"agent": "CEO", "round": 1, "step": "Decision", "message": "We should expand carefully."}]
+    job = wait_for(jobs.submit_job("analyze", {"transcript": transcript, "dilemma": "Expand?", "run_id": run_id}))
+
+    assert job["status"] == "completed"
+    assert job["result"]["summary"] == "Summary." and "NLTK data not installed" in job["result"]["analysis"]["error"]
+    assert runs.load_run(run_id)["analysis"]["summary"] == "Summary."
+
+def test_job_llm_calls_are_stored_for_the_submitting_session(worker, monkeypatch):
+    monkeypatch.setattr(telemetry, "_telemetry", telemetry.Telemetry(log_path=None))
+
+    def summarize(transcript):
+        with telemetry.track_llm_call("summarize"):
+            return "Summary.", "Suggestion."
+
+    monkeypatch.setattr(job_worker, "generate_summary_and_suggestion", summarize)
+    transcript = [{"agent": "CEO", "round": 1, "step": "Decision", "message": "We should expand carefully."}]
+    job_id = jobs.submit_job("analyze", {"transcript": transcript, "dilemma": "Expand?", "session": "s1"})
+    assert wait_for(job_id)["status"] == "completed"
+
+    records = jobs.call_records(session="s1")
+    assert [(r["stage"], r["session"], r["job"]) for r in records] == [("summarize", "s1", job_id)]
+    assert jobs.call_records(job_id=job_id) == records and jobs.call_records(session="s2") == []
+    assert telemetry.summarize_records(records)[0]["calls"] == 1
+
+def test_http_api_submits_polls_and_streams(worker, monkeypatch):
+    monkeypatch.setattr(JobRequestHandler, "poll_interval", 0.05)
+    server = create_server(port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        request = urllib.request.Request(f"{base}/jobs", data=json.dumps({"kind": "simulate", "payload": simulate_payload()}).encode(), method="POST")
+        job_id = json.loads(urllib.request.urlopen(request).read())["id"]
+        with urllib.request.urlopen(f"{base}/jobs/{job_id}/events?stream=1") as response:
+            streamed = [json.loads(line) for line in response]
+        assert [e["seq"] for e in streamed] == list(range(1, 6))
+
+        job = json.loads(urllib.request.urlopen(f"{base}/jobs/{job_id}").read())
+        assert job["status"] == "completed" and job["result"]["turns"] == 5
+        polled = json.loads(urllib.request.urlopen(f"{base}/jobs/{job_id}/events?after=3").read())
+        assert [e["seq"] for e in polled["events"]] == [4, 5]
+
+        bad = urllib.request.Request(f"{base}/jobs", data=json.dumps({"kind": "nope"}).encode(), method="POST")
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(bad)
+        assert error.value.code == 400
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_worker_pool_runs_jobs_in_processes(database):
+    pool = WorkerPool(2, db_path=database.path).start()
+    try:
+        job_ids = [jobs.submit_job("simulate", simulate_payload()) for _ in range(3)]
+        finished = [wait_for(job_id, timeout=60) for job_id in job_ids]
+    finally:
+        pool.stop()
+    assert all(job["status"] == "completed" and job["result"]["turns"] == 5 for job in finished)
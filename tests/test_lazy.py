@@ -0,0 +1,25 @@
+import sys
+from unittest.mock import patch
+from utils.lazy import lazy_import, lazy_function
+from utils.nltk_data import ensure_nltk_data
+
+def test_lazy_import_defers_until_first_use(tmp_path, monkeypatch):
+    (tmp_path / "slow_module_for_test.py").write_text("VALUE = 42\ndef double(x):\n    return 2 * x\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    module = lazy_import("slow_module_for_test")
+    double = lazy_function("slow_module_for_test", "double")
+    assert "slow_module_for_test" not in sys.modules
+
+    assert module.VALUE == 42
+    assert double(4) == 8
+    assert "slow_module_for_test" in sys.modules
+
+def test_nltk_data_check_never_downloads_implicitly(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with patch("nltk.data.find", side_effect=LookupError), patch("nltk.download") as mock_download:
+        missing = ensure_nltk_data()
+        assert missing == ["vader_lexicon", "stopwords"]
+        mock_download.assert_not_called()
+
+        ensure_nltk_data(download=True)
+        assert mock_download.call_count == 2
@@ -0,0 +1,54 @@
+import json
+import time
+import pytest
+from unittest.mock import MagicMock
+from openai.types.chat import ChatCompletion
+import utils.llm_cache as llm_cache
+from utils.llm_cache import LLMCache, cached_completion
+
+def make_completion(content):
+    return ChatCompletion.model_validate({
+        "id": "test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "grok-3-beta",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}]
+    })
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = LLMCache(path=str(tmp_path / "cache.db"))
+    monkeypatch.setattr(llm_cache, "_cache", cache)
+    return cache
+
+def test_cached_completion_hits_and_bypass(cache):
+    client = MagicMock()
+    client.chat.completions.create.return_value = make_completion('{"summary": "ok"}')
+    request = {"model": "grok-3-beta", "messages": [{"role": "user", "content": "hi"}], "temperature": 0.5}
+
+    first = cached_completion(client, **request)
+    second = cached_completion(client, **request)
+    cached_completion(client, use_cache=False, **request)
+
+    assert second.choices[0].message.content == first.choices[0].message.content
+    assert client.chat.completions.create.call_count == 2
+    assert cache.stats()["hits"] == 1
+
+def test_invalid_responses_are_not_cached(cache):
+    client = MagicMock()
+    client.chat.completions.create.return_value = make_completion("not json")
+    cached_completion(client, validate=json.loads, model="m", messages=[])
+    assert cache.stats()["entries"] == 0
+
+def test_lru_eviction_and_ttl(tmp_path):
+    cache = LLMCache(path=str(tmp_path / "cache.db"), max_bytes=10, ttl_s=60)
+    cache.set("a", "12345")
+    time.sleep(0.01)
+    cache.set("b", "12345")
+    cache.get("a")
+    cache.set("c", "12345")
+    assert cache.get("a") == "12345"
+    assert cache.get("b") is None
+    cache.ttl_s = 0
+    time.sleep(0.01)
+    assert cache.get("c") is None
@@ -0,0 +1,19 @@
+import pytest
+from utils.llm_client import get_client, get_model, close_clients
+
+def test_get_client_is_shared_until_key_changes(monkeypatch):
+    monkeypatch.setenv("XAI_API_KEY", "key-1")
+    first = get_client()
+    assert get_client() is first
+    assert str(first.base_url).startswith("https://api.x.ai/v1")
+
+    monkeypatch.setenv("XAI_API_KEY", "key-2")
+    second = get_client()
+    assert second is not first
+    assert second.api_key == "key-2"
+    close_clients()
+
+def test_get_model_unknown_provider():
+    assert get_model() == "grok-3-beta"
+    with pytest.raises(ValueError, match="Unknown LLM provider"):
+        get_model("missing")
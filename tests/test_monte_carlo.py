@@ -0,0 +1,26 @@
+import numpy as np
+from agents.monte_carlo import decision_probabilities, run_monte_carlo
+
+PERSONAS = [
+    {"name": "CEO", "biases": ["confirmation bias"]},
+    {"name": "CFO", "biases": ["status quo bias"]},
+    {"name": "HR", "biases": []}
+]
+
+def test_decision_probabilities_are_valid_distributions():
+    probs = decision_probabilities(PERSONAS)
+    assert probs.shape == (3, 3)
+    assert (probs >= 0).all()
+    assert np.allclose(probs.sum(axis=1), 1.0)
+
+def test_run_monte_carlo_is_chunked_and_reproducible():
+    first = run_monte_carlo(PERSONAS, rounds=4, runs=20000, chunk_size=3000, seed=7)
+    second = run_monte_carlo(PERSONAS, rounds=4, runs=20000, chunk_size=3000, seed=7)
+    assert first["runs"] == 20000
+    assert first["agreement"]["mean"] == second["agreement"]["mean"]
+    assert len(first["convergence"]["trace"]) == 7
+    assert abs(sum(first["agreement"]["distribution"].values()) - 1.0) < 1e-9
+    lo, hi = first["agreement"]["ci95"]
+    assert lo <= first["agreement"]["mean"] <= hi
+    assert [r["label"] for r in first["representative_runs"]] == ["median", "least agreement", "most agreement"]
+    assert np.array(first["representative_runs"][0]["decisions"]).shape == (4, 3)
@@ -0,0 +1,58 @@
+import os
+import pytest
+import utils.pdf_ingest as pdf_ingest
+from utils.pdf_ingest import load_pdf
+
+def make_pdf(pages):
+    """Build a minimal PDF with one line of Helvetica text per page."""
+    n = len(pages)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [" + b" ".join(f"{4 + 2 * i} 0 R".encode() for i in range(n)) + f"] /Count {n} >>".encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+    ]
+    for i, text in enumerate(pages):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>".encode())
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+def test_pages_are_extracted_lazily_and_cached(tmp_path):
+    data = make_pdf([f"Page {i} text" for i in range(5)])
+    document = load_pdf(data, cache_dir=str(tmp_path))
+    assert not document.cached
+
+    pages = document.iter_pages()
+    assert next(pages) == (0, "Page 0 text")
+    assert not os.listdir(tmp_path)
+    assert [text for _, text in pages][-1] == "Page 4 text"
+
+    reopened = load_pdf(data, cache_dir=str(tmp_path))
+    assert reopened.cached
+    assert reopened.text() == "\n".join(f"Page {i} text" for i in range(5))
+    assert reopened.page_offsets() == [i * 12 for i in range(5)]
+
+def test_large_files_are_extracted_in_parallel(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_ingest, "PDF_PARALLEL_MIN_PAGES", 4)
+    monkeypatch.setattr(pdf_ingest, "PDF_PAGES_PER_TASK", 3)
+    texts = [f"Briefing page {i}" for i in range(10)]
+    document = pdf_ingest.PDFDocument(make_pdf(texts), cache_dir=str(tmp_path), workers=2)
+    assert document.pages() == texts
+
+def test_chunks_respect_size_and_report_offsets(tmp_path):
+    texts = ["Alpha beta gamma. Delta epsilon zeta. Eta theta iota.", "Kappa lambda mu."]
+    document = load_pdf(make_pdf(texts), cache_dir=str(tmp_path))
+    chunks = list(document.iter_chunks(max_chars=20))
+    full = document.text()
+    assert all(len(c["text"]) <= 20 for c in chunks)
+    assert all(full[c["start"]:c["start"] + len(c["text"])] == c["text"] for c in chunks)
+    assert chunks[-1] == {"page": 1, "start": len(texts[0]) + 1, "text": "Kappa lambda mu."}
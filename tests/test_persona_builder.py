@@ -1,12 +1,13 @@
 import pytest
-from agents.persona_builder import build_personas
+from tenacity import stop_after_attempt
+from agents.persona_builder import generate_personas, _generate_personas
 
-def test_build_personas_valid():
-    stakeholders = ["CEO", "CFO", "HR"]
-    personas = build_personas(stakeholders)
-    assert len(personas) == 3
-    assert all("name" in p and "goals" in p and "biases" in p and "tone" in p for p in personas)
+def test_generate_personas_valid(stub_llm):
+    personas = generate_personas({"stakeholders": [{"name": "CEO"}, "CFO", {"name": "HR"}], "process": ["Decide"]})
+    assert [p["name"] for p in personas] == ["CEO", "CFO", "HR"]
+    assert all(isinstance(p["goals"], list) and isinstance(p["biases"], list) and p["tone"] for p in personas)
 
-def test_build_personas_invalid_count():
-    with pytest.raises(ValueError, match="3–7 stakeholders required"):
-        build_personas(["CEO"])
+def test_generate_personas_requires_stakeholders(stub_llm):
+    with pytest.raises(Exception, match="No valid stakeholders"):
+        _generate_personas.retry_with(stop=stop_after_attempt(1), reraise=True)({"stakeholders": []})
+    assert stub_llm.stats()["calls"] == 0
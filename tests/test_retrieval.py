@@ -0,0 +1,39 @@
+import json
+import pytest
+import utils.llm_cache as llm_cache
+from unittest.mock import patch, MagicMock
+from agents.retrieval import BM25Index, select_passages, format_passages
+from agents.extractor import extract_decision_structure
+
+CHUNKS = [
+    {"page": 0, "start": 0, "text": "Annual report overview and company history since 1990."},
+    {"page": 1, "start": 60, "text": "The marketing budget allocation favours digital channels over print."},
+    {"page": 2, "start": 140, "text": "Cafeteria menu changes and parking arrangements for staff."},
+    {"page": 3, "start": 200, "text": "Budget cuts in R&D would delay the AI product line by a year."}
+]
+
+def test_bm25_ranks_matching_passages_first():
+    scores = BM25Index([c["text"] for c in CHUNKS]).scores("How should we split the budget between marketing and R&D?")
+    assert scores[1] > scores[0] and scores[3] > scores[2]
+    assert scores[2] == 0
+
+def test_select_passages_respects_budget_and_document_order():
+    selected = select_passages(CHUNKS, "marketing budget for the AI product line", token_budget=35)
+    assert [p["page"] for p in selected] == [1, 3]
+    assert sum(len(p["text"]) for p in selected) / 4 <= 35
+    assert format_passages(selected).startswith("[p. 2] The marketing budget")
+
+def test_select_passages_falls_back_to_opening_chunks():
+    selected = select_passages(CHUNKS, "zebra", token_budget=20)
+    assert [p["page"] for p in selected] == [0]
+
+def test_extraction_prompt_contains_context_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, "_cache", llm_cache.LLMCache(path=str(tmp_path / "cache.db")))
+    content = json.dumps({"decision_type": "Strategic", "stakeholders": [], "issues": [], "process": [], "external_factors": []})
+    with patch("agents.extractor.get_client") as mock_get_client:
+        create = mock_get_client.return_value.chat.completions.create
+        create.return_value = MagicMock(choices=[MagicMock(message=MagicMock(content=content))])
+        extract_decision_structure("Split the budget.", "Split the budget.", "", use_cache=False, excerpts="[p. 2] Marketing wants more.")
+    prompt = create.call_args.kwargs["messages"][1]["content"]
+    assert prompt.count("Split the budget.") == 1
+    assert "[p. 2] Marketing wants more." in prompt
@@ -0,0 +1,44 @@
+import pytest
+import utils.db as db
+import utils.runs as runs
+
+PERSONAS = [{"id": 3, "name": "CEO", "goals": ["Lead"], "biases": [], "tone": "Calm", "bio": "", "expected_behavior": ""}]
+
+@pytest.fixture(autouse=True)
+def database(tmp_path, monkeypatch):
+    database = db.Database(path=str(tmp_path / "test.db"))
+    monkeypatch.setattr(db, "_db", database)
+    runs.init_runs()
+    yield database
+    database.close()
+
+def test_run_round_trip_updates_only_the_parts_given(database):
+    transcript = [{"agent": "CEO", "round": 1, "step": "Open", "message": "We should expand. " * 200}]
+    run_id = runs.save_run({
+        "input_hash": "abc", "title": "Expand?", "simulation_type": "Monte Carlo Simulation", "status": "running",
+        "inputs": {"dilemma": "Expand?"}, "extracted": {"process": ["Decide"]}, "personas": PERSONAS, "transcript": []
+    })
+    runs.save_run({"id": run_id, "transcript": transcript, "status": "simulated"})
+
+    run = runs.load_run(run_id)
+    assert (run["status"], run["turns"], run["transcript"], run["personas"]) == ("simulated", 1, transcript, PERSONAS)
+    assert run["inputs"] == {"dilemma": "Expand?"} and run["analysis"] is None
+    stored = database.reader().execute("SELECT length(transcript) FROM runs").fetchone()[0]
+    assert stored < len(transcript[0]["message"]) // 10  # kept compressed
+    assert runs.load_run("missing") is None
+
+def test_list_runs_newest_first_and_by_input_hash():
+    first = runs.save_run({"input_hash": "a", "title": "One"})
+    second = runs.save_run({"input_hash": "b", "title": "Two"})
+    runs.save_run({"id": first, "status": "analyzed"})
+    assert [r["id"] for r in runs.list_runs()] == [first, second]
+    assert [r["title"] for r in runs.list_runs(input_hash="b")] == ["Two"]
+    assert "transcript" not in runs.list_runs()[0]
+    runs.delete_run(second)
+    assert [r["id"] for r in runs.list_runs()] == [first]
+
+def test_input_hash_ignores_persona_ids_but_not_content():
+    base = runs.input_hash("Expand?", PERSONAS, "Monte Carlo Simulation")
+    assert runs.input_hash("Expand?", [{**PERSONAS[0], "id": 99}], "Monte Carlo Simulation") == base
+    assert runs.input_hash("Expand?", [{**PERSONAS[0], "tone": "Angry"}], "Monte Carlo Simulation") != base
+    assert runs.input_hash("Expand?", PERSONAS, "Game Theory Simulation") != base
@@ -1,14 +1,73 @@
-import pytest
-from agents.summarizer import summarize_and_analyze
-from unittest.mock import patch
-
-def test_summarize_and_analyze_success():
-    transcript = [{"agent": "CEO", "message": "Invest in growth."}]
-    with patch("requests.post") as mock_post:
-        mock_post.return_value.json.return_value = {
-            "choices": [{"message": {"content": '{"summary": "Debate on growth.", "keywords": ["growth"], "suggestion": "Increase input."}}'}]
-        }
-        summary, keywords, suggestion = summarize_and_analyze(transcript)
-        assert summary == "Debate on growth."
-        assert keywords == ["growth"]
-        assert suggestion == "Increase input."
+import threading
+import time
+import agents.summarizer as summarizer
+from benchmarks.stub_llm_server import DEFAULT_SUMMARY
+from utils.telemetry import current_tags, telemetry_tags
+from agents.summarizer import RoundSummarizer, format_round, generate_summary_and_suggestion, summarize_rounds
+
+def make_transcript(rounds):
+    return [
+        {"agent": agent, "round": r, "step": "Discussion", "message": f"Round {r}: {agent} argues   for option {r}."}
+        for r in range(1, rounds + 1) for agent in ("CEO", "CFO")
+    ]
+
+def test_generate_summary_and_suggestion_success(stub_llm):
+    summary, suggestion = generate_summary_and_suggestion([{"agent": "CEO", "round": 1, "step": "Decision", "message": "Invest in growth."}])
+    assert summary == DEFAULT_SUMMARY["summary"]
+    assert suggestion == f"Faultlines: {DEFAULT_SUMMARY['faultlines']}\nChokepoints: {DEFAULT_SUMMARY['chokepoints']}\nRecommendations: {DEFAULT_SUMMARY['suggestion']}"
+
+def test_format_round_is_compact():
+    assert format_round(make_transcript(1)) == "CEO (Discussion): Round 1: CEO argues for option 1.\nCFO (Discussion): Round 1: CFO argues for option 1."
+
+def test_round_summarizer_submits_each_round_when_the_next_starts(monkeypatch):
+    submitted = []
+    monkeypatch.setattr(summarizer, "summarize_round", lambda round_num, entries, use_cache: submitted.append(round_num) or f"r{round_num}:{len(entries)}")
+    rounds = RoundSummarizer(workers=2)
+    transcript = make_transcript(3)
+    for entry in transcript[:3]:
+        rounds.add(entry)
+    assert submitted == [1]
+    for entry in transcript[3:]:
+        rounds.add(entry)
+    assert rounds.finish() == [{"round": 1, "summary": "r1:2"}, {"round": 2, "summary": "r2:2"}, {"round": 3, "summary": "r3:2"}]
+
+def test_round_summarizer_close_does_not_wait_and_cancel_drops_pending_rounds(monkeypatch):
+    release, started = threading.Event(), []
+    monkeypatch.setattr(summarizer, "summarize_round", lambda round_num, entries, use_cache: started.append(round_num) or release.wait(5))
+    rounds = RoundSummarizer(workers=1)
+    for entry in make_transcript(3):
+        rounds.add(entry)
+    while not started:
+        time.sleep(0.01)
+    begin = time.time()
+    rounds.close(cancel=True)
+    assert time.time() - begin < 1
+    release.set()
+    time.sleep(0.2)
+    assert started == [1]
+
+def test_round_summaries_keep_the_callers_telemetry_tags(monkeypatch):
+    monkeypatch.setattr(summarizer, "summarize_round", lambda round_num, entries, use_cache: current_tags().get("session"))
+    with telemetry_tags(session="s1"):
+        summaries = summarize_rounds(make_transcript(2), workers=2)
+    assert [s["summary"] for s in summaries] == ["s1", "s1"]
+
+def test_summary_covers_every_round_and_reuses_cached_rounds(stub_llm):
+    transcript = make_transcript(12)
+    summary, suggestion = generate_summary_and_suggestion(transcript)
+    assert summary and suggestion.startswith("Faultlines:")
+    assert stub_llm.stats()["calls"] == 13
+
+    # Re-analysis is served from the cache; a new round costs its own summary and the reduce
+    generate_summary_and_suggestion(transcript)
+    assert stub_llm.stats()["calls"] == 13
+    generate_summary_and_suggestion(transcript + make_transcript(13)[-2:])
+    assert stub_llm.stats()["calls"] == 15
+
+def test_prefetched_round_summaries_are_used(stub_llm):
+    transcript = make_transcript(3)
+    rounds = summarize_rounds(transcript)
+    assert [r["round"] for r in rounds] == [1, 2, 3]
+    calls = stub_llm.stats()["calls"]
+    generate_summary_and_suggestion(transcript, round_summaries=rounds)
+    assert stub_llm.stats()["calls"] == calls + 1
@@ -0,0 +1,73 @@
+import json
+import time
+import pytest
+import utils.llm_cache as llm_cache
+import agents.transcript_analyzer as transcript_analyzer_module
+from agents.sweep import run_sweep, stance_shares, variant_inputs
+from unittest.mock import patch, MagicMock
+
+PERSONAS = [
+    {"name": "CEO", "goals": ["Lead"], "biases": ["None"], "tone": "Strategic"},
+    {"name": "CFO", "goals": ["Save"], "biases": ["None"], "tone": "Analytical"},
+    {"name": "HR", "goals": ["Support"], "biases": ["None"], "tone": "Emotional"}
+]
+EXTRACTED = {"process": ["Situation Assessment", "Options Development"], "stakeholders": []}
+
+class FakeAnalyzer:
+    def polarity_scores(self, text):
+        return {"compound": 0.5 if "agree" in text else 0.0}
+
+@pytest.fixture(autouse=True)
+def fake_models(monkeypatch):
+    monkeypatch.setattr(transcript_analyzer_module, "_models", (FakeAnalyzer(), frozenset({"the", "i", "a"})))
+
+def test_variant_inputs_applies_subset_exclusion_and_process_order():
+    inputs = variant_inputs({"personas": ["CEO", "CFO"], "exclude": ["CFO"], "process": ["Options Development"], "scenarios": "Budget cut"}, PERSONAS, EXTRACTED)
+    assert [p["name"] for p in inputs["personas"]] == ["CEO"]
+    assert inputs["extracted"]["process"] == ["Options Development"]
+    assert EXTRACTED["process"] == ["Situation Assessment", "Options Development"]
+    assert inputs["scenarios"] == "Budget cut"
+
+def test_stance_shares_reads_final_round():
+    transcript = [
+        {"agent": "CEO", "round": 1, "message": "I disagree."},
+        {"agent": "CEO", "round": 2, "message": "As CEO, I agree on the approach."},
+        {"agent": "CFO", "round": 2, "message": "As CFO, I disagree on the approach."},
+        {"agent": "System", "round": 2, "message": "Summary"}
+    ]
+    assert stance_shares(transcript) == {"support": 0.5, "compromise": 0.0, "oppose": 0.5, "neutral": 0.0}
+
+def test_run_sweep_compares_variants_in_order():
+    variants = [
+        {"name": "Baseline"},
+        {"name": "Without HR", "exclude": ["HR"]},
+        {"name": "Nobody", "personas": ["CTO"]}
+    ]
+    sweep = run_sweep(variants, PERSONAS, "Dilemma", "", EXTRACTED, simulation_type="Monte Carlo Simulation", rounds=2)
+    matrix = sweep["matrix"]
+
+    assert [row["variant"] for row in matrix] == ["Baseline", "Without HR", "Nobody"]
+    assert [row["turns"] for row in matrix] == [6, 4, 0]
+    assert matrix[0]["consensus"] is not None
+    assert matrix[0]["conflicts"] is not None and matrix[0]["positive"] >= 0
+    assert abs(sum(matrix[1][s] for s in ("support", "compromise", "oppose", "neutral")) - 1.0) < 1e-9
+    assert matrix[2]["error"] and matrix[2]["mean_sentiment"] is None
+
+def test_run_sweep_runs_variants_concurrently(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, "_cache", llm_cache.LLMCache(path=str(tmp_path / "cache.db")))
+
+    def fake_create(**kwargs):
+        time.sleep(0.2)
+        agent = kwargs["messages"][1]["content"].split(",")[0].replace("You are ", "")
+        content = json.dumps({"agent": agent, "round": 1, "step": "Situation Assessment", "message": "I agree."})
+        return MagicMock(choices=[MagicMock(message=MagicMock(content=content))])
+
+    variants = [{"name": f"V{i}", "scenarios": f"Scenario {i}"} for i in range(6)]
+    with patch("agents.debater.get_client") as mock_get_client:
+        mock_get_client.return_value.chat.completions.create.side_effect = fake_create
+        start = time.time()
+        sweep = run_sweep(variants, PERSONAS, "Dilemma", "", EXTRACTED, rounds=1, workers=6, use_cache=False)
+        elapsed = time.time() - start
+
+    assert all(row["turns"] == 3 and row["support"] == 1.0 for row in sweep["matrix"])
+    assert elapsed < 0.8
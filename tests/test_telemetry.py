@@ -0,0 +1,77 @@
+import json
+import pytest
+from unittest.mock import MagicMock
+from openai import APITimeoutError
+from openai.types.chat import ChatCompletion
+import utils.llm_cache as llm_cache
+import utils.telemetry as telemetry
+from utils.llm_cache import LLMCache, cached_completion
+from utils.telemetry import Telemetry, track_llm_call, telemetry_tags
+
+def make_completion(content, prompt_tokens=100, completion_tokens=50):
+    return ChatCompletion.model_validate({
+        "id": "test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "grok-3-beta",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens}
+    })
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, "_cache", LLMCache(path=str(tmp_path / "cache.db")))
+    store = Telemetry(max_records=100)
+    monkeypatch.setattr(telemetry, "_telemetry", store)
+    return store
+
+def test_tracked_call_records_tokens_cost_and_cache_hits(store):
+    client = MagicMock()
+    client.chat.completions.create.return_value = make_completion('{"ok": true}')
+    request = {"model": "grok-3-beta", "messages": [{"role": "user", "content": "hi"}]}
+
+    with telemetry_tags(session="s1"):
+        with track_llm_call("debate", persona="Alice", round_num=1):
+            cached_completion(client, **request)
+        with track_llm_call("debate", persona="Alice", round_num=2):
+            cached_completion(client, **request)
+
+    fresh, cached = store.records(session="s1")
+    assert (fresh["prompt_tokens"], fresh["completion_tokens"]) == (100, 50)
+    assert fresh["cost_usd"] == pytest.approx((100 * 3.0 + 50 * 15.0) / 1_000_000)
+    assert not fresh["cached"] and cached["cached"]
+    assert cached["cost_usd"] == 0.0
+    summary = store.summary(session="s1")[0]
+    assert summary["stage"] == "debate" and summary["calls"] == 2 and summary["cached"] == 1
+
+def test_retries_and_timeouts_are_recorded(store):
+    client = MagicMock()
+    client.chat.completions.create.side_effect = [
+        ValueError("bad gateway"),
+        APITimeoutError(request=MagicMock())
+    ]
+
+    with pytest.raises(APITimeoutError):
+        with track_llm_call("extract"):
+            for _ in range(2):
+                try:
+                    cached_completion(client, use_cache=False, model="grok-3-beta", messages=[])
+                except ValueError:
+                    pass
+
+    record = store.records(stage="extract")[0]
+    assert record["attempts"] == 2 and record["retries"] == 1
+    assert record["outcome"] == "timeout"
+    assert store.summary()[0]["errors"] == 1
+
+def test_untracked_calls_and_jsonl_export(store, tmp_path):
+    client = MagicMock()
+    client.chat.completions.create.return_value = make_completion("{}")
+    cached_completion(client, model="grok-3-beta", messages=[])
+    assert store.records() == []
+
+    with track_llm_call("summarize"):
+        cached_completion(client, use_cache=False, model="grok-3-beta", messages=[])
+    path = tmp_path / "telemetry.jsonl"
+    assert store.dump_jsonl(str(path)) == 1
+    assert json.loads(path.read_text().splitlines()[0])["stage"] == "summarize"
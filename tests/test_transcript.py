@@ -0,0 +1,50 @@
+import io
+import json
+from utils.transcript import Transcript
+
+ENTRIES = [
+    {"agent": "CEO", "round": 1, "step": "Situation Assessment", "message": "We should expand — carefully.", "latency": 1.25},
+    {"agent": "CFO", "round": 1, "step": "Situation Assessment", "message": "I disagree.", "fallback": True},
+    {"agent": "CEO", "round": 2, "step": "Decision", "message": "Agreed: a pilot first.", "latency": 0.5},
+    {"agent": "System", "round": 2, "step": "Monte Carlo Summary", "message": "Support wins.", "monte_carlo": {"runs": 3}}
+]
+
+def test_round_trips_entries_through_jsonl():
+    transcript = Transcript(ENTRIES)
+    assert len(transcript) == 4 and transcript.to_list() == ENTRIES
+    assert transcript[-1] == ENTRIES[-1]
+    assert transcript.agents == ["CEO", "CFO", "System"] and transcript.rounds == [1, 2]
+
+    text = transcript.to_jsonl()
+    assert [json.loads(line) for line in text.splitlines()] == ENTRIES
+    assert Transcript.read_jsonl(io.StringIO(text)).to_list() == ENTRIES
+    assert Transcript.read_jsonl(text.encode("utf-8").splitlines()).to_list() == ENTRIES
+    buffer = io.StringIO()
+    assert transcript.write_jsonl(buffer) == 4 and buffer.getvalue() == text
+
+def test_views_select_rows_without_copying():
+    transcript = Transcript(ENTRIES)
+    ceo = transcript.by_agent("CEO")
+    first = transcript.by_round(1)
+    assert [e["message"] for e in ceo] == ["We should expand — carefully.", "Agreed: a pilot first."]
+    assert first.to_list() == ENTRIES[:2] and first[-1] == ENTRIES[1]
+    assert len(transcript.by_agent("Nobody")) == 0 and not transcript.by_round(9)
+
+    # A view keeps the rows it was taken with; a new one sees later appends
+    transcript.append({"agent": "CEO", "round": 1, "step": "Situation Assessment", "message": "One more point."})
+    assert len(first) == 2 and len(transcript.by_round(1)) == 3
+    assert Transcript.from_entries(transcript) is transcript
+
+def test_to_pandas_uses_categoricals():
+    frame = Transcript(ENTRIES).to_pandas()
+    assert list(frame.columns) == ["agent", "round", "step", "message", "latency"]
+    assert str(frame["agent"].dtype) == "category" and list(frame["agent"]) == ["CEO", "CFO", "CEO", "System"]
+    assert frame["round"].tolist() == [1, 1, 2, 2] and frame["message"].iloc[2] == "Agreed: a pilot first."
+    assert frame["latency"].isna().tolist() == [False, True, False, True]
+    assert Transcript(ENTRIES).by_agent("CEO").to_pandas()["step"].tolist() == ["Situation Assessment", "Decision"]
+
+def test_memory_stays_proportional_to_text():
+    transcript = Transcript({"agent": f"Stakeholder {i % 10}", "round": i // 10 + 1, "step": "Discussion", "message": "x" * 100} for i in range(10000))
+    # 100 bytes of text per turn plus a few fixed-size columns; no per-turn objects
+    assert transcript.nbytes() < 10000 * 150
+    assert len(transcript.agents) == 10 and len(transcript.by_round(1000)) == 10
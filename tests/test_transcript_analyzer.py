@@ -0,0 +1,46 @@
+import json
+import pytest
+import agents.transcript_analyzer as transcript_analyzer_module
+from agents.transcript_analyzer import analyze_transcripts, transcript_analyzer
+
+class FakeAnalyzer:
+    def polarity_scores(self, text):
+        return {"compound": 0.5 if "good" in text else -0.5 if "bad" in text else 0.0}
+
+def install_fake_models():
+    transcript_analyzer_module._models = (FakeAnalyzer(), frozenset({"the", "i", "a"}))
+
+@pytest.fixture(autouse=True)
+def fake_models(monkeypatch):
+    # Spawned pool workers import the analyzer afresh, so they install the fake models as their initializer; no NLTK data is needed
+    monkeypatch.setattr(transcript_analyzer_module, "_models", None)
+    monkeypatch.setattr(transcript_analyzer_module, "_init_worker", install_fake_models)
+    install_fake_models()
+
+def make_transcript(n):
+    return [
+        {"agent": "CEO", "round": 1, "step": "Options Development", "message": f"I propose a good plan number {n}."},
+        {"agent": "CFO", "round": 1, "step": "Options Development", "message": "I oppose this, the budget is bad."}
+    ]
+
+def test_batch_matches_single_transcript_analysis():
+    transcripts = [make_transcript(n) for n in range(10)]
+    result = analyze_transcripts(transcripts, workers=1, chunk_size=3)
+    single = json.loads(transcript_analyzer(json.dumps({"transcript": transcripts[4]})))
+
+    assert result["transcripts"] == 10
+    assert result["sentiment"]["score"][8:10] == [s["score"] for s in single["sentiment_analysis"]]
+    assert result["sentiment"]["transcript"][8:10] == [4, 4]
+    assert result["arguments"]["type"][:2] == ["Proposal", "Disagreement"]
+    assert result["conflicts"]["stakeholders"][0] == ["CFO", "CEO"]
+    assert "the" not in result["keywords"]["keyword"]
+
+def test_process_pool_preserves_order_and_reports_errors():
+    transcripts = [make_transcript(n) for n in range(20)]
+    transcripts[7] = [{"agent": "CEO"}]
+    result = analyze_transcripts(iter(transcripts), workers=2, chunk_size=4)
+
+    assert result["transcripts"] == 20
+    assert result["errors"]["transcript"] == [7]
+    assert result["sentiment"]["transcript"] == sorted(result["sentiment"]["transcript"])
+    assert len(result["sentiment"]["score"]) == 38
@@ -1,12 +1,22 @@
+import json
 import pytest
-from utils.visualizer import generate_visuals
-import os
+import utils.visualizer as visualizer
+from utils.visualizer import generate_visualizations
 
-def test_generate_visuals():
+@pytest.fixture(autouse=True)
+def cache(monkeypatch):
+    monkeypatch.setattr(visualizer, "_cache", visualizer.ArtifactCache())
+
+def test_generate_visualizations():
     keywords = ["budget", "growth", "resources"]
-    transcript = [{"agent": "CEO", "message": "Invest in growth."}]
-    generate_visuals(keywords, transcript)
-    assert os.path.exists("visualization.png")
-    assert os.path.exists("heatmap.png")
-    os.remove("visualization.png")
-    os.remove("heatmap.png")
+    transcript = [
+        {"agent": "CEO", "round": 1, "message": "Invest in growth."},
+        {"agent": "CFO", "round": 1, "message": "Protect the budget."}
+    ]
+    result = generate_visualizations(keywords, transcript, [{"name": "CEO"}, {"name": "CFO"}])
+    assert result["wordcloud_png"].startswith(b"\x89PNG")
+    assert json.loads(result["network_json"])["data"]
+
+def test_generate_visualizations_reports_errors(monkeypatch):
+    monkeypatch.setattr(visualizer, "WordCloud", None)
+    assert "error" in generate_visualizations(["budget"], [], [])
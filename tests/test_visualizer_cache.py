@@ -0,0 +1,61 @@
+import json
+import matplotlib.pyplot as plt
+import pytest
+import utils.visualizer as visualizer
+
+TRANSCRIPT = [
+    {"agent": "CEO", "round": 1, "message": "Invest in growth."},
+    {"agent": "CFO", "round": 1, "message": "Protect the budget."},
+    {"agent": "CEO", "round": 2, "message": "Growth pays for itself."}
+]
+
+@pytest.fixture(autouse=True)
+def cache(monkeypatch):
+    cache = visualizer.ArtifactCache()
+    monkeypatch.setattr(visualizer, "_cache", cache)
+    return cache
+
+def test_artifacts_render_once_per_input(cache, monkeypatch):
+    png = visualizer.wordcloud_png(["budget", "growth", "resources"])
+    assert png.startswith(b"\x89PNG")
+    figure = json.loads(visualizer.network_figure_json(TRANSCRIPT))
+    assert figure["layout"]["title"]["text"] == "Stakeholder Interaction Network"
+
+    monkeypatch.setattr(visualizer, "WordCloud", None)  # any re-render would now fail
+    assert visualizer.wordcloud_png(["budget", "growth", "resources"]) == png
+    assert visualizer.generate_visualizations(["budget", "growth", "resources"], TRANSCRIPT, [])["wordcloud_png"] == png
+    assert cache.hits == 3
+    assert "error" in visualizer.generate_visualizations(["other"], TRANSCRIPT, [])
+
+def test_process_flowchart_leaves_no_open_figures():
+    before = plt.get_fignums()
+    assert visualizer.process_flowchart_png(["Review", "Decide"]).startswith(b"\x89PNG")
+    assert plt.get_fignums() == before
+
+def test_cache_evicts_least_recently_used_within_bounds():
+    cache = visualizer.ArtifactCache(max_bytes=10, max_entries=3)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    cache.get("a")
+    cache.put("c", b"1234")  # over 10 bytes: evicts "b", the least recently used
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (b"1234", None, b"1234")
+    assert cache.size == 8
+    cache.put("huge", b"x" * 11)  # larger than the whole cache: never stored
+    assert cache.get("huge") is None and cache.size == 8
+
+def test_interaction_matrix_counts_repeated_exchanges():
+    agents, counts = visualizer.interaction_matrix(TRANSCRIPT + [{"agent": "CFO"}, {"agent": "Board"}])
+    assert agents == ["CEO", "CFO", "Board"]
+    assert counts.tolist() == [[0, 2, 0], [1, 0, 1], [0, 0, 0]]
+    assert visualizer.interaction_matrix([])[1].shape == (0, 0)
+
+def test_network_layout_is_deterministic_and_edges_are_weighted(cache):
+    transcript = TRANSCRIPT + [{"agent": "CFO"}, {"agent": "CEO"}, {"agent": "CFO"}, {"agent": "HR"}]
+    first = json.loads(visualizer.network_figure_json(transcript))
+    cache.clear()
+    assert json.loads(visualizer.network_figure_json(transcript)) == first
+    widths = sorted(trace["line"]["width"] for trace in first["data"] if trace["mode"] == "lines")
+    assert len(widths) == 3 and widths[0] < widths[1] < widths[2]  # 1, 2 and 3 exchanges
+    nodes = first["data"][-1]
+    assert nodes["text"] == ["CEO", "CFO", "HR"] and nodes["hovertext"][0] == "CEO: 3 turns"
+    assert "CEO → CFO: 3 turns" in first["data"][-2]["hovertext"]
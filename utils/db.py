@@ -1,12 +1,194 @@
-import sqlite3
+import atexit
 import json
-from typing import List, Dict
+import logging
+import os
+import queue
+import re
+import sqlite3
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List, Dict, Optional
+from config import DB_PATH, DB_BUSY_TIMEOUT_S, DB_WRITE_BATCH_SIZE, PERSONA_PAGE_SIZE, PERSONA_DIR
 
-def init_db():
-    """Initialize the SQLite database with a personas table."""
-    conn = sqlite3.connect('decisionforge.db')
-    c = conn.cursor()
-    c.execute('''
+logger = logging.getLogger(__name__)
+
+# Every persona field is stored, in its own column; list fields are stored as JSON
+PERSONA_FIELDS = ["name", "role", "bio", "psychological_traits", "influences", "biases", "historical_behavior", "tone", "goals", "expected_behavior"]
+LIST_FIELDS = {"psychological_traits", "influences", "biases", "goals"}
+# Older rows and minimal personas may lack these; they are left out of the persona when unset
+OPTIONAL_FIELDS = {"role", "psychological_traits", "influences", "historical_behavior"}
+PERSONA_COLUMNS = "id, " + ", ".join(PERSONA_FIELDS)
+# FTS5 column weights for ranking, in PERSONA_FIELDS order: names and roles count most
+SEARCH_WEIGHTS = (10.0, 5.0, 1.0, 2.0, 1.0, 1.0, 1.0, 2.0, 2.0, 1.0)
+SEARCH_TERM = re.compile(r"[^\W_]+")
+
+class Database:
+    """
+    SQLite database in WAL mode with pooled readers and a single writer thread.
+
+    Each thread reads through its own persistent connection, so reads never wait on writes. Writes
+    are queued to one writer thread, which commits whatever has queued up (up to batch_size
+    operations) in a single transaction, so concurrent sessions never contend for the write lock.
+    """
+
+    def __init__(self, path: str = DB_PATH, busy_timeout: float = DB_BUSY_TIMEOUT_S, batch_size: int = DB_WRITE_BATCH_SIZE):
+        """
+        Args:
+            path (str): SQLite database file.
+            busy_timeout (float): Seconds a connection waits for a lock before failing.
+            batch_size (int): Maximum queued writes committed together.
+        """
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.batch_size = batch_size
+        self._local = threading.local()
+        self._readers: List[tuple] = []
+        self._readers_lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="db-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout * 1000)}")
+        return conn
+
+    def reader(self) -> sqlite3.Connection:
+        """Return this thread's read connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._readers_lock:
+                # Short-lived threads (one per Streamlit rerun or HTTP request) leave their connections behind
+                live = []
+                for thread, reader in self._readers:
+                    if thread.is_alive():
+                        live.append((thread, reader))
+                    else:
+                        reader.close()
+                self._readers = live + [(threading.current_thread(), conn)]
+        return conn
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            op = self._queue.get()
+            if op is None:
+                break
+            batch = [op]
+            while len(batch) < self.batch_size:
+                try:
+                    op = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if op is None:
+                    self._queue.put(None)
+                    break
+                batch.append(op)
+            self._commit_batch(conn, batch)
+        conn.close()
+
+    def _commit_batch(self, conn: sqlite3.Connection, batch: List[tuple]):
+        results = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for fn, future in batch:
+                # A savepoint per operation keeps one failure from rolling back the rest of the batch
+                conn.execute("SAVEPOINT op")
+                try:
+                    results.append((future, fn(conn), None))
+                    conn.execute("RELEASE op")
+                except Exception as e:
+                    conn.execute("ROLLBACK TO op")
+                    conn.execute("RELEASE op")
+                    results.append((future, None, e))
+            conn.execute("COMMIT")
+        except Exception as e:
+            logger.error(f"Database write batch failed: {str(e)}")
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        # Results are only released once they are durable
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def submit(self, fn: Callable[[sqlite3.Connection], Any]) -> Future:
+        """Queue fn(connection) to run on the writer thread; the future resolves after it commits."""
+        future = Future()
+        self._queue.put((fn, future))
+        return future
+
+    def write(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Run fn(connection) on the writer thread and return its result once committed."""
+        return self.submit(fn).result()
+
+    def close(self):
+        """Flush queued writes, stop the writer and close every connection."""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        with self._readers_lock:
+            for _, conn in self._readers:
+                conn.close()
+            self._readers.clear()
+
+_db: Optional[Database] = None
+_db_lock = threading.Lock()
+
+def get_db() -> Database:
+    """Return the process-wide database, opening it on first use."""
+    global _db
+    with _db_lock:
+        if _db is None:
+            _db = Database()
+            atexit.register(_db.close)
+        return _db
+
+def _row_to_persona(row: tuple) -> Dict:
+    persona = {"id": row[0]}
+    for field, value in zip(PERSONA_FIELDS, row[1:]):
+        if field in LIST_FIELDS:
+            value = json.loads(value) if value else ([] if field not in OPTIONAL_FIELDS else None)
+        if value is None and field in OPTIONAL_FIELDS:
+            continue
+        persona[field] = value
+    return persona
+
+def _encode(persona: Dict, field: str) -> Any:
+    value = persona.get(field)
+    return json.dumps(value) if field in LIST_FIELDS and value is not None else value
+
+def _upsert_persona(conn: sqlite3.Connection, persona: Dict, source: str = "saved") -> int:
+    """
+    Insert a persona, or update the one with the same name.
+
+    Only the fields present in persona are written, so an update never erases fields it does not
+    mention. Saved personas replace indexed ones of any source; built-in and file personas only
+    refresh rows from their own source, so they never overwrite a saved persona.
+    """
+    fields = [f for f in PERSONA_FIELDS if f in persona]
+    assignments = ", ".join(f"{f} = excluded.{f}" for f in fields + ["source"])
+    condition = "" if source == "saved" else " WHERE personas.source = excluded.source"
+    conn.execute(
+        f"INSERT INTO personas ({', '.join(fields)}, source) VALUES ({', '.join('?' * (len(fields) + 1))}) "
+        f"ON CONFLICT(name) DO UPDATE SET {assignments}{condition}",
+        [_encode(persona, f) for f in fields] + [source]
+    )
+    return conn.execute("SELECT id FROM personas WHERE name = ?", (persona["name"],)).fetchone()[0]
+
+def _has_fts(conn: sqlite3.Connection) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'personas_fts'").fetchone() is not None
+
+def _create_schema(conn: sqlite3.Connection):
+    conn.execute('''
         CREATE TABLE IF NOT EXISTS personas (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name TEXT NOT NULL,
@@ -17,107 +199,214 @@ def init_db():
             expected_behavior TEXT
         )
     ''')
-    conn.commit()
-    conn.close()
-
-def save_persona(persona: Dict):
-    """Save a persona to the database, updating if it exists by name."""
-    conn = sqlite3.connect('decisionforge.db')
-    c = conn.cursor()
-    # Check if persona exists by name
-    c.execute("SELECT id FROM personas WHERE name = ?", (persona['name'],))
-    existing = c.fetchone()
-    
-    goals_json = json.dumps(persona['goals'])
-    biases_json = json.dumps(persona['biases'])
-    
-    if existing:
-        # Update existing persona
-        c.execute('''
-            UPDATE personas SET
-                goals = ?,
-                biases = ?,
-                tone = ?,
-                bio = ?,
-                expected_behavior = ?
-            WHERE id = ?
-        ''', (
-            goals_json,
-            biases_json,
-            persona['tone'],
-            persona['bio'],
-            persona['expected_behavior'],
-            existing[0]
-        ))
-    else:
-        # Insert new persona
-        c.execute('''
-            INSERT INTO personas (name, goals, biases, tone, bio, expected_behavior)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (
-            persona['name'],
-            goals_json,
-            biases_json,
-            persona['tone'],
-            persona['bio'],
-            persona['expected_behavior']
-        ))
-    
-    conn.commit()
-    conn.close()
+    # Databases created before every field was stored gain the missing columns in place
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(personas)")}
+    for column in PERSONA_FIELDS + ["source"]:
+        if column not in existing:
+            default = " DEFAULT 'saved'" if column == "source" else ""
+            conn.execute(f"ALTER TABLE personas ADD COLUMN {column} TEXT{default}")
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'idx_personas_name'").fetchone():
+        # Earlier versions could store the same name twice; keep the latest copy
+        conn.execute("DELETE FROM personas WHERE id NOT IN (SELECT MAX(id) FROM personas GROUP BY name)")
+        conn.execute("CREATE UNIQUE INDEX idx_personas_name ON personas(name)")
+    conn.execute("CREATE TABLE IF NOT EXISTS persona_files (path TEXT PRIMARY KEY, mtime REAL, names TEXT)")
+
+    if _has_fts(conn):
+        return
+    columns = ", ".join(PERSONA_FIELDS)
+    new_values = ", ".join(f"new.{f}" for f in PERSONA_FIELDS)
+    old_values = ", ".join(f"old.{f}" for f in PERSONA_FIELDS)
+    try:
+        conn.execute(f'''
+            CREATE VIRTUAL TABLE personas_fts USING fts5(
+                {columns}, content='personas', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        logger.warning(f"SQLite FTS5 unavailable, persona search falls back to substring matching: {str(e)}")
+        return
+    # Triggers keep the index in step with the table, whichever code path writes to it
+    conn.execute(f'''
+        CREATE TRIGGER personas_fts_insert AFTER INSERT ON personas BEGIN
+            INSERT INTO personas_fts(rowid, {columns}) VALUES (new.id, {new_values});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER personas_fts_delete AFTER DELETE ON personas BEGIN
+            INSERT INTO personas_fts(personas_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER personas_fts_update AFTER UPDATE ON personas BEGIN
+            INSERT INTO personas_fts(personas_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO personas_fts(rowid, {columns}) VALUES (new.id, {new_values});
+        END
+    ''')
+    conn.execute("INSERT INTO personas_fts(personas_fts) VALUES ('rebuild')")
+
+def init_db():
+    """Initialize the SQLite database with a personas table, its name index and full-text index."""
+    get_db().write(_create_schema)
+
+def save_persona(persona: Dict) -> int:
+    """Save a persona to the database, updating if it exists by name. Returns its ID."""
+    return get_db().write(lambda conn: _upsert_persona(conn, persona))
+
+def save_personas(personas: List[Dict]) -> List[int]:
+    """Save several personas in one transaction, updating existing ones by name. Returns their IDs in order."""
+    return get_db().write(lambda conn: [_upsert_persona(conn, persona) for persona in personas])
 
 def update_persona(persona: Dict):
-    """Update an existing persona in the database by ID."""
-    conn = sqlite3.connect('decisionforge.db')
-    c = conn.cursor()
-    goals_json = json.dumps(persona['goals'])
-    biases_json = json.dumps(persona['biases'])
-    c.execute('''
-        UPDATE personas SET
-            name = ?,
-            goals = ?,
-            biases = ?,
-            tone = ?,
-            bio = ?,
-            expected_behavior = ?
-        WHERE id = ?
-    ''', (
-        persona['name'],
-        goals_json,
-        biases_json,
-        persona['tone'],
-        persona['bio'],
-        persona['expected_behavior'],
-        persona['id']
-    ))
-    conn.commit()
-    conn.close()
+    """
+    Update an existing persona in the database by ID; fields not present in persona are kept.
+
+    Raises:
+        ValueError: If the persona is renamed to a name another persona already has.
+    """
+    fields = [f for f in PERSONA_FIELDS if f in persona]
+
+    def update(conn: sqlite3.Connection):
+        if "name" in persona:
+            clash = conn.execute("SELECT 1 FROM personas WHERE name = ? AND id != ?", (persona["name"], persona["id"])).fetchone()
+            if clash:
+                raise ValueError(f"A persona named {persona['name']} already exists")
+        conn.execute(
+            f"UPDATE personas SET {', '.join(f'{f} = ?' for f in fields)}, source = 'saved' WHERE id = ?",
+            [_encode(persona, f) for f in fields] + [persona['id']]
+        )
+
+    get_db().write(update)
 
 def delete_persona(persona_id: int):
     """Delete a persona from the database by ID."""
-    conn = sqlite3.connect('decisionforge.db')
-    c = conn.cursor()
-    c.execute("DELETE FROM personas WHERE id = ?", (persona_id,))
-    conn.commit()
-    conn.close()
+    get_db().write(lambda conn: conn.execute("DELETE FROM personas WHERE id = ?", (persona_id,)))
 
 def get_all_personas() -> List[Dict]:
     """Retrieve all personas from the database."""
-    conn = sqlite3.connect('decisionforge.db')
-    c = conn.cursor()
-    c.execute("SELECT id, name, goals, biases, tone, bio, expected_behavior FROM personas")
-    rows = c.fetchall()
-    personas = []
-    for row in rows:
-        persona = {
-            "id": row[0],
-            "name": row[1],
-            "goals": json.loads(row[2]) if row[2] else [],
-            "biases": json.loads(row[3]) if row[3] else [],
-            "tone": row[4],
-            "bio": row[5],
-            "expected_behavior": row[6]
+    rows = get_db().reader().execute(f"SELECT {PERSONA_COLUMNS} FROM personas").fetchall()
+    return [_row_to_persona(row) for row in rows]
+
+def get_personas_by_ids(persona_ids: List[int]) -> List[Dict]:
+    """Retrieve personas by ID, in the order given; unknown IDs are skipped."""
+    conn = get_db().reader()
+    found = {}
+    # Stay well below SQLite's bound-parameter limit
+    for i in range(0, len(persona_ids), 500):
+        chunk = persona_ids[i:i + 500]
+        placeholders = ", ".join("?" * len(chunk))
+        for row in conn.execute(f"SELECT {PERSONA_COLUMNS} FROM personas WHERE id IN ({placeholders})", chunk):
+            found[row[0]] = _row_to_persona(row)
+    return [found[pid] for pid in persona_ids if pid in found]
+
+def index_personas(personas: List[Dict], source: str) -> List[int]:
+    """
+    Add personas from another source (e.g. "builtin") to the library without overriding saved ones.
+
+    Args:
+        personas (List[Dict]): Personas to index; entries without a name are skipped.
+        source (str): Where they come from; rows from the same source are refreshed.
+
+    Returns:
+        List[int]: IDs of the indexed personas.
+    """
+    personas = [p for p in personas if isinstance(p, dict) and p.get("name")]
+    return get_db().write(lambda conn: [_upsert_persona(conn, p, source) for p in personas])
+
+def _read_persona_file(path: str) -> List[Dict]:
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Skipping unreadable persona file {path}: {str(e)}")
+        return []
+    personas = data if isinstance(data, list) else [data]
+    return [p for p in personas if isinstance(p, dict) and p.get("name")]
+
+def index_persona_files(directory: str = PERSONA_DIR) -> int:
+    """
+    Bring the library up to date with the persona JSON files in directory.
+
+    Only files added, changed or removed since the last call are read, so calling this on every
+    session start is cheap even with many files.
+
+    Args:
+        directory (str): Directory of persona JSON files (one persona or a list per file).
+
+    Returns:
+        int: Number of files that were (re)indexed or dropped.
+    """
+    try:
+        current = {
+            entry.path: entry.stat().st_mtime
+            for entry in os.scandir(directory) if entry.name.endswith(".json") and entry.is_file()
         }
-        personas.append(persona)
-    conn.close()
-    return personas
+    except OSError:
+        current = {}
+    known = {path: (mtime, json.loads(names)) for path, mtime, names in get_db().reader().execute("SELECT path, mtime, names FROM persona_files")}
+    stale = [path for path in known if path not in current or known[path][0] != current[path]]
+    fresh = {path: _read_persona_file(path) for path, mtime in current.items() if path not in known or known[path][0] != mtime}
+    if not stale and not fresh:
+        return 0
+
+    def apply(conn: sqlite3.Connection):
+        for path in stale:
+            names = known[path][1]
+            for i in range(0, len(names), 500):
+                chunk = names[i:i + 500]
+                conn.execute(f"DELETE FROM personas WHERE source = 'file' AND name IN ({', '.join('?' * len(chunk))})", chunk)
+            conn.execute("DELETE FROM persona_files WHERE path = ?", (path,))
+        for path, personas in fresh.items():
+            for persona in personas:
+                _upsert_persona(conn, persona, "file")
+            conn.execute(
+                "INSERT OR REPLACE INTO persona_files (path, mtime, names) VALUES (?, ?, ?)",
+                (path, current[path], json.dumps([p["name"] for p in personas]))
+            )
+
+    get_db().write(apply)
+    return len(set(stale) | set(fresh))
+
+def search_personas(query: str = "", page: int = 0, page_size: int = PERSONA_PAGE_SIZE) -> Dict:
+    """
+    Search the persona library, one page at a time.
+
+    Every word of the query must match some field, as a word prefix; results are ranked by relevance,
+    with matches on name and role counting most. An empty query lists every persona by name.
+
+    Args:
+        query (str): Free-text search, e.g. "optimism ceo".
+        page (int): Zero-based page number.
+        page_size (int): Personas per page.
+
+    Returns:
+        Dict: "personas" on this page, the "total" number of matches, and the "page" and "pages" count.
+    """
+    conn = get_db().reader()
+    terms = SEARCH_TERM.findall(query.lower())
+    offset = max(page, 0) * page_size
+    columns = ", ".join(f"p.{c.strip()}" for c in PERSONA_COLUMNS.split(","))
+    if not terms:
+        total = conn.execute("SELECT COUNT(*) FROM personas").fetchone()[0]
+        rows = conn.execute(f"SELECT {PERSONA_COLUMNS} FROM personas ORDER BY name LIMIT ? OFFSET ?", (page_size, offset)).fetchall()
+    elif _has_fts(conn):
+        match = " ".join(f'"{term}"*' for term in terms)
+        total = conn.execute("SELECT COUNT(*) FROM personas_fts WHERE personas_fts MATCH ?", (match,)).fetchone()[0]
+        rows = conn.execute(f'''
+            SELECT {columns} FROM personas_fts JOIN personas p ON p.id = personas_fts.rowid
+            WHERE personas_fts MATCH ?
+            ORDER BY bm25(personas_fts, {", ".join(map(str, SEARCH_WEIGHTS))}), p.name
+            LIMIT ? OFFSET ?
+        ''', (match, page_size, offset)).fetchall()
+    else:
+        searchable = " || ' ' || ".join(f"COALESCE({f}, '')" for f in PERSONA_FIELDS)
+        where = " AND ".join(f"({searchable}) LIKE ?" for _ in terms)
+        params = [f"%{term}%" for term in terms]
+        total = conn.execute(f"SELECT COUNT(*) FROM personas WHERE {where}", params).fetchone()[0]
+        rows = conn.execute(f"SELECT {PERSONA_COLUMNS} FROM personas WHERE {where} ORDER BY name LIMIT ? OFFSET ?", params + [page_size, offset]).fetchall()
+    return {
+        "personas": [_row_to_persona(row) for row in rows],
+        "total": total,
+        "page": page,
+        "pages": -(-total // page_size) if page_size else 0
+    }
@@ -0,0 +1,84 @@
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Optional
+from tenacity import retry, stop_after_attempt, wait_fixed, retry_if_not_exception_type
+from tenacity.stop import stop_base
+from config import DEADLINE_MIN_CALL_S
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a simulation's time budget has no room left for another call."""
+
+class _StopBeforeDeadline(stop_base):
+    """Stop retrying when waiting and trying again would not fit in the remaining budget."""
+
+    def __init__(self, deadline: "Deadline", wait_s: float):
+        self.deadline = deadline
+        self.wait_s = wait_s
+
+    def __call__(self, retry_state) -> bool:
+        return self.deadline.remaining() < self.wait_s + self.deadline.min_call_s
+
+class Deadline:
+    """
+    Wall-clock budget shared by every call made for one simulation run.
+
+    Pass the same Deadline down to every stage so per-call timeouts shrink as the budget is spent,
+    retries stop once another attempt could not finish in time, and callers can switch to a cheap
+    fallback instead of overrunning.
+    """
+
+    def __init__(self, budget_s: float, min_call_s: float = DEADLINE_MIN_CALL_S):
+        """
+        Args:
+            budget_s (float): Seconds from now until the deadline.
+            min_call_s (float): Calls are not started with less than this many seconds left.
+        """
+        self.budget_s = budget_s
+        self.min_call_s = min_call_s
+        self.started_at = time.monotonic()
+        self.expires_at = self.started_at + budget_s
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def timeout(self, cap: float) -> float:
+        """
+        Timeout for the next call: cap, shrunk to the time left.
+
+        Raises:
+            DeadlineExceeded: If less than min_call_s remains, so the call should not be started.
+        """
+        remaining = self.remaining()
+        if remaining < self.min_call_s:
+            raise DeadlineExceeded(f"Time budget of {self.budget_s:g} seconds exhausted")
+        return min(cap, remaining)
+
+    def retry(self, attempts: int, wait_s: float):
+        """Tenacity decorator retrying up to attempts times, but never past the deadline."""
+        return retry(
+            stop=stop_after_attempt(attempts) | _StopBeforeDeadline(self, wait_s),
+            wait=wait_fixed(wait_s),
+            retry=retry_if_not_exception_type(DeadlineExceeded)
+        )
+
+    def result(self, future: Future, cap: Optional[float] = None):
+        """
+        Wait for a future no longer than the deadline (or cap) allows, cancelling it on timeout.
+
+        Raises:
+            DeadlineExceeded: If too little time is left to wait, or the future did not finish in time.
+        """
+        try:
+            return future.result(timeout=self.timeout(cap if cap is not None else self.budget_s))
+        except DeadlineExceeded:
+            future.cancel()
+            raise
+        except FutureTimeoutError:
+            future.cancel()
+            raise DeadlineExceeded(f"Call did not finish within the time budget of {self.budget_s:g} seconds")
@@ -0,0 +1,207 @@
+import json
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+from config import JOB_LIST_LIMIT
+from utils.db import get_db
+
+# queued → running → completed | failed | cancelled; a running job asked to stop is "cancelling" until its worker notices
+JOB_STATUSES = ["queued", "running", "cancelling", "completed", "failed", "cancelled"]
+FINISHED = {"completed", "failed", "cancelled"}
+JOB_META = ["id", "kind", "status", "worker", "events", "error", "created_at", "started_at", "heartbeat_at", "finished_at"]
+
+def _create_jobs_table(conn: sqlite3.Connection):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            status TEXT NOT NULL,
+            worker TEXT,
+            events INTEGER DEFAULT 0,
+            error TEXT,
+            created_at REAL NOT NULL,
+            started_at REAL,
+            heartbeat_at REAL,
+            finished_at REAL,
+            payload TEXT,
+            result TEXT
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+    # Streamed output (e.g. transcript entries), numbered per job so pollers can ask for what is new
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS job_events (
+            job_id TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (job_id, seq)
+        )
+    ''')
+    # Telemetry records of the LLM calls jobs made, kept for the session that submitted them
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS job_llm_calls (
+            job_id TEXT NOT NULL,
+            session TEXT,
+            started_at REAL NOT NULL,
+            data TEXT NOT NULL
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_job_llm_calls_session ON job_llm_calls (session, started_at)")
+
+def init_jobs():
+    """Create the job queue tables if they do not exist."""
+    get_db().write(_create_jobs_table)
+
+def submit_job(kind: str, payload: Dict) -> str:
+    """
+    Queue a job for the worker pool.
+
+    Args:
+        kind (str): Job handler name, e.g. "simulate" or "analyze".
+        payload (Dict): JSON-serialisable arguments for the handler.
+
+    Returns:
+        str: The job ID.
+    """
+    job_id = uuid4().hex
+    data = json.dumps(payload, ensure_ascii=False)
+    get_db().write(lambda conn: conn.execute(
+        "INSERT INTO jobs (id, kind, status, created_at, payload) VALUES (?, ?, 'queued', ?, ?)",
+        (job_id, kind, time.time(), data)
+    ))
+    return job_id
+
+def claim_job(worker: str) -> Optional[Dict]:
+    """
+    Take the oldest queued job for a worker, or None if the queue is empty.
+
+    The claim happens in one write transaction, so two workers (in any process) never get the same job.
+
+    Returns:
+        Optional[Dict]: id, kind and payload of the claimed job.
+    """
+    def claim(conn: sqlite3.Connection):
+        now = time.time()
+        return conn.execute(
+            "UPDATE jobs SET status = 'running', worker = ?, started_at = ?, heartbeat_at = ? "
+            "WHERE id = (SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1) "
+            "RETURNING id, kind, payload",
+            (worker, now, now)
+        ).fetchone()
+
+    row = get_db().write(claim)
+    if row is None:
+        return None
+    return {"id": row[0], "kind": row[1], "payload": json.loads(row[2])}
+
+def add_events(job_id: str, events: List[Any]) -> str:
+    """
+    Append streamed output to a running job and refresh its heartbeat.
+
+    Returns:
+        str: The job's status, so the worker learns in the same call whether it has been cancelled.
+    """
+    def append(conn: sqlite3.Connection):
+        count = conn.execute("SELECT events FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+        conn.executemany(
+            "INSERT INTO job_events (job_id, seq, data) VALUES (?, ?, ?)",
+            [(job_id, count + i + 1, json.dumps(event, ensure_ascii=False)) for i, event in enumerate(events)]
+        )
+        conn.execute("UPDATE jobs SET events = ?, heartbeat_at = ? WHERE id = ?", (count + len(events), time.time(), job_id))
+        return conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+
+    return get_db().write(append)
+
+def finish_job(job_id: str, status: str, result: Any = None, error: Optional[str] = None):
+    """Record a job's outcome: "completed" with its result, "failed" with an error, or "cancelled"."""
+    data = json.dumps(result, ensure_ascii=False) if result is not None else None
+    get_db().write(lambda conn: conn.execute(
+        "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, heartbeat_at = ? WHERE id = ?",
+        (status, data, error, time.time(), time.time(), job_id)
+    ))
+
+def add_call_records(job_id: str, records: List[Dict]):
+    """Store the telemetry records of the LLM calls a job made (see utils.telemetry)."""
+    if not records:
+        return
+    get_db().write(lambda conn: conn.executemany(
+        "INSERT INTO job_llm_calls (job_id, session, started_at, data) VALUES (?, ?, ?, ?)",
+        [(job_id, r.get("session"), r["started_at"], json.dumps(r, ensure_ascii=False)) for r in records]
+    ))
+
+def call_records(session: Optional[str] = None, job_id: Optional[str] = None) -> List[Dict]:
+    """Return the stored LLM call records of one session's or one job's jobs, oldest first."""
+    where, params = [], []
+    if session is not None:
+        where.append("session = ?")
+        params.append(session)
+    if job_id is not None:
+        where.append("job_id = ?")
+        params.append(job_id)
+    rows = get_db().reader().execute(
+        f"SELECT data FROM job_llm_calls {'WHERE ' + ' AND '.join(where) if where else ''} ORDER BY started_at",
+        params
+    ).fetchall()
+    return [json.loads(data) for data, in rows]
+
+def get_job(job_id: str, with_result: bool = True) -> Optional[Dict]:
+    """
+    Return a job's status and progress, or None if it does not exist.
+
+    Returns:
+        Optional[Dict]: id, kind, status, worker, events (count so far), error, timestamps, and the
+        decoded result once completed (when with_result is set).
+    """
+    columns = JOB_META + (["result"] if with_result else [])
+    row = get_db().reader().execute(f"SELECT {', '.join(columns)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if row is None:
+        return None
+    job = dict(zip(columns, row))
+    if with_result:
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+    return job
+
+def job_events(job_id: str, after: int = 0, limit: Optional[int] = None) -> List[Dict]:
+    """Return a job's streamed events numbered after `after`, oldest first, each as {"seq", "data"}."""
+    rows = get_db().reader().execute(
+        "SELECT seq, data FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+        (job_id, after, limit if limit is not None else -1)
+    ).fetchall()
+    return [{"seq": seq, "data": json.loads(data)} for seq, data in rows]
+
+def list_jobs(status: Optional[str] = None, limit: int = JOB_LIST_LIMIT, offset: int = 0) -> List[Dict]:
+    """List jobs, newest first, without their payloads or results."""
+    where, params = ("WHERE status = ?", [status]) if status else ("", [])
+    rows = get_db().reader().execute(
+        f"SELECT {', '.join(JOB_META)} FROM jobs {where} ORDER BY created_at DESC LIMIT ? OFFSET ?",
+        params + [limit, offset]
+    ).fetchall()
+    return [dict(zip(JOB_META, row)) for row in rows]
+
+def cancel_job(job_id: str) -> Optional[str]:
+    """
+    Cancel a job: a queued one at once, a running one as soon as its worker next reports in.
+
+    Returns:
+        Optional[str]: The job's new status, or None if it does not exist.
+    """
+    def cancel(conn: sqlite3.Connection):
+        conn.execute("UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE id = ? AND status = 'queued'", (time.time(), job_id))
+        conn.execute("UPDATE jobs SET status = 'cancelling' WHERE id = ? AND status = 'running'", (job_id,))
+        row = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row[0] if row else None
+
+    return get_db().write(cancel)
+
+def fail_stale_jobs(stale_s: float) -> int:
+    """Fail running jobs whose worker has not reported in for stale_s seconds (e.g. it crashed); returns how many."""
+    def fail(conn: sqlite3.Connection):
+        now = time.time()
+        return conn.execute(
+            "UPDATE jobs SET status = 'failed', error = 'Worker stopped responding', finished_at = ? "
+            "WHERE status IN ('running', 'cancelling') AND heartbeat_at < ?",
+            (now, now - stale_s)
+        ).rowcount
+
+    return get_db().write(fail)
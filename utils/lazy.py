@@ -0,0 +1,44 @@
+import importlib
+from types import ModuleType
+from typing import Callable
+
+class LazyModule(ModuleType):
+    """Stand-in for a module that performs the real import on first attribute access."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_module"] = None
+
+    def _load(self) -> ModuleType:
+        if self.__dict__["_module"] is None:
+            self.__dict__["_module"] = importlib.import_module(self.__name__)
+        return self.__dict__["_module"]
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+def lazy_import(name: str) -> LazyModule:
+    """
+    Defer importing a heavy module until it is first used.
+
+    Args:
+        name (str): Fully qualified module name, e.g. "matplotlib.pyplot".
+
+    Returns:
+        LazyModule: Proxy to bind in place of the module, e.g. plt = lazy_import("matplotlib.pyplot").
+    """
+    return LazyModule(name)
+
+def lazy_function(module_name: str, name: str) -> Callable:
+    """Defer importing module_name until the function name from it is first called."""
+    module = lazy_import(module_name)
+
+    def call(*args, **kwargs):
+        return getattr(module, name)(*args, **kwargs)
+
+    call.__name__ = call.__qualname__ = name
+    call.__doc__ = f"Lazily imported {module_name}.{name}."
+    return call
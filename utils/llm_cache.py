@@ -0,0 +1,168 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from openai.types.chat import ChatCompletion
+from config import LLM_CACHE_PATH, LLM_CACHE_MAX_BYTES, LLM_CACHE_TTL_S
+from utils.telemetry import note_attempt
+
+logger = logging.getLogger(__name__)
+
+class LLMCache:
+    """Disk-backed, content-addressed cache of chat completion responses with LRU eviction."""
+
+    def __init__(self, path: str = LLM_CACHE_PATH, max_bytes: int = LLM_CACHE_MAX_BYTES, ttl_s: float = LLM_CACHE_TTL_S):
+        """
+        Open (or create) the cache file.
+
+        Args:
+            path (str): SQLite file holding the cache.
+            max_bytes (int): Upper bound on the total size of cached responses; least recently used entries are evicted beyond it.
+            ttl_s (float): Seconds after which an entry expires regardless of use.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        ''')
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict], temperature: Optional[float] = None, max_tokens: Optional[int] = None, response_format: Optional[Dict] = None) -> str:
+        """Hash the parts of a request that determine its response."""
+        payload = json.dumps(
+            {
+                "model": model,
+                "messages": messages,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "response_format": response_format
+            },
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for key, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl_s:
+                if row is not None:
+                    self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str):
+        """Store value under key and evict least recently used entries past the size bound."""
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now)
+            )
+            self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_s,))
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+            if total > self.max_bytes:
+                evict = []
+                for old_key, old_size in self._conn.execute("SELECT key, size FROM llm_cache ORDER BY last_access ASC"):
+                    if total <= self.max_bytes:
+                        break
+                    evict.append((old_key,))
+                    total -= old_size
+                self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", evict)
+            self._conn.commit()
+
+    def clear(self):
+        """Remove every cached entry and reset the counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and current cache size."""
+        with self._lock:
+            entries, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": total
+        }
+
+_cache: Optional[LLMCache] = None
+_cache_lock = threading.Lock()
+
+def get_cache() -> LLMCache:
+    """Return the process-wide LLM response cache, opening it on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache(path=LLM_CACHE_PATH)
+        return _cache
+
+def cached_completion(client, use_cache: bool = True, validate: Optional[Callable[[str], Any]] = None, **request) -> ChatCompletion:
+    """
+    Create a chat completion, serving identical requests from the shared cache.
+
+    Args:
+        client: OpenAI-compatible client used on a cache miss.
+        use_cache (bool): Set to False to bypass the cache for this call (the fresh response is still stored).
+        validate (Callable[[str], Any]): Optional check run on the message content; responses for which it
+            raises are returned but not cached, so a malformed answer is not replayed on retry.
+        **request: Keyword arguments for client.chat.completions.create.
+
+    Returns:
+        ChatCompletion: Cached or freshly generated completion.
+    """
+    cache = get_cache()
+    key = LLMCache.make_key(
+        request.get("model"),
+        request.get("messages"),
+        request.get("temperature"),
+        request.get("max_tokens"),
+        request.get("response_format")
+    )
+    note_attempt(request.get("model"))
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            completion = ChatCompletion.model_validate_json(cached)
+            note_attempt(request.get("model"), completion, cached=True)
+            return completion
+
+    completion = client.chat.completions.create(**request)
+    note_attempt(request.get("model"), completion)
+    try:
+        if validate is not None:
+            validate(completion.choices[0].message.content)
+        cache.set(key, completion.model_dump_json())
+    except Exception as e:
+        logger.warning(f"Not caching LLM response: {str(e)}")
+    return completion
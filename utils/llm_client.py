@@ -0,0 +1,78 @@
+import os
+import threading
+import logging
+import httpx
+from openai import OpenAI
+from typing import Dict, Optional, Tuple
+from config import (
+    LLM_PROVIDERS,
+    DEFAULT_LLM_PROVIDER,
+    LLM_TIMEOUT_S,
+    LLM_CONNECT_TIMEOUT_S,
+    LLM_POOL_MAX_CONNECTIONS,
+    LLM_POOL_MAX_KEEPALIVE,
+    LLM_POOL_KEEPALIVE_EXPIRY_S
+)
+
+logger = logging.getLogger(__name__)
+
+_clients: Dict[Tuple[str, Optional[str]], OpenAI] = {}
+_clients_lock = threading.Lock()
+
+def get_provider(provider: str = DEFAULT_LLM_PROVIDER) -> Dict:
+    """Return the configured settings (base_url, api_key_env, model) for an LLM provider."""
+    if provider not in LLM_PROVIDERS:
+        raise ValueError(f"Unknown LLM provider: {provider}")
+    return LLM_PROVIDERS[provider]
+
+def get_model(provider: str = DEFAULT_LLM_PROVIDER) -> str:
+    """Return the model name configured for an LLM provider."""
+    return get_provider(provider)["model"]
+
+def get_client(provider: str = DEFAULT_LLM_PROVIDER) -> OpenAI:
+    """
+    Return the process-wide client for an LLM provider, creating it on first use.
+
+    Clients are shared across threads and Streamlit sessions, so every caller reuses the same
+    keep-alive HTTP connection pool instead of paying a new TLS handshake per request. A new
+    client is only built when the provider's API key changes.
+
+    Args:
+        provider (str): Key into LLM_PROVIDERS.
+
+    Returns:
+        OpenAI: Shared client bound to the provider's base URL and API key.
+    """
+    settings = get_provider(provider)
+    api_key = os.getenv(settings["api_key_env"])
+    key = (provider, api_key)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=LLM_POOL_MAX_CONNECTIONS,
+                    max_keepalive_connections=LLM_POOL_MAX_KEEPALIVE,
+                    keepalive_expiry=LLM_POOL_KEEPALIVE_EXPIRY_S
+                ),
+                timeout=httpx.Timeout(LLM_TIMEOUT_S, connect=LLM_CONNECT_TIMEOUT_S),
+                follow_redirects=True
+            )
+            client = OpenAI(
+                base_url=settings["base_url"],
+                api_key=api_key,
+                timeout=LLM_TIMEOUT_S,
+                http_client=http_client
+            )
+            for stale_key in [k for k in _clients if k[0] == provider]:
+                _clients.pop(stale_key).close()
+            _clients[key] = client
+            logger.info(f"Created pooled LLM client for provider '{provider}'")
+        return client
+
+def close_clients():
+    """Close every pooled client and release its connections."""
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
@@ -0,0 +1,55 @@
+import argparse
+import os
+import sys
+from typing import List, Optional
+from config import NLTK_DATA_DIR, NLTK_RESOURCES
+
+def _register_data_dir():
+    import nltk
+    if NLTK_DATA_DIR not in nltk.data.path:
+        nltk.data.path.insert(0, NLTK_DATA_DIR)
+
+def missing_nltk_resources() -> List[str]:
+    """Return the NLTK resources the analyzer needs that are not installed locally."""
+    import nltk
+    _register_data_dir()
+    missing = []
+    for name, path in NLTK_RESOURCES.items():
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            missing.append(name)
+    return missing
+
+def ensure_nltk_data(download: bool = False) -> List[str]:
+    """
+    Check for the bundled NLTK data, never touching the network unless asked to.
+
+    Args:
+        download (bool): Fetch missing resources into NLTK_DATA_DIR (for building the offline bundle).
+
+    Returns:
+        List[str]: Resources still missing afterwards.
+    """
+    missing = missing_nltk_resources()
+    if missing and download:
+        import nltk
+        os.makedirs(NLTK_DATA_DIR, exist_ok=True)
+        for name in missing:
+            nltk.download(name, download_dir=NLTK_DATA_DIR, quiet=True)
+        missing = missing_nltk_resources()
+    return missing
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check or build the offline NLTK data bundle used by the transcript analyzer.")
+    parser.add_argument("--download", action="store_true", help=f"Download missing resources into {NLTK_DATA_DIR}")
+    args = parser.parse_args(argv)
+    missing = ensure_nltk_data(download=args.download)
+    if missing:
+        print(f"Missing NLTK resources: {', '.join(missing)}. Run `python -m utils.nltk_data --download` on a connected machine and ship {NLTK_DATA_DIR}/.")
+        return 1
+    print(f"All NLTK resources available ({', '.join(NLTK_RESOURCES)}).")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
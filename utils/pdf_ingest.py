@@ -0,0 +1,185 @@
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import Dict, Iterator, List, Optional, Tuple
+from PyPDF2 import PdfReader
+from config import PDF_CACHE_DIR, PDF_CACHE_MAX_FILES, PDF_PARALLEL_MIN_PAGES, PDF_PAGES_PER_TASK, PDF_WORKERS, PDF_CHUNK_CHARS
+
+logger = logging.getLogger(__name__)
+
+# Pages are joined with a newline so the last word of one page never runs into the next
+PAGE_SEPARATOR = "\n"
+
+_worker_reader: Optional[PdfReader] = None
+
+def _init_worker(data: bytes):
+    # Parse the document once per worker; tasks then only name page ranges
+    global _worker_reader
+    _worker_reader = PdfReader(BytesIO(data))
+
+def _extract_range(start: int, stop: int) -> List[str]:
+    return [_worker_reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+class PDFDocument:
+    """
+    A PDF whose page text is extracted lazily and cached on disk by content hash.
+
+    Iterating pages extracts them on demand (across worker processes for large files) and, once every
+    page has been seen, stores the text and page offsets so the same file is never parsed twice.
+    """
+
+    def __init__(self, data: bytes, cache_dir: str = PDF_CACHE_DIR, workers: Optional[int] = PDF_WORKERS):
+        """
+        Args:
+            data (bytes): Raw PDF file contents.
+            cache_dir (str): Directory holding extracted text keyed by content hash.
+            workers (Optional[int]): Worker processes for large files; None uses every CPU.
+        """
+        self.data = data
+        self.digest = hashlib.sha256(data).hexdigest()
+        self.cache_dir = cache_dir
+        self.workers = workers or os.cpu_count() or 1
+        self._pages: List[str] = []
+        self._page_count: Optional[int] = None
+        self._reader: Optional[PdfReader] = None
+        self.cached = self._load_cache()
+
+    @property
+    def _cache_path(self) -> str:
+        return os.path.join(self.cache_dir, f"{self.digest}.json")
+
+    def _load_cache(self) -> bool:
+        try:
+            with open(self._cache_path) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return False
+        self._pages = cached["pages"]
+        self._page_count = len(self._pages)
+        os.utime(self._cache_path)
+        return True
+
+    def _save_cache(self):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{self._cache_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"pages": self._pages, "offsets": self.page_offsets()}, f)
+            os.replace(tmp_path, self._cache_path)
+            entries = sorted(
+                (os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if name.endswith(".json")),
+                key=os.path.getmtime
+            )
+            for path in entries[:-PDF_CACHE_MAX_FILES] if len(entries) > PDF_CACHE_MAX_FILES else []:
+                os.remove(path)
+        except OSError as e:
+            logger.warning(f"Failed to cache extracted PDF text: {str(e)}")
+
+    @property
+    def page_count(self) -> int:
+        if self._page_count is None:
+            self._reader = PdfReader(BytesIO(self.data))
+            self._page_count = len(self._reader.pages)
+        return self._page_count
+
+    @property
+    def complete(self) -> bool:
+        return len(self._pages) == self.page_count
+
+    def _extract(self, start: int) -> Iterator[str]:
+        """Extract pages from start onwards, in order, in parallel when enough pages remain."""
+        remaining = self.page_count - start
+        if remaining < PDF_PARALLEL_MIN_PAGES or self.workers == 1:
+            reader = self._reader or PdfReader(BytesIO(self.data))
+            for i in range(start, self.page_count):
+                yield reader.pages[i].extract_text() or ""
+            return
+        # Spawned workers stay safe inside the threaded Streamlit server, unlike forked ones
+        executor = ProcessPoolExecutor(
+            max_workers=min(self.workers, -(-remaining // PDF_PAGES_PER_TASK)),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.data,)
+        )
+        try:
+            futures = [
+                executor.submit(_extract_range, i, min(i + PDF_PAGES_PER_TASK, self.page_count))
+                for i in range(start, self.page_count, PDF_PAGES_PER_TASK)
+            ]
+            for future in futures:
+                yield from future.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def iter_pages(self) -> Iterator[Tuple[int, str]]:
+        """
+        Yield (page index, text) in page order, extracting pages only as they are needed.
+
+        Yields:
+            Tuple[int, str]: Zero-based page index and its extracted text.
+        """
+        yield from enumerate(list(self._pages))
+        if self.complete:
+            return
+        for text in self._extract(len(self._pages)):
+            self._pages.append(text)
+            yield len(self._pages) - 1, text
+        self._save_cache()
+        self.cached = True
+
+    def pages(self) -> List[str]:
+        """Text of every page, extracting any not yet seen."""
+        for _ in self.iter_pages():
+            pass
+        return list(self._pages)
+
+    def page_offsets(self) -> List[int]:
+        """Character offset of each extracted page within text()."""
+        offsets, position = [], 0
+        for page in self._pages:
+            offsets.append(position)
+            position += len(page) + len(PAGE_SEPARATOR)
+        return offsets
+
+    def text(self) -> str:
+        """Full document text, pages joined by PAGE_SEPARATOR."""
+        return PAGE_SEPARATOR.join(self.pages())
+
+    def iter_chunks(self, max_chars: int = PDF_CHUNK_CHARS) -> Iterator[Dict]:
+        """
+        Yield passages of at most max_chars, split at paragraph or sentence boundaries within each page.
+
+        Yields:
+            Dict: Chunk with "page" (zero-based), "start" (offset within text()) and "text".
+        """
+        position = 0
+        for page_num, page in self.iter_pages():
+            for start, chunk in _split_text(page, max_chars):
+                yield {"page": page_num, "start": position + start, "text": chunk}
+            position += len(page) + len(PAGE_SEPARATOR)
+
+def _split_text(text: str, max_chars: int) -> Iterator[Tuple[int, str]]:
+    """Split text into (offset, passage) pieces of at most max_chars, preferring natural boundaries."""
+    start = 0
+    while start < len(text):
+        end = min(len(text), start + max_chars)
+        if end < len(text):
+            window = text[start:end]
+            for pattern in (r"\n\s*\n", r"(?<=[.!?])\s", r"\s"):
+                breaks = [m.end() for m in re.finditer(pattern, window)]
+                if breaks and breaks[-1] > max_chars // 2:
+                    end = start + breaks[-1]
+                    break
+        chunk = text[start:end].strip()
+        if chunk:
+            yield start + (len(text[start:end]) - len(text[start:end].lstrip())), chunk
+        start = end
+
+def load_pdf(data: bytes, cache_dir: str = PDF_CACHE_DIR) -> PDFDocument:
+    """Open a PDF for lazy extraction, reusing any cached extraction of the same content."""
+    return PDFDocument(data, cache_dir=cache_dir)
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import sqlite3
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+from config import RUN_COMPRESSION_LEVEL, RUN_LIST_LIMIT
+from utils.db import get_db
+
+# Parts of a run stored as compressed JSON, each in its own column so saving one never rewrites the others
+RUN_BLOBS = ["inputs", "extracted", "personas", "transcript", "analysis", "checkpoint"]
+RUN_META = ["id", "input_hash", "title", "simulation_type", "status", "turns", "created_at", "updated_at"]
+
+def _compress(value: Any) -> bytes:
+    return zlib.compress(json.dumps(value, ensure_ascii=False).encode("utf-8"), RUN_COMPRESSION_LEVEL)
+
+def _decompress(blob: Optional[bytes]) -> Any:
+    return json.loads(zlib.decompress(blob).decode("utf-8")) if blob is not None else None
+
+def _create_runs_table(conn: sqlite3.Connection):
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS runs (
+            id TEXT PRIMARY KEY,
+            input_hash TEXT NOT NULL,
+            title TEXT,
+            simulation_type TEXT,
+            status TEXT,
+            turns INTEGER DEFAULT 0,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL,
+            {", ".join(f"{blob} BLOB" for blob in RUN_BLOBS)}
+        )
+    ''')
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(runs)")}
+    for blob in RUN_BLOBS:
+        if blob not in existing:
+            conn.execute(f"ALTER TABLE runs ADD COLUMN {blob} BLOB")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_input_hash ON runs (input_hash, updated_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_updated_at ON runs (updated_at)")
+
+def init_runs():
+    """Create the runs table if it does not exist."""
+    get_db().write(_create_runs_table)
+
+def input_hash(dilemma: str, personas: List[Dict], simulation_type: str, extracted: Optional[Dict] = None) -> str:
+    """Hash the inputs that determine a simulation, so identical runs can be found again."""
+    payload = json.dumps(
+        {
+            "dilemma": dilemma,
+            "personas": [{k: v for k, v in p.items() if k != "id"} for p in personas],
+            "simulation_type": simulation_type,
+            "extracted": extracted or {}
+        },
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def save_run(run: Dict) -> str:
+    """
+    Create a run, or update the parts of an existing one that run contains.
+
+    Args:
+        run (Dict): Any of "id", "input_hash", "title", "simulation_type", "status" and the blob parts
+            "inputs", "extracted", "personas", "transcript", "analysis" and "checkpoint". A new run needs
+            "input_hash".
+
+    Returns:
+        str: The run ID.
+    """
+    run_id = run.get("id") or uuid4().hex
+    now = time.time()
+    values = {key: run[key] for key in ("input_hash", "title", "simulation_type", "status") if key in run}
+    values.update({blob: _compress(run[blob]) for blob in RUN_BLOBS if blob in run})
+    if "transcript" in run:
+        values["turns"] = len(run["transcript"])
+    values["updated_at"] = now
+
+    def write(conn: sqlite3.Connection):
+        columns = list(values)
+        updated = conn.execute(
+            f"UPDATE runs SET {', '.join(f'{c} = ?' for c in columns)} WHERE id = ?",
+            [values[c] for c in columns] + [run_id]
+        ).rowcount
+        if not updated:
+            conn.execute(
+                f"INSERT INTO runs (id, created_at, {', '.join(columns)}) VALUES (?, ?, {', '.join('?' * len(columns))})",
+                [run_id, now] + [values[c] for c in columns]
+            )
+
+    get_db().write(write)
+    return run_id
+
+def load_run(run_id: str) -> Optional[Dict]:
+    """Load a run with every stored part decompressed, or None if it does not exist."""
+    row = get_db().reader().execute(f"SELECT {', '.join(RUN_META + RUN_BLOBS)} FROM runs WHERE id = ?", (run_id,)).fetchone()
+    if row is None:
+        return None
+    run = dict(zip(RUN_META, row[:len(RUN_META)]))
+    run.update({blob: _decompress(value) for blob, value in zip(RUN_BLOBS, row[len(RUN_META):])})
+    return run
+
+def list_runs(limit: int = RUN_LIST_LIMIT, offset: int = 0, input_hash: Optional[str] = None) -> List[Dict]:
+    """
+    List runs, most recently updated first, without loading their contents.
+
+    Args:
+        limit (int): Maximum runs to return.
+        offset (int): Runs to skip, for paging.
+        input_hash (Optional[str]): Only list runs with these inputs.
+
+    Returns:
+        List[Dict]: Run metadata: id, input_hash, title, simulation_type, status, turns and timestamps.
+    """
+    where, params = ("WHERE input_hash = ?", [input_hash]) if input_hash else ("", [])
+    rows = get_db().reader().execute(
+        f"SELECT {', '.join(RUN_META)} FROM runs {where} ORDER BY updated_at DESC LIMIT ? OFFSET ?",
+        params + [limit, offset]
+    ).fetchall()
+    return [dict(zip(RUN_META, row)) for row in rows]
+
+def delete_run(run_id: str):
+    """Delete a run by ID."""
+    get_db().write(lambda conn: conn.execute("DELETE FROM runs WHERE id = ?", (run_id,)))
+
+def save_checkpoint(run_id: str, checkpoint: Dict):
+    """
+    Store a debate checkpoint (as passed to iter_debate's on_checkpoint) with its run.
+
+    The checkpoint's transcript is saved as the run's transcript rather than twice; the two are
+    written in the same transaction.
+    """
+    state = {key: value for key, value in checkpoint.items() if key != "transcript"}
+    state["transcript_len"] = len(checkpoint["transcript"])
+    save_run({"id": run_id, "transcript": checkpoint["transcript"], "checkpoint": state})
+
+def run_checkpoint(run: Dict) -> Optional[Dict]:
+    """Rebuild the latest checkpoint of a loaded run, or None if no round has completed."""
+    state = run.get("checkpoint")
+    if not state:
+        return None
+    checkpoint = {key: value for key, value in state.items() if key != "transcript_len"}
+    # Entries after the checkpoint (a stopped round, a closing summary) are not part of it
+    checkpoint["transcript"] = (run.get("transcript") or [])[:state["transcript_len"]]
+    return checkpoint
+
+def load_checkpoint(run_id: str) -> Optional[Dict]:
+    """Load the latest checkpoint of a run, or None if the run is unknown or never completed a round."""
+    run = load_run(run_id)
+    return run_checkpoint(run) if run else None
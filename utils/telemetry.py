@@ -0,0 +1,169 @@
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+import numpy as np
+from config import LLM_PRICING, TELEMETRY_MAX_RECORDS, TELEMETRY_LOG_PATH
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+class Telemetry:
+    """Thread-safe, bounded in-process store of per-call LLM metrics."""
+
+    def __init__(self, max_records: int = TELEMETRY_MAX_RECORDS, log_path: Optional[str] = TELEMETRY_LOG_PATH):
+        """
+        Args:
+            max_records (int): Number of most recent call records kept in memory.
+            log_path (Optional[str]): JSONL file every record is appended to as it completes.
+        """
+        self._records = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+        self.log_path = log_path
+
+    def add(self, record: Dict):
+        with self._lock:
+            self._records.append(record)
+            if self.log_path:
+                try:
+                    with open(self.log_path, "a") as f:
+                        f.write(json.dumps(record) + "\n")
+                except OSError as e:
+                    logger.warning(f"Failed to append telemetry record: {str(e)}")
+
+    def records(self, **filters) -> List[Dict]:
+        """Return recorded calls whose fields equal every given filter, e.g. records(stage="debate")."""
+        with self._lock:
+            records = list(self._records)
+        return [r for r in records if all(r.get(k) == v for k, v in filters.items())]
+
+    def summary(self, **filters) -> List[Dict]:
+        """Aggregate matching calls per stage (see summarize_records)."""
+        return summarize_records(self.records(**filters))
+
+    def dump_jsonl(self, path: str, **filters) -> int:
+        """Write matching records to a JSONL file and return how many were written."""
+        records = self.records(**filters)
+        with open(path, "w") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+        return len(records)
+
+    def reset(self):
+        with self._lock:
+            self._records.clear()
+
+def summarize_records(records: List[Dict]) -> List[Dict]:
+    """Aggregate call records per stage: counts, latency percentiles, tokens, retries, errors and cost."""
+    by_stage: Dict[str, List[Dict]] = {}
+    for record in records:
+        by_stage.setdefault(record["stage"], []).append(record)
+    rows = []
+    for stage, calls in by_stage.items():
+        wall = np.array([r["wall_time_s"] for r in calls])
+        rows.append({
+            "stage": stage,
+            "calls": len(calls),
+            "cached": sum(1 for r in calls if r["cached"]),
+            "total_s": float(wall.sum()),
+            "p50_s": float(np.percentile(wall, 50)),
+            "p95_s": float(np.percentile(wall, 95)),
+            "queue_s": float(sum(r["queue_time_s"] for r in calls)),
+            "prompt_tokens": sum(r["prompt_tokens"] for r in calls),
+            "completion_tokens": sum(r["completion_tokens"] for r in calls),
+            "retries": sum(r["retries"] for r in calls),
+            "errors": sum(1 for r in calls if r["outcome"] != "success"),
+            "cost_usd": float(sum(r["cost_usd"] for r in calls))
+        })
+    return rows
+
+_telemetry = Telemetry()
+
+def get_telemetry() -> Telemetry:
+    """Return the process-wide telemetry store."""
+    return _telemetry
+
+def current_tags() -> Dict:
+    """Tags applied to calls tracked on this thread (copy them into worker threads with telemetry_tags)."""
+    return dict(getattr(_local, "tags", {}))
+
+@contextmanager
+def telemetry_tags(**tags):
+    """Attach tags such as a session or run ID to every call tracked on this thread inside the block."""
+    previous = current_tags()
+    _local.tags = {**previous, **tags}
+    try:
+        yield
+    finally:
+        _local.tags = previous
+
+@contextmanager
+def track_llm_call(stage: str, persona: Optional[str] = None, round_num: Optional[int] = None, queued_at: Optional[float] = None):
+    """
+    Record one logical LLM call, including all of its retry attempts.
+
+    Wrap the retried call; cached_completion reports each attempt, its tokens and cache hits back to
+    the active record. Exceptions propagate unchanged after the outcome has been recorded.
+
+    Args:
+        stage (str): Pipeline stage, e.g. "extract", "personas", "debate", "summarize".
+        persona (Optional[str]): Persona speaking, for debate turns.
+        round_num (Optional[int]): Debate round, for debate turns.
+        queued_at (Optional[float]): time.time() when the call was queued, to measure queue time.
+    """
+    start = time.time()
+    record = {
+        **current_tags(),
+        "stage": stage,
+        "persona": persona,
+        "round": round_num,
+        "started_at": start,
+        "queue_time_s": max(0.0, start - queued_at) if queued_at else 0.0,
+        "wall_time_s": 0.0,
+        "model": None,
+        "attempts": 0,
+        "retries": 0,
+        "cached": False,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "cost_usd": 0.0,
+        "outcome": "success",
+        "error": None
+    }
+    previous = getattr(_local, "record", None)
+    _local.record = record
+    try:
+        yield record
+    except Exception as e:
+        description = f"{type(e).__name__} {str(e)}".lower()
+        record["outcome"] = "timeout" if "timeout" in description or "timed out" in description else "error"
+        record["error"] = f"{type(e).__name__}: {str(e)}"
+        raise
+    finally:
+        _local.record = previous
+        record["wall_time_s"] = time.time() - start
+        record["retries"] = max(0, record["attempts"] - 1)
+        _telemetry.add(record)
+
+def note_attempt(model: Optional[str], completion=None, cached: bool = False):
+    """Report one request attempt (and its usage, once it has returned) to the active tracked call, if any."""
+    record = getattr(_local, "record", None)
+    if record is None:
+        return
+    record["model"] = model
+    if completion is None:
+        record["attempts"] += 1
+        return
+    record["cached"] = cached
+    usage = getattr(completion, "usage", None)
+    if usage is not None and not cached:
+        prompt_tokens = usage.prompt_tokens or 0
+        completion_tokens = usage.completion_tokens or 0
+        record["prompt_tokens"] += prompt_tokens
+        record["completion_tokens"] += completion_tokens
+        input_price, output_price = LLM_PRICING.get(model, (0.0, 0.0))
+        record["cost_usd"] += (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
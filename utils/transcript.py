@@ -0,0 +1,262 @@
+import json
+import math
+from abc import ABC, abstractmethod
+from array import array
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional
+
+# Entry keys held in columns; anything else an entry carries (fallback, monte_carlo, game_theory, ...) is kept per row
+CORE_KEYS = ("agent", "round", "step", "message", "latency")
+
+class _Rows(ABC):
+    """Shared read API of a Transcript and its views; subclasses supply the row numbers they cover."""
+
+    @abstractmethod
+    def _rows(self) -> Iterable[int]:
+        """Row numbers covered, in order."""
+
+    @abstractmethod
+    def _store(self) -> "Transcript":
+        """The Transcript holding the rows."""
+
+    def __iter__(self) -> Iterator[Dict]:
+        store = self._store()
+        return (store._entry(row) for row in self._rows())
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def messages(self) -> Iterator[str]:
+        """Iterate over the messages alone, without building entry dicts."""
+        store = self._store()
+        return (store._message(row) for row in self._rows())
+
+    def to_list(self) -> List[Dict]:
+        """Materialise the entries as the list of dicts the rest of the app passes around."""
+        return list(self)
+
+    def iter_jsonl(self) -> Iterator[str]:
+        """Yield one JSON line per entry (without the newline)."""
+        store = self._store()
+        return (store._json_line(row) for row in self._rows())
+
+    def write_jsonl(self, fp: IO[str]) -> int:
+        """Stream the entries to a text file as JSON lines; returns how many were written."""
+        count = 0
+        for line in self.iter_jsonl():
+            fp.write(line)
+            fp.write("\n")
+            count += 1
+        return count
+
+    def to_jsonl(self) -> str:
+        """Serialize the entries as JSON lines, e.g. for a download."""
+        return "".join(line + "\n" for line in self.iter_jsonl())
+
+    def to_pandas(self):
+        """
+        Convert to a DataFrame with agent, round, step, message and latency columns.
+
+        Agent and step come out as categoricals built straight from the interned IDs, so only the
+        messages are materialised as Python strings.
+        """
+        import numpy as np
+        import pandas as pd
+        store = self._store()
+        rows = np.fromiter(self._rows(), dtype=np.intp, count=len(self))
+        return pd.DataFrame({
+            "agent": pd.Categorical.from_codes(np.frombuffer(store._agent_ids, dtype=np.intc)[rows], categories=store._agents),
+            "round": np.frombuffer(store._rounds, dtype=np.intc)[rows],
+            "step": pd.Categorical.from_codes(np.frombuffer(store._step_ids, dtype=np.intc)[rows], categories=store._steps),
+            "message": [store._message(row) for row in rows.tolist()],
+            "latency": np.frombuffer(store._latency, dtype=np.float64)[rows]
+        })
+
+class Transcript(_Rows):
+    """
+    A debate transcript stored column-wise.
+
+    Agent and step names are interned once and stored as integer IDs, rounds and latencies sit in
+    typed arrays, and all messages share one UTF-8 buffer indexed by offsets. Appending an entry is
+    amortised O(1), by_round()/by_agent() return views over row numbers without copying entries, and
+    JSONL is written line by line, so memory and serialization time grow only with the text itself
+    rather than with one dict per turn.
+
+    Reading it back gives the same entry dicts the debate produced; iterating or indexing a
+    Transcript yields them, so it can stand in for the list wherever entries are only read.
+    """
+
+    def __init__(self, entries: Optional[Iterable[Dict]] = None):
+        """
+        Args:
+            entries (Optional[Iterable[Dict]]): Entries with agent, round, step and message (and
+                optionally latency or any other keys) to start with.
+        """
+        self._agents: List[str] = []
+        self._agent_ids_by_name: Dict[str, int] = {}
+        self._steps: List[str] = []
+        self._step_ids_by_name: Dict[str, int] = {}
+        # JSON-encoded names, so serializing a line never re-encodes them
+        self._agents_json: List[str] = []
+        self._steps_json: List[str] = []
+        self._agent_ids = array("i")
+        self._step_ids = array("i")
+        self._rounds = array("i")
+        self._latency = array("d")
+        self._text = bytearray()
+        self._offsets = array("q", [0])
+        self._extras: Dict[int, Dict[str, Any]] = {}
+        # Row numbers per round and per agent ID, kept up to date on append, back the views
+        self._round_rows: Dict[int, array] = {}
+        self._agent_rows: List[array] = []
+        if entries is not None:
+            self.extend(entries)
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Dict]) -> "Transcript":
+        """Build a Transcript from entry dicts, passing an existing Transcript through unchanged."""
+        return entries if isinstance(entries, Transcript) else cls(entries)
+
+    @classmethod
+    def read_jsonl(cls, lines: Iterable) -> "Transcript":
+        """Build a Transcript from JSON lines (str or bytes, e.g. an open file), one entry at a time."""
+        transcript = cls()
+        for line in lines:
+            if line.strip():
+                transcript.append(json.loads(line))
+        return transcript
+
+    def _intern(self, name: str, ids: Dict[str, int], names: List[str], encoded: List[str]) -> int:
+        index = ids.get(name)
+        if index is None:
+            index = ids[name] = len(names)
+            names.append(name)
+            encoded.append(json.dumps(name, ensure_ascii=False))
+        return index
+
+    def append(self, entry: Dict):
+        """Add one entry at the end."""
+        row = len(self)
+        agent = self._intern(str(entry.get("agent", "")), self._agent_ids_by_name, self._agents, self._agents_json)
+        step = self._intern(str(entry.get("step", "")), self._step_ids_by_name, self._steps, self._steps_json)
+        round_num = int(entry.get("round", 0))
+        latency = entry.get("latency")
+        self._agent_ids.append(agent)
+        self._step_ids.append(step)
+        self._rounds.append(round_num)
+        self._latency.append(float(latency) if latency is not None else math.nan)
+        self._text += str(entry.get("message", "")).encode("utf-8")
+        self._offsets.append(len(self._text))
+        extras = {key: value for key, value in entry.items() if key not in CORE_KEYS}
+        if extras:
+            self._extras[row] = extras
+        self._round_rows.setdefault(round_num, array("i")).append(row)
+        if agent == len(self._agent_rows):
+            self._agent_rows.append(array("i"))
+        self._agent_rows[agent].append(row)
+
+    def extend(self, entries: Iterable[Dict]):
+        for entry in entries:
+            self.append(entry)
+
+    def __len__(self) -> int:
+        return len(self._rounds)
+
+    def __getitem__(self, index: int) -> Dict:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Transcript index out of range")
+        return self._entry(index)
+
+    def _rows(self) -> Iterable[int]:
+        return range(len(self))
+
+    def _store(self) -> "Transcript":
+        return self
+
+    def _message(self, row: int) -> str:
+        return self._text[self._offsets[row]:self._offsets[row + 1]].decode("utf-8")
+
+    def _entry(self, row: int) -> Dict:
+        entry = {
+            "agent": self._agents[self._agent_ids[row]],
+            "round": self._rounds[row],
+            "step": self._steps[self._step_ids[row]],
+            "message": self._message(row)
+        }
+        latency = self._latency[row]
+        if not math.isnan(latency):
+            entry["latency"] = latency
+        extras = self._extras.get(row)
+        if extras:
+            entry.update(extras)
+        return entry
+
+    def _json_line(self, row: int) -> str:
+        if row in self._extras:
+            return json.dumps(self._entry(row), ensure_ascii=False)
+        line = (
+            f'{{"agent": {self._agents_json[self._agent_ids[row]]}, "round": {self._rounds[row]}, '
+            f'"step": {self._steps_json[self._step_ids[row]]}, "message": {json.dumps(self._message(row), ensure_ascii=False)}'
+        )
+        latency = self._latency[row]
+        return line + (f', "latency": {latency!r}}}' if not math.isnan(latency) else "}")
+
+    @property
+    def agents(self) -> List[str]:
+        """Agent names in order of first appearance."""
+        return list(self._agents)
+
+    @property
+    def steps(self) -> List[str]:
+        """Step names in order of first appearance."""
+        return list(self._steps)
+
+    @property
+    def rounds(self) -> List[int]:
+        """Round numbers present, in order of first appearance."""
+        return list(self._round_rows)
+
+    def by_round(self, round_num: int) -> "TranscriptView":
+        """The entries of one round, as a view."""
+        return TranscriptView(self, self._round_rows.get(round_num, array("i")))
+
+    def by_agent(self, agent: str) -> "TranscriptView":
+        """The entries spoken by one agent, as a view."""
+        index = self._agent_ids_by_name.get(agent)
+        return TranscriptView(self, self._agent_rows[index] if index is not None else array("i"))
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the columns and message buffer."""
+        columns = [self._agent_ids, self._step_ids, self._rounds, self._latency, self._offsets]
+        return len(self._text) + sum(column.itemsize * len(column) for column in columns)
+
+class TranscriptView(_Rows):
+    """
+    A read-only selection of a Transcript's rows, e.g. one round or one agent.
+
+    It refers to the transcript's storage rather than copying entries, and covers the rows that
+    existed when it was taken, even if the transcript has grown since.
+    """
+
+    def __init__(self, transcript: Transcript, rows: array):
+        self._transcript = transcript
+        self._row_ids = rows
+        self._count = len(rows)
+
+    def _rows(self) -> Iterable[int]:
+        rows = self._row_ids
+        return (rows[i] for i in range(self._count))
+
+    def _store(self) -> Transcript:
+        return self._transcript
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> Dict:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("TranscriptView index out of range")
+        return self._transcript._entry(self._row_ids[index])
@@ -1,52 +1,244 @@
-from typing import List, Dict
-import matplotlib.pyplot as plt
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from typing import Callable, List, Dict, Optional, Tuple, Union
+import numpy as np
 import networkx as nx
+from matplotlib.figure import Figure
 from wordcloud import WordCloud
-import plotly.express as px
-import plotly.graph_objects as go
-import pandas as pd
+from config import VIZ_CACHE_MAX_BYTES, VIZ_CACHE_MAX_ENTRIES, VIZ_LAYOUT_SEED, VIZ_EDGE_WIDTH_BUCKETS, VIZ_MAX_EDGE_WIDTH
 
-def generate_visualizations(keywords: List[str], transcript: List[Dict], personas: List[Dict]):
+Artifact = Union[bytes, str]
+
+class ArtifactCache:
+    """In-memory LRU cache of rendered artifacts (PNG bytes, Plotly JSON), bounded by entries and total size."""
+
+    def __init__(self, max_bytes: int = VIZ_CACHE_MAX_BYTES, max_entries: int = VIZ_CACHE_MAX_ENTRIES):
+        """
+        Args:
+            max_bytes (int): Upper bound on the total size of cached artifacts.
+            max_entries (int): Upper bound on the number of cached artifacts.
+        """
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Artifact]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Artifact]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Artifact):
+        with self._lock:
+            if key in self._entries:
+                self.size -= len(self._entries.pop(key))
+            if len(value) > self.max_bytes:
+                return
+            self._entries[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes or len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def get_or_render(self, key: str, render: Callable[[], Artifact]) -> Artifact:
+        """Return the cached artifact for key, rendering and caching it on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = render()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+_cache: Optional[ArtifactCache] = None
+_cache_lock = threading.Lock()
+
+def get_artifact_cache() -> ArtifactCache:
+    """Return the process-wide artifact cache, creating it on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ArtifactCache()
+        return _cache
+
+def artifact_key(kind: str, data, **params) -> str:
+    """Hash an artifact's kind, its input data (e.g. a transcript) and its rendering parameters."""
+    payload = json.dumps({"kind": kind, "data": data, "params": params}, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def wordcloud_png(keywords: List[str], width: int = 800, height: int = 400, background_color: str = "white") -> bytes:
+    """
+    Render a word cloud of keywords as PNG bytes, once per distinct input.
+
+    Raises:
+        ValueError: If there are no words to draw.
+    """
+    def render() -> bytes:
+        cloud = WordCloud(width=width, height=height, background_color=background_color).generate(" ".join(keywords))
+        buf = BytesIO()
+        # Drawn straight to an image: no matplotlib figure is created, so none can leak
+        cloud.to_image().save(buf, format="PNG")
+        return buf.getvalue()
+
+    key = artifact_key("wordcloud", keywords, width=width, height=height, background_color=background_color)
+    return get_artifact_cache().get_or_render(key, render)
+
+def interaction_matrix(transcript: List[Dict]) -> Tuple[List[str], np.ndarray]:
+    """
+    Count who speaks after whom.
+
+    Args:
+        transcript (List[Dict]): Debate transcript with an agent per entry.
+
+    Returns:
+        Tuple[List[str], np.ndarray]: Agents in order of first appearance, and an (agents × agents)
+        matrix whose [i, j] entry counts the turns in which agent j directly followed agent i.
+    """
+    speakers = np.array([str(entry.get("agent", "Unknown")) for entry in transcript])
+    if speakers.size == 0:
+        return [], np.zeros((0, 0), dtype=np.int64)
+    names, first, codes = np.unique(speakers, return_index=True, return_inverse=True)
+    # Renumber agents by first appearance so the order follows the debate, not the alphabet
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    codes = rank[codes]
+    n = len(names)
+    counts = np.bincount(codes[:-1] * n + codes[1:], minlength=n * n).reshape(n, n)
+    return names[order].tolist(), counts
+
+def interaction_layout(agents: List[str], counts: np.ndarray, seed: int = VIZ_LAYOUT_SEED) -> np.ndarray:
+    """
+    Seeded force-directed positions for the interaction graph, cached per agents and counts.
+
+    Agents who exchange more turns are pulled closer together. The same inputs always give the same
+    layout, so the chart does not move between reruns.
+
+    Returns:
+        np.ndarray: (agents × 2) node coordinates.
+    """
+    def render() -> str:
+        weights = counts + counts.T
+        np.fill_diagonal(weights, 0)
+        graph = nx.from_numpy_array(weights / max(weights.max(), 1))
+        pos = nx.spring_layout(graph, weight="weight", seed=seed)
+        return json.dumps([list(map(float, pos[i])) for i in range(len(agents))])
+
+    if not agents:
+        return np.zeros((0, 2))
+    key = artifact_key("layout", agents, counts=counts.tolist(), seed=seed)
+    return np.array(json.loads(get_artifact_cache().get_or_render(key, render)))
+
+def _segments(pos: np.ndarray, src: np.ndarray, dst: np.ndarray) -> Tuple[List, List]:
+    """Line coordinates for a set of edges, each segment followed by a None gap."""
+    x = np.column_stack([pos[src, 0], pos[dst, 0], np.zeros(len(src))]).ravel().astype(object)
+    y = np.column_stack([pos[src, 1], pos[dst, 1], np.zeros(len(src))]).ravel().astype(object)
+    x[2::3] = None
+    y[2::3] = None
+    return x.tolist(), y.tolist()
+
+def network_figure_json(transcript: List[Dict]) -> str:
+    """
+    Build the stakeholder interaction network for a transcript as Plotly figure JSON, once per transcript.
+
+    Edges are weighted by how often one agent followed another. Their widths are grouped into a few
+    buckets, one trace each, and the figure is written as plain JSON rather than through Plotly's
+    per-point validation, so it stays fast and responsive with many agents and turns.
     """
-    Generate visualizations for the debate transcript and store in session state.
+    def render() -> str:
+        agents, counts = interaction_matrix(transcript)
+        pos = interaction_layout(agents, counts)
+        offdiag = counts.copy()
+        np.fill_diagonal(offdiag, 0)
+        src, dst = np.nonzero(offdiag)
+        weights = offdiag[src, dst]
+        traces = []
+        if len(weights):
+            buckets = np.minimum((weights / weights.max() * VIZ_EDGE_WIDTH_BUCKETS).astype(int), VIZ_EDGE_WIDTH_BUCKETS - 1)
+            for bucket in np.unique(buckets):
+                mask = buckets == bucket
+                edge_x, edge_y = _segments(pos, src[mask], dst[mask])
+                width = 0.5 + (VIZ_MAX_EDGE_WIDTH - 0.5) * (bucket + 1) / VIZ_EDGE_WIDTH_BUCKETS
+                traces.append({"type": "scatter", "x": edge_x, "y": edge_y, "mode": "lines", "line": {"width": width, "color": "#888"}, "opacity": 0.6, "hoverinfo": "none"})
+            # Invisible markers at edge midpoints carry the direction and count on hover
+            mid = (pos[src] + pos[dst]) / 2
+            hover = [f"{agents[i]} → {agents[j]}: {w} turn{'s' if w != 1 else ''}" for i, j, w in zip(src, dst, weights)]
+            traces.append({"type": "scatter", "x": mid[:, 0].tolist(), "y": mid[:, 1].tolist(), "mode": "markers", "marker": {"size": 6, "opacity": 0}, "hoverinfo": "text", "hovertext": hover})
+        # Every turn but the first follows another one, and the first speaker is agent 0
+        turns = counts.sum(axis=0)
+        if len(agents):
+            turns[0] += 1
+        traces.append({
+            "type": "scatter", "x": pos[:, 0].tolist(), "y": pos[:, 1].tolist(), "mode": "markers+text",
+            "text": agents, "textposition": "top center", "hoverinfo": "text",
+            "hovertext": [f"{a}: {t} turn{'s' if t != 1 else ''}" for a, t in zip(agents, turns.tolist())],
+            "marker": {"size": (10 + 20 * np.sqrt(turns / max(turns.max(), 1))).tolist(), "color": "lightblue"}
+        })
+        layout = {
+            "title": {"text": "Stakeholder Interaction Network"},
+            "showlegend": False,
+            "hovermode": "closest",
+            "margin": {"b": 0, "l": 0, "r": 0, "t": 40},
+            "xaxis": {"showgrid": False, "zeroline": False, "showticklabels": False},
+            "yaxis": {"showgrid": False, "zeroline": False, "showticklabels": False}
+        }
+        return json.dumps({"data": traces, "layout": layout}, ensure_ascii=False)
+
+    key = artifact_key("network", [entry.get("agent") for entry in transcript])
+    return get_artifact_cache().get_or_render(key, render)
+
+def process_flowchart_png(process: List[str], width: float = 10, height: float = 6) -> bytes:
+    """Draw the decision process as a flowchart PNG, once per distinct process."""
+    def render() -> bytes:
+        G = nx.DiGraph()
+        for i, step in enumerate(process):
+            G.add_node(f"S{i+1}", label=step)
+            if i < len(process) - 1:
+                G.add_edge(f"S{i+1}", f"S{i+2}")
+        G.add_node("End", label="End")
+        G.add_edge(f"S{len(process)}", "End")
+        pos = nx.spring_layout(G, seed=VIZ_LAYOUT_SEED)
+        # A standalone Figure is not registered with pyplot, so it is freed with its last reference
+        fig = Figure(figsize=(width, height))
+        nx.draw(G, pos, ax=fig.add_subplot(), with_labels=True, labels=nx.get_node_attributes(G, 'label'), node_color='lightblue', node_size=2000, font_size=10, font_weight='bold', arrows=True)
+        buf = BytesIO()
+        fig.savefig(buf, format="png")
+        return buf.getvalue()
+
+    return get_artifact_cache().get_or_render(artifact_key("process", process, width=width, height=height), render)
+
+def generate_visualizations(keywords: List[str], transcript: List[Dict], personas: List[Dict]) -> Dict:
+    """
+    Render the visualizations for a debate transcript into the artifact cache.
+
+    Step 5 and the download buttons then reuse the cached artifacts instead of rendering them again.
 
     Args:
         keywords (List[str]): List of keywords extracted from the transcript.
         transcript (List[Dict]): Debate transcript with agent, round, step, and message.
         personas (List[Dict]): List of personas with name, goals, biases, tone, etc.
+
+    Returns:
+        Dict: "wordcloud_png" bytes and "network_json" figure, or "error" if rendering failed.
     """
     try:
-        # Word Cloud
-        fig_wordcloud = plt.figure(figsize=(10, 5))
-        wordcloud = WordCloud(width=800, height=400, background_color='white').generate(" ".join(keywords))
-        plt.imshow(wordcloud, interpolation='bilinear')
-        plt.axis('off')
-        st.session_state['wordcloud_fig'] = fig_wordcloud
-
-        # Stakeholder Interaction Network
-        G = nx.DiGraph()
-        agents = list(set(entry['agent'] for entry in transcript))
-        for agent in agents:
-            G.add_node(agent)
-        for i, entry in enumerate(transcript[:-1]):
-            G.add_edge(entry['agent'], transcript[i+1]['agent'])
-        pos = nx.spring_layout(G)
-        edge_x, edge_y = [], []
-        for edge in G.edges():
-            x0, y0 = pos[edge[0]]
-            x1, y1 = pos[edge[1]]
-            edge_x.extend([x0, x1, None])
-            edge_y.extend([y0, y1, None])
-        node_x, node_y = [], []
-        for node in G.nodes():
-            x, y = pos[node]
-            node_x.append(x)
-            node_y.append(y)
-        edge_trace = go.Scatter(x=edge_x, y=edge_y, line=dict(width=0.5, color='#888'), hoverinfo='none', mode='lines')
-        node_trace = go.Scatter(x=node_x, y=node_y, mode='markers+text', text=list(G.nodes()), textposition='top center', marker=dict(size=10, color='lightblue'))
-        fig_network = go.Figure(data=[edge_trace, node_trace], layout=go.Layout(showlegend=False, hovermode='closest', margin=dict(b=0,l=0,r=0,t=0), xaxis=dict(showgrid=False, zeroline=False), yaxis=dict(showgrid=False, zeroline=False)))
-        fig_network.update_layout(title="Stakeholder Interaction Network")
-        st.session_state['network_fig'] = fig_network
-
+        return {
+            "wordcloud_png": wordcloud_png(keywords),
+            "network_json": network_figure_json(transcript)
+        }
     except Exception as e:
-        st.session_state['visualization_error'] = str(e)
+        return {"error": str(e)}